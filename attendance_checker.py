@@ -10,18 +10,385 @@ Author: Automated Attendance Checker
 Date: August 2025
 """
 
+__version__ = "1.1.0"
+
 import time
-import os
-import shutil
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import argparse
+import logging
+import sys
+from contextlib import contextmanager, nullcontext
+import attendance_parser
 import config
+import driver_cache
+import projection
+from instrumentation import LOGGER_NAME, Instrumentation, PeakRssSampler, configure_logging
+from attendance_parser import ParseError
+from checkpoint import Checkpoint
+from history_store import HistoryStore
+from records import SubjectRecord
+from run_budget import Budget, BudgetExceeded, Watchdog, kill_process_tree
+from selector_cache import ROW_FIELD_STRATEGIES, SelectorCache, id_part, strategy_key
+from session_store import SessionStore, is_login_url, to_cdp_cookie
+
+# Selenium is imported on first use by load_selenium(), so paths that never open a
+# browser (--help, --version, --last, the HTTP engine) start without it
+webdriver = By = WebDriverWait = EC = Service = Options = None
+TimeoutException = NoSuchElementException = WebDriverException = None
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Selector types of the selector cache mapped to Selenium's By values
+SELECTOR_TYPES = {"css": "css selector", "xpath": "xpath", "id": "id"}
+
+# Built-in selector strategies per field, tried after config.FAST_SELECTORS in the
+# order learned by the selector cache
+PLUS_ICON_STRATEGIES = [
+    ("xpath", config.PLUS_ICON_XPATH),
+    ("xpath", "//i[contains(@class, 'plus')]"),
+    ("xpath", "//i[contains(@class, 'bx-plus')]"),
+    ("xpath", "//i[contains(@class, 'fa-plus')]"),
+    ("xpath", "//button[contains(@class, 'expand')]"),
+    ("xpath", "//*[contains(@class, 'expand')]"),
+    ("xpath", "//a[contains(@href, 'expand') or contains(text(), '+')]"),
+]
+
+# Shared DOM helpers for the injected scripts: locate a subject's row and the
+# conducted/attended spans that belong to it, and detect when the page is idle.
+DOM_HELPERS_SCRIPT = """
+function byXPath(xpath) {
+    var snapshot = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) {
+        nodes.push(snapshot.snapshotItem(i));
+    }
+    return nodes;
+}
+
+function findAll(strategy) {
+    // strategy is a [type, selector] pair as stored by the selector cache
+    if (strategy[0] === "xpath") {
+        return byXPath(strategy[1]);
+    }
+    var selector = strategy[0] === "id" ? "[id='" + strategy[1] + "']" : strategy[1];
+    return Array.prototype.slice.call(document.querySelectorAll(selector));
+}
+
+function text(node) {
+    return node ? (node.textContent || "").replace(/\\s+/g, " ").trim() : "";
+}
+
+function rowOf(icon) {
+    return icon.closest("tr") || icon.closest(".card") || icon.parentElement;
+}
+
+function findInScope(scope, strategy) {
+    if (strategy[0] === "xpath") {
+        // Absolute XPaths are made relative so they never leave the row
+        var xpath = strategy[1].charAt(0) === "/" ? "." + strategy[1] : strategy[1];
+        return document.evaluate(xpath, scope, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    var selector = strategy[0] === "id" ? "[id='" + strategy[1] + "']" : strategy[1];
+    return scope.querySelector(selector);
+}
+
+function idPartOf(strategy) {
+    // [id*='lblClsCondID'] in CSS, contains(@id, 'lblClsCondID') in XPath
+    var match = /\[id\*=["']?([^"'\]]+)/.exec(strategy[1]) ||
+        /contains\(\s*@id\s*,\s*["']([^"']+)["']\s*\)/.exec(strategy[1]);
+    return match ? match[1] : null;
+}
+
+function byRowIndex(idPart, index) {
+    // GridView control ids end in the row index, e.g. "gvAttendance_lblClsCondID_3"
+    return document.querySelector("span[id$='" + idPart + "_" + index + "']");
+}
+
+function findField(row, index, strategies) {
+    // A count field of one subject: inside its row or the detail row below it, or by
+    // the row index in its control id. Returns the node and the strategy position.
+    var scopes = [row, row && row.nextElementSibling];
+    for (var s = 0; s < strategies.length; s++) {
+        for (var i = 0; i < scopes.length; i++) {
+            var found = null;
+            try {
+                found = scopes[i] && findInScope(scopes[i], strategies[s]);
+            } catch (e) {
+                found = null;
+            }
+            if (found) {
+                return {node: found, strategy: s};
+            }
+        }
+        var idPart = idPartOf(strategies[s]);
+        var indexed = idPart && byRowIndex(idPart, index);
+        if (indexed) {
+            return {node: indexed, strategy: s};
+        }
+    }
+    return {node: null, strategy: -1};
+}
+
+function readFields(row, index, fields) {
+    // The conducted/attended texts of one subject and the strategies that found them
+    var conducted = findField(row, index, fields.conducted);
+    var attended = findField(row, index, fields.attended);
+    return {
+        conducted: text(conducted.node),
+        attended: text(attended.node),
+        matched: {conducted: conducted.strategy, attended: attended.strategy}
+    };
+}
+
+function subjectName(row) {
+    if (!row) {
+        return "";
+    }
+    var cells = row.querySelectorAll("td, th");
+    for (var i = 0; i < cells.length; i++) {
+        var value = text(cells[i]);
+        if (value && !/^\\d+$/.test(value)) {
+            return value;
+        }
+    }
+    return text(row);
+}
+
+function rowSummary(row) {
+    // The collapsed row as shown before expanding; used to detect changed subjects
+    if (!row) {
+        return "";
+    }
+    var values = [];
+    var cells = row.querySelectorAll("td, th");
+    for (var i = 0; i < cells.length; i++) {
+        var value = text(cells[i]);
+        if (value) {
+            values.push(value);
+        }
+    }
+    return values.join(" ");
+}
+
+function pageIdle() {
+    // The DOM is usable once parsed; with the eager load strategy of lean mode blocked
+    // or slow subresources may still be loading at that point
+    if (document.readyState === "loading") {
+        return false;
+    }
+    // ASP.NET AJAX UpdatePanel postback still running
+    if (window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager) {
+        var manager = Sys.WebForms.PageRequestManager.getInstance();
+        if (manager && manager.get_isInAsyncPostBack()) {
+            return false;
+        }
+    }
+    if (window.jQuery && window.jQuery.active > 0) {
+        return false;
+    }
+    return true;
+}
+"""
+
+# Injected once per run by the bulk harvest. Expands the subject rows one at a time,
+# because PageRequestManager aborts an async postback that is still in flight when the
+# next one starts: each click waits for the page to go idle and for that row's own
+# conducted/attended spans before the next. One record is returned per subject, so the
+# number of WebDriver commands stays constant no matter how many subjects there are.
+# The plus icons are located with the first of the given strategies that matches.
+BULK_HARVEST_SCRIPT = DOM_HELPERS_SCRIPT + """
+var iconStrategies = arguments[0];
+var timeoutMs = arguments[1];
+var known = arguments[2] || {};
+var rowTimeoutMs = arguments[3];
+var fields = arguments[4];
+var done = arguments[arguments.length - 1];
+var deadline = Date.now() + timeoutMs;
+
+var icons = [];
+var strategy = -1;
+for (var s = 0; s < iconStrategies.length && !icons.length; s++) {
+    try {
+        icons = findAll(iconStrategies[s]);
+        strategy = s;
+    } catch (e) {
+        icons = [];
+    }
+}
+if (!icons.length) {
+    strategy = -1;
+}
+
+// A postback may re-render the grid, so the row is looked up again at every step
+function currentRow(i) {
+    var current = findAll(iconStrategies[strategy]);
+    return i < current.length ? rowOf(current[i]) : null;
+}
+
+// Subjects whose collapsed summary matches the last stored snapshot are not expanded
+var rows = [];
+for (var i = 0; i < icons.length; i++) {
+    var row = rowOf(icons[i]);
+    var summary = rowSummary(row);
+    rows.push({index: i + 1, name: subjectName(row), summary: summary,
+               unchanged: known[subjectName(row)] === summary, conducted: "", attended: ""});
+}
+
+function waitFor(condition, then) {
+    var until = Math.min(deadline, Date.now() + rowTimeoutMs);
+    (function poll() {
+        if (condition() || Date.now() >= until) {
+            then();
+        } else {
+            setTimeout(poll, 50);
+        }
+    })();
+}
+
+function expand(i) {
+    while (i < rows.length && rows[i].unchanged) {
+        i++;
+    }
+    if (i >= rows.length || Date.now() >= deadline) {
+        // Rows left without counts are reported unread and retried one at a time
+        done({strategy: strategy, rows: rows});
+        return;
+    }
+    waitFor(pageIdle, function () {
+        var row = currentRow(i);
+        if (!row) {
+            expand(i + 1);
+            return;
+        }
+        findAll(iconStrategies[strategy])[i].click();
+        var counts = {conducted: "", attended: "", matched: {conducted: -1, attended: -1}};
+        waitFor(function () {
+            var row = currentRow(i);
+            if (!pageIdle() || !row) {
+                return false;
+            }
+            counts = readFields(row, i, fields);
+            return counts.conducted && counts.attended;
+        }, function () {
+            rows[i].conducted = counts.conducted;
+            rows[i].attended = counts.attended;
+            rows[i].matched = counts.matched;
+            expand(i + 1);
+        });
+    });
+}
+
+expand(0);
+"""
+
+# Bytes transferred and load timings of the current document, from the Performance API.
+# Cross-origin resources without Timing-Allow-Origin report a transfer size of 0.
+PAGE_STATS_SCRIPT = """
+var navigation = performance.getEntriesByType("navigation")[0];
+var resources = performance.getEntriesByType("resource");
+var bytes = navigation ? navigation.transferSize : 0;
+for (var i = 0; i < resources.length; i++) {
+    bytes += resources[i].transferSize || 0;
+}
+return {
+    bytes: bytes,
+    resources: resources.length,
+    dom_interactive_ms: navigation ? navigation.domInteractive : 0,
+    dom_content_loaded_ms: navigation ? navigation.domContentLoadedEventEnd : 0,
+    load_ms: navigation ? navigation.loadEventEnd : 0
+};
+"""
+
+# Stable keys of the subject rows: position, subject name and collapsed-row summary.
+ROW_KEYS_SCRIPT = DOM_HELPERS_SCRIPT + """
+var icons = findAll(arguments[0]);
+var rows = [];
+for (var i = 0; i < icons.length; i++) {
+    var row = rowOf(icons[i]);
+    rows.push({index: i + 1, name: subjectName(row), summary: rowSummary(row)});
+}
+return rows;
+"""
+
+# Re-locates the plus icon of one subject in the current DOM: the icon at the row's
+# position if it still belongs to that subject, otherwise the first one that does.
+LOCATE_ICON_SCRIPT = DOM_HELPERS_SCRIPT + """
+var icons = findAll(arguments[0]);
+var name = arguments[1];
+var position = arguments[2];
+if (!name || (icons[position] && subjectName(rowOf(icons[position])) === name)) {
+    return icons[position] || null;
+}
+for (var i = 0; i < icons.length; i++) {
+    if (subjectName(rowOf(icons[i])) === name) {
+        return icons[i];
+    }
+}
+return null;
+"""
+
+# Markup of expanded subject rows for snapshot capture: the row of each plus icon and
+# the element holding its conducted/attended spans. Positions are 0-based; null means all.
+CAPTURE_PANELS_SCRIPT = DOM_HELPERS_SCRIPT + """
+var icons = findAll(arguments[0]);
+var positions = arguments[1];
+var conductedStrategies = arguments[2];
+var panels = [];
+for (var i = 0; i < icons.length; i++) {
+    if (positions && positions.indexOf(i) < 0) {
+        continue;
+    }
+    var row = rowOf(icons[i]);
+    var html = row.outerHTML;
+    var span = findField(row, i, conductedStrategies).node;
+    if (span && !row.contains(span)) {
+        var holder = row.nextElementSibling && row.nextElementSibling.contains(span)
+            ? row.nextElementSibling : (span.closest("tr") || span.parentElement);
+        html += holder.outerHTML;
+    }
+    panels.push({index: i + 1, name: subjectName(row), html: html});
+}
+return panels;
+"""
+
+# Polled after expanding one subject. Returns that row's conducted/attended texts once
+# its panel is populated and no postback is running, or null while it is still loading.
+ROW_PANEL_SCRIPT = DOM_HELPERS_SCRIPT + """
+var icon = arguments[0];
+var index = arguments[1];
+var fields = arguments[2];
+
+if (!pageIdle()) {
+    return null;
+}
+var row = icon.isConnected ? rowOf(icon) : null;
+var counts = readFields(row, index, fields);
+if (!counts.conducted || !counts.attended) {
+    return null;
+}
+return counts;
+"""
+
+PAGE_IDLE_SCRIPT = DOM_HELPERS_SCRIPT + """
+return pageIdle();
+"""
+
+
+def load_selenium():
+    """
+    Import the Selenium modules used by the browser engine, once.
+    """
+    global webdriver, By, WebDriverWait, EC, Service, Options
+    global TimeoutException, NoSuchElementException, WebDriverException
+    if webdriver is not None:
+        return
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
 
 class JainAttendanceChecker:
@@ -29,71 +396,145 @@ class JainAttendanceChecker:
     A class to handle Jain University attendance checking automation.
     """
     
-    def __init__(self):
+    def __init__(self, offline=False, student_id="default", headless=False, use_session=True,
+                 engine="selenium", metrics_format=None, metrics_file=None, use_history=True,
+                 incremental=True, upcoming=None, lean=None, export_path=None, resume=False,
+                 capture=False, backend=None, budget=None, interactive=True):
+        self.offline = offline
+        self.engine = engine
+        self.backend = backend or config.BROWSER_BACKEND
+        self.headless = headless
+        self.use_session = use_session
+        self.session = SessionStore(student_id)
+        self.metrics = Instrumentation()
+        self.metrics_format = metrics_format
+        self.metrics_file = metrics_file
+        self.use_history = use_history
+        # A snapshot needs the panel of every subject, so capturing runs reuse nothing
+        self.incremental = incremental and use_history and not capture
+        self.history = None
+        self.previous = {}
+        self.resume = resume
+        self.checkpoint = None
+        self.completed = {}
+        self.capture = capture
+        self.recorder = None
+        self.upcoming = upcoming
+        self.export_path = export_path
+        self.lean = config.LEAN_MODE if lean is None else lean
+        self.rss_sampler = None
+        self.run_budget = config.RUN_BUDGET if budget is None else budget
+        self.interactive = interactive
+        self.budget = None
+        self.watchdog = Watchdog(self.kill_browser)
+        self.selectors = SelectorCache()
         self.driver = None
         self.wait = None
-        self.conducted_list = []
-        self.attended_list = []
+        self.subjects = []
+        self.unread = []
+        self.inconsistent = []
     
     def setup_browser(self):
         """
         Initialize Chrome browser with appropriate settings.
-        Sets up non-headless mode for manual login interaction.
+        Runs headless only when requested and a saved session can skip the manual login.
         """
         print("Setting up Chrome browser...")
+        load_selenium()
+        
+        if self.backend == "cdp":
+            self.setup_cdp_driver()
+        else:
+            self.setup_selenium_driver()
         
-        # Configure Chrome options
+        # Configure WebDriverWait with timeout from config
+        self.wait = WebDriverWait(self.driver, config.WAIT_TIMEOUT)
+        self.metrics.wrap_driver(self.driver)
+        if self.lean:
+            self.block_resources()
+        if self.metrics_format:
+            # ChromeDriver (or Chrome itself with the CDP backend) is the parent of every
+            # Chrome process of this session
+            self.rss_sampler = PeakRssSampler(interval=0.25, pid=self.driver.service.process.pid)
+            self.rss_sampler.__enter__()
+        
+        print("✓ Browser setup complete")
+    
+    def chrome_arguments(self):
+        """
+        Return the Chrome command line switches shared by both driver backends.
+        """
+        arguments = []
+        if self.headless:
+            arguments.append("--headless=new")
+        if self.use_session and config.USE_CHROME_PROFILE:
+            arguments.append(f"--user-data-dir={self.session.profile_dir}")
+        arguments += ["--no-sandbox", "--disable-dev-shm-usage", "--disable-web-security"]
+        disabled_features = ["VizDisplayCompositor"]
+        if self.lean:
+            arguments += config.LEAN_CHROME_FLAGS
+            disabled_features += config.LEAN_DISABLED_FEATURES
+        # Chrome only honours the last --disable-features, so they are passed together
+        arguments.append(f"--disable-features={','.join(disabled_features)}")
+        arguments.append(f"--window-size={config.WINDOW_SIZE}")
+        return arguments
+    
+    def setup_cdp_driver(self):
+        """
+        Launch Chrome and drive it over the DevTools protocol, without chromedriver.
+        Falls back to the Selenium backend if Chrome cannot be launched this way.
+        """
+        from cdp_driver import CdpDriver
+        
+        try:
+            with self.metrics.phase("driver_resolve"):
+                # Start extracting once the DOM is parsed in lean mode, as with Selenium
+                self.driver = CdpDriver(self.chrome_arguments(),
+                                        page_load_strategy="eager" if self.lean else "normal")
+        except Exception as e:
+            print(f"⚠ DevTools backend failed to start ({e}) - falling back to Selenium")
+            self.backend = "selenium"
+            self.setup_selenium_driver()
+    
+    def setup_selenium_driver(self):
+        """
+        Start Chrome through ChromeDriver, resolving the driver from the cache.
+        """
         chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        chrome_options.add_argument(f"--window-size={config.WINDOW_SIZE}")
+        for argument in self.chrome_arguments():
+            chrome_options.add_argument(argument)
+        if self.lean:
+            # Start extracting once the DOM is parsed instead of after every resource loaded
+            chrome_options.page_load_strategy = "eager"
         
         try:
-            # Use ChromeDriverManager to automatically handle driver installation
             print("Setting up ChromeDriver...")
+            with self.metrics.phase("driver_resolve"):
+                driver_path, chrome_major = driver_cache.resolve_driver_path(offline=self.offline)
             
-            # Clear webdriver-manager cache to force fresh installation
-            cache_dir = os.path.expanduser("~/.wdm")
-            if os.path.exists(cache_dir):
-                print("Clearing ChromeDriver cache for fresh installation...")
-                shutil.rmtree(cache_dir)
-            
-            # Install compatible ChromeDriver
-            driver_path = ChromeDriverManager().install()
-            
-            # Fix webdriver-manager bug: sometimes it points to wrong file
-            if 'THIRD_PARTY_NOTICES' in driver_path or not os.access(driver_path, os.X_OK):
-                print("Fixing ChromeDriver path...")
-                driver_dir = os.path.dirname(driver_path)
-                
-                # Look for the actual chromedriver executable
-                possible_names = ['chromedriver', 'chromedriver.exe']
-                for root, dirs, files in os.walk(driver_dir):
-                    for file in files:
-                        if file in possible_names:
-                            candidate_path = os.path.join(root, file)
-                            if os.access(candidate_path, os.X_OK):
-                                driver_path = candidate_path
-                                print(f"Found working ChromeDriver at: {driver_path}")
-                                break
-                    if os.access(driver_path, os.X_OK) and 'THIRD_PARTY_NOTICES' not in driver_path:
-                        break
-                
-                # Make sure it's executable
-                os.chmod(driver_path, 0o755)
-            
-            service = Service(driver_path)
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            try:
+                self.driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            except WebDriverException as e:
+                # The cached driver no longer matches this Chrome - resolve it again once
+                print(f"Cached ChromeDriver failed to start: {e.msg}")
+                driver_cache.invalidate(chrome_major)
+                if self.offline:
+                    raise
+                driver_path, chrome_major = driver_cache.resolve_driver_path(force=True)
+                self.driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
             
         except Exception as e:
-            print(f"ChromeDriverManager failed: {e}")
+            print(f"ChromeDriver setup failed: {e}")
             print("\nTROUBLESHOOTING STEPS:")
             print("1. Update Chrome browser to the latest version")
             print("2. Try installing ChromeDriver via Homebrew:")
             print("   brew install --cask chromedriver")
             print("3. Or download manually from: https://chromedriver.chromium.org/downloads")
+            print("4. Clear the ChromeDriver cache with --clear-driver-cache")
+            print("5. Or skip ChromeDriver entirely with --backend cdp")
+            
+            if self.offline:
+                raise
             
             # Try one more approach - use selenium-manager
             try:
@@ -103,11 +544,92 @@ class JainAttendanceChecker:
             except Exception as e3:
                 print(f"Final fallback also failed: {e3}")
                 raise
+    
+    def block_resources(self):
+        """
+        Block images, fonts, media and third-party scripts over the DevTools protocol.
+        Only the DOM text of the portal is needed, so nothing else is downloaded.
+        """
+        try:
+            self.execute_cdp_commands([
+                ("Network.enable", {}),
+                ("Network.setBlockedURLs", {"urls": config.LEAN_BLOCKED_URL_PATTERNS}),
+            ])
+            log.debug("Blocking %s URL patterns", len(config.LEAN_BLOCKED_URL_PATTERNS))
+        except WebDriverException as e:
+            log.warning("⚠ Could not block resources, loading the full page: %s", e)
+    
+    def execute_cdp_commands(self, commands):
+        """
+        Send DevTools protocol commands in order; pipelined in one round trip with the CDP backend.
         
-        # Configure WebDriverWait with timeout from config
-        self.wait = WebDriverWait(self.driver, config.WAIT_TIMEOUT)
+        Args:
+            commands (list): (method, params) pairs
         
-        print("✓ Browser setup complete")
+        Returns:
+            list: The results, in command order
+        """
+        if self.backend == "cdp":
+            return self.driver.execute_cdp_batch(commands)
+        return [self.driver.execute_cdp_cmd(method, params) for method, params in commands]
+    
+    def record_page_stats(self):
+        """
+        Record the bytes transferred and the load timings of the current page.
+        """
+        if not self.driver:
+            return
+        try:
+            stats = self.driver.execute_script(PAGE_STATS_SCRIPT)
+        except WebDriverException as e:
+            log.debug("Could not read page stats: %s", e)
+            return
+        self.metrics.event("page", lean=self.lean, **stats)
+    
+    def restore_session(self):
+        """
+        Reuse the session saved by a previous run.
+        Loads the saved cookies into the browser and opens the attendance page once;
+        the session is valid if the portal does not redirect back to the login page.
+        
+        Returns:
+            bool: True if the browser is logged in and on the attendance page
+        """
+        cookies = self.session.load()
+        if not cookies:
+            return False
+        
+        print("Restoring saved session...")
+        try:
+            # All cookies in one command instead of one round trip per cookie
+            self.driver.execute_cdp_cmd("Network.setCookies",
+                                        {"cookies": [to_cdp_cookie(cookie) for cookie in cookies]})
+        except WebDriverException:
+            for cookie in cookies:
+                try:
+                    self.driver.execute_cdp_cmd("Network.setCookie", to_cdp_cookie(cookie))
+                except WebDriverException:
+                    continue
+        
+        self.driver.get(config.ATTENDANCE_URL)
+        if is_login_url(self.driver.current_url):
+            print("⚠ Saved session has expired - manual login required")
+            return False
+        
+        print("✓ Saved session restored")
+        return True
+    
+    def save_session(self):
+        """
+        Save the current browser cookies so the next run can skip the login.
+        """
+        if not self.use_session:
+            return
+        try:
+            self.session.save(self.driver.get_cookies())
+            print("✓ Session saved for future runs")
+        except Exception as e:
+            print(f"⚠ Could not save session: {str(e)}")
     
     def navigate_to_login(self):
         """
@@ -128,18 +650,27 @@ class JainAttendanceChecker:
         """
         Wait for user to complete manual login process.
         Monitors for successful login by checking URL change.
+        Non-interactive runs do not prompt for confirmation; they wait at most
+        config.LOGIN_WAIT_TIMEOUT seconds for the login.
+        
+        Raises:
+            BudgetExceeded: If a non-interactive run sees no login in time
         """
         print("\nWaiting for manual login completion...")
+        timeout = self.bounded(config.WAIT_TIMEOUT if self.interactive else config.LOGIN_WAIT_TIMEOUT)
         
         # Wait for URL to change indicating successful login
         try:
-            self.wait.until(lambda driver: "login" not in driver.current_url.lower())
+            self.wait_until(lambda driver: "login" not in driver.current_url.lower(), timeout)
             print("✓ Login detected successfully!")
         except TimeoutException:
+            if not self.interactive:
+                raise BudgetExceeded("manual_login", timeout)
             print("⚠ Login timeout - continuing anyway...")
         
-        # Additional pause for user confirmation
-        input("\nPress Enter once you have successfully logged in and are ready to continue...")
+        if self.interactive:
+            # Additional pause for user confirmation
+            input("\nPress Enter once you have successfully logged in and are ready to continue...")
     
     def navigate_to_attendance_page(self):
         """
@@ -151,271 +682,637 @@ class JainAttendanceChecker:
         
         # Wait for page to load
         try:
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            self.wait_until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             print("✓ Attendance page loaded successfully")
         except TimeoutException:
             print("⚠ Page load timeout - continuing anyway...")
     
     def extract_attendance_data(self):
         """
-        Extract attendance data for all subjects by clicking expand icons.
-        Finds plus icons, clicks them, and extracts conducted/attended numbers.
+        Extract attendance data for all subjects.
+        Uses the single-script bulk harvest when enabled in config, and falls back
+        to expanding the subjects one at a time if the bulk harvest fails or finds no
+        subject rows. Subjects the bulk harvest could not read are retried one at a time.
+        """
+        log.info("\nExtracting attendance data...")
+        
+        self.reset_results()
+        self.start_capture("selenium")
+        
+        if config.EXTRACTION_MODE == "bulk":
+            if self.extract_attendance_data_bulk():
+                if self.unread:
+                    log.warning("⚠ %s subject(s) could not be read in bulk - retrying them one at a time",
+                                len(self.unread))
+                    self.metrics.event("fallback", source="bulk_script", target="per_subject",
+                                       subjects=len(self.unread))
+                    self.extract_attendance_data_per_subject(only=set(self.unread))
+                return
+            log.warning("⚠ Bulk harvest found no subjects - falling back to per-subject extraction")
+            self.metrics.event("fallback", source="bulk_script", target="per_subject")
+            self.reset_results()
+        
+        self.extract_attendance_data_per_subject()
+    
+    def extract_attendance_data_bulk(self, timeout=None):
         """
-        print("\nExtracting attendance data...")
-        print(f"Looking for plus icons with XPath: {config.PLUS_ICON_XPATH}")
+        Expand every subject and read all of them with one injected script.
+        The rows are expanded one after another, each waiting up to config.INTERACTION_TIMEOUT.
+        
+        Args:
+            timeout (float): Seconds the whole harvest may take, defaults to config.WAIT_TIMEOUT
         
-        # Reset lists for fresh data
-        self.conducted_list = []
-        self.attended_list = []
+        Returns:
+            bool: True if the harvest found subject rows, even if none of them could be
+                  stored; False if it failed or found none
+        """
+        timeout = self.bounded(timeout or config.WAIT_TIMEOUT)
+        strategies = self.selectors.ordered("plus_icon", PLUS_ICON_STRATEGIES)
+        log.debug("Bulk harvest with plus icon strategies: %s", [strategy_key(s) for s in strategies])
+        self.reset_results()
         
         try:
-            # Wait for page to fully load first
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(2)  # Give extra time for dynamic content
+            self.wait_until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            self.driver.set_script_timeout(timeout + 5)
+            fields = self.field_strategies()
+            harvest = self.driver.execute_async_script(
+                BULK_HARVEST_SCRIPT,
+                [list(strategy) for strategy in strategies],
+                int(timeout * 1000),
+                self.known_summaries(),
+                int(config.INTERACTION_TIMEOUT * 1000),
+                {field: [list(strategy) for strategy in candidates] for field, candidates in fields.items()},
+            )
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            log.warning("✗ Bulk harvest failed: %s", e)
+            return False
+        
+        matched = harvest["strategy"]
+        self.record_lookup("plus_icon", strategies, matched)
+        self.record_field_lookups(fields, harvest["rows"])
+        if matched >= 0:
+            self.capture_panels(strategies[matched])
+        
+        self.store_harvested_rows(harvest["rows"], "bulk_script")
+        return bool(harvest["rows"])
+    
+    def store_harvested_rows(self, rows, strategy):
+        """
+        Parse harvested subject rows and store their counts.
+        Shared by the bulk harvest and the HTTP engine so both produce the same results.
+        
+        Args:
+            rows (list): Dicts with index, name, conducted and attended texts
+            strategy (str): How the rows were read, recorded in the metrics
+        
+        Returns:
+            bool: True if at least one subject was extracted
+        """
+        if not rows:
+            return False
+        
+        log.info("Found %s subjects to process", len(rows))
+        
+        # Every row is parsed in one call; unchanged rows have no texts and are reused below
+        parsed = attendance_parser.parse_batch((row["conducted"], row["attended"]) for row in rows)
+        
+        for row, counts in zip(rows, parsed):
+            index = row["index"]
+            if row.get("unchanged") and self.reuse_subject(index, row["name"], row["summary"]):
+                continue
             
-            # Debug: Check what's on the page
-            print("Current page URL:", self.driver.current_url)
-            print("Page title:", self.driver.title)
+            if isinstance(counts, ParseError):
+                if row["conducted"] and row["attended"]:
+                    # The texts were read and are wrong; reading them again would not help
+                    self.report_inconsistent(index, row["name"], counts)
+                else:
+                    log.warning("  ⚠ Subject %s: Could not extract data - %s", index, counts)
+                    self.unread.append(row["name"])
+                continue
             
-            # Try to find plus icons with multiple strategies
-            plus_icons = []
+            self.add_subject(row["name"] or f"Subject {index}", counts.conducted, counts.attended,
+                             counts.breakdown._asdict(), summary=row.get("summary", ""))
+            self.metrics.event("selector", subject=index, field="subject", strategy=strategy)
+            log.info("  ✓ Subject %s: Conducted=%s, Attended=%s", index, counts.conducted, counts.attended)
+        
+        self.save_checkpoint(*self.subjects)
+        return bool(self.subjects)
+    
+    def reuse_subject(self, index, name, summary):
+        """
+        Store a subject without reading it again, if its collapsed row is unchanged since
+        an unfinished run (the checkpoint) or the last completed run (the history store).
+        
+        Args:
+            index (int): 1-based row position, for logging
+            name (str): Subject name
+            summary (str): Collapsed-row text as currently shown
+        
+        Returns:
+            bool: True if the subject was stored
+        """
+        if not name or not summary:
+            return False
+        
+        record = self.completed.get(name)
+        if record is not None and record.summary == summary:
+            self.add_subject(name, record.conducted, record.attended, record.breakdown,
+                             summary=summary, source="checkpoint")
+            self.metrics.event("selector", subject=index, field="subject", strategy="checkpoint")
+            log.info("  ✓ Subject %s: already read by the unfinished run", index)
+            return True
+        
+        snapshot = self.previous.get(name) if self.incremental else None
+        if snapshot and snapshot["summary"] == summary:
+            # Unchanged since the last run - serve it from the history store
+            self.add_subject(name, snapshot["conducted"], snapshot["attended"],
+                             snapshot["breakdown"], summary=summary, source="history")
+            self.metrics.event("selector", subject=index, field="subject", strategy="history")
+            log.info("  ✓ Subject %s: unchanged since last run", index)
+            return True
+        return False
+    
+    def reset_results(self):
+        """
+        Clear the results of a previous extraction.
+        """
+        self.subjects = []
+        self.unread = []
+        self.inconsistent = []
+    
+    def report_inconsistent(self, index, name, error):
+        """
+        Report a subject whose texts were read but do not parse, without retrying it.
+        
+        Args:
+            index (int): 1-based row position
+            name (str): Subject name
+            error (ParseError): What is wrong with the texts
+        """
+        log.warning("  ⚠ Subject %s: Inconsistent counts, not stored - %s", index, error)
+        self.inconsistent.append(name or f"Subject {index}")
+        self.metrics.event("parse_error", subject=index, field=error.field, reason=error.reason)
+    
+    def add_subject(self, name, conducted, attended, breakdown, summary="", source="live"):
+        """
+        Record the extracted counts for one subject.
+        """
+        self.subjects.append(SubjectRecord(name, conducted, attended, breakdown, summary, source))
+    
+    def start_capture(self, engine):
+        """
+        Start recording the page markup of this extraction, if --capture was given.
+        
+        Args:
+            engine (str): "selenium" or "http", stored in the bundle
+        
+        Returns:
+            SnapshotRecorder: The recorder, or None when not capturing
+        """
+        if not self.capture:
+            return None
+        from snapshots import SnapshotRecorder
+        
+        self.recorder = SnapshotRecorder(self.session.student_id, engine)
+        return self.recorder
+    
+    def capture_panels(self, strategy, positions=None):
+        """
+        Record the markup of expanded subject rows in the snapshot.
+        
+        Args:
+            strategy (tuple): The plus icon (type, selector) strategy
+            positions (list): 0-based row positions, None for every row
+        """
+        if self.recorder is None:
+            return
+        conducted = [list(candidate) for candidate in self.selectors.ordered("conducted")]
+        try:
+            for panel in self.driver.execute_script(CAPTURE_PANELS_SCRIPT, list(strategy), positions, conducted):
+                self.recorder.add_panel(panel["index"], panel["name"], panel["html"])
+        except WebDriverException as e:
+            log.debug("Could not capture the subject panels: %s", e)
+    
+    def save_snapshot(self):
+        """
+        Write the recorded page and panels as a snapshot bundle.
+        """
+        recorder, self.recorder = self.recorder, None
+        if recorder is None or not self.subjects:
+            return
+        if recorder.engine == "selenium" and self.driver:
+            recorder.page = self.driver.page_source
+        path = recorder.save(self.subjects)
+        print(f"✓ Snapshot saved to {path}")
+    
+    def open_history(self):
+        """
+        Open the history store and load the latest snapshot of every subject.
+        """
+        if not self.use_history or self.history is not None:
+            return
+        self.history = HistoryStore()
+        self.previous = self.history.latest(self.session.student_id)
+    
+    def known_summaries(self):
+        """
+        Return the stored collapsed-row summary of every subject for incremental extraction.
+        
+        Returns:
+            dict: Subject name to summary text, empty when incremental extraction is off
+        """
+        summaries = {}
+        if self.incremental:
+            self.open_history()
+            summaries.update((name, snapshot["summary"]) for name, snapshot in self.previous.items()
+                             if snapshot["summary"])
+        # Subjects already read by an unfinished run count as known, even with --full
+        self.open_checkpoint()
+        summaries.update((name, record.summary) for name, record in self.completed.items() if record.summary)
+        return summaries
+    
+    def open_checkpoint(self):
+        """
+        Load the subjects completed by an unfinished run of this student, when resuming.
+        A capturing run still records its progress but reads every subject again.
+        """
+        if not self.resume or self.checkpoint is not None:
+            return
+        self.checkpoint = Checkpoint(self.session.student_id)
+        if self.capture:
+            return
+        self.completed = self.checkpoint.load()
+        if self.completed:
+            print(f"✓ Resuming an unfinished run: {len(self.completed)} subject(s) already read")
+    
+    def save_checkpoint(self, *records):
+        """
+        Add extracted subjects to the checkpoint, when resuming is enabled.
+        """
+        if not self.resume or not records:
+            return
+        self.open_checkpoint()
+        self.checkpoint.add(*records)
+    
+    def finish_checkpoint(self, completed):
+        """
+        Remove the checkpoint after a complete run, or tell the user how to resume.
+        
+        Args:
+            completed (bool): True if every subject was read and the results were shown
+        """
+        if self.checkpoint is None:
+            return
+        if completed and not self.unread:
+            self.checkpoint.clear()
+        elif self.checkpoint.subjects:
+            print(f"✓ Progress saved ({len(self.checkpoint.subjects)} subjects) - run again to resume")
+    
+    def save_history(self):
+        """
+        Store this run's subjects as a new snapshot.
+        """
+        if not self.use_history or not self.subjects:
+            return
+        self.open_history()
+        self.history.record_run(self.session.student_id, self.subjects)
+        # Later extractions in the same process compare against this run
+        self.previous = self.history.latest(self.session.student_id)
+    
+    def extract_attendance_data_http(self):
+        """
+        Extract attendance data over HTTP with the saved session, without a browser.
+        
+        Returns:
+            bool: True if the saved session was valid and the page was read
+        """
+        log.info("\nExtracting attendance data over HTTP...")
+        
+        self.reset_results()
+        
+        if not self.session.load():
+            log.warning("⚠ No saved session for the HTTP engine")
+            return False
+        
+        from http_engine import HttpAttendanceEngine, SessionExpiredError
+        
+        # Markup is matched on span ids, so only the strategies that name one apply
+        fields = {field: [strategy for strategy in candidates if id_part(strategy)]
+                  for field, candidates in self.field_strategies().items()}
+        engine = HttpAttendanceEngine(self.session.cookie_jar(), recorder=self.start_capture("http"),
+                                      budget=self.budget, fields=fields)
+        try:
+            rows = engine.harvest(self.known_summaries())
+            self.record_field_lookups(fields, rows)
+            self.store_harvested_rows(rows, "http_engine")
+        except SessionExpiredError:
+            log.warning("⚠ Saved session has expired - manual login required")
+            return False
+        finally:
+            engine.close()
+        return True
+    
+    def extract_attendance_data_per_subject(self, only=None):
+        """
+        Extract attendance data by clicking the expand icons one at a time.
+        Finds plus icons, clicks them, and extracts conducted/attended numbers.
+        Rows are re-located by subject name before each click, and subjects that
+        fail are retried with backoff up to config.EXTRACTION_RETRIES times.
+        
+        Args:
+            only (set): Only extract these subject names, e.g. the ones the bulk harvest missed
+        """
+        self.open_checkpoint()
+        try:
+            # Wait until the page has loaded and no postback is running
+            self.wait_for_page_ready()
             
-            # Strategy 1: Original selector
-            try:
-                plus_icons = self.driver.find_elements(By.XPATH, config.PLUS_ICON_XPATH)
-                print(f"Strategy 1: Found {len(plus_icons)} plus icons")
-            except Exception as e:
-                print(f"Strategy 1 failed: {e}")
+            # Debug: Check what's on the page
+            log.debug("Current page URL: %s", self.driver.current_url)
+            log.debug("Page title: %s", self.driver.title)
             
-            # Strategy 2: Alternative selectors if first one fails
-            if not plus_icons:
-                alternative_selectors = [
-                    "//i[contains(@class, 'plus')]",
-                    "//i[contains(@class, 'bx-plus')]", 
-                    "//i[contains(@class, 'fa-plus')]",
-                    "//button[contains(@class, 'expand')]",
-                    "//*[contains(@class, 'expand')]",
-                    "//a[contains(@href, 'expand') or contains(text(), '+')]"
-                ]
-                
-                for i, selector in enumerate(alternative_selectors, 2):
-                    try:
-                        plus_icons = self.driver.find_elements(By.XPATH, selector)
-                        if plus_icons:
-                            print(f"Strategy {i}: Found {len(plus_icons)} elements with selector: {selector}")
-                            break
-                    except Exception as e:
-                        print(f"Strategy {i} failed: {e}")
+            # Try the plus icon selectors, best known strategy first
+            plus_icons = []
+            for strategy in self.selectors.ordered("plus_icon", PLUS_ICON_STRATEGIES):
+                try:
+                    plus_icons = self.find_all(strategy)
+                except Exception as e:
+                    log.debug("Plus icon strategy %s failed: %s", strategy_key(strategy), e)
+                self.selectors.record("plus_icon", strategy, bool(plus_icons))
+                if plus_icons:
+                    log.debug("Found %s plus icons with %s", len(plus_icons), strategy_key(strategy))
+                    self.metrics.event("selector", field="plus_icon", strategy=strategy_key(strategy))
+                    break
             
             # If still no icons found, let's see what's available
             if not plus_icons:
-                print("No plus icons found. Let's debug the page structure...")
+                log.warning("No plus icons found. Let's debug the page structure...")
                 
                 # Look for any clickable elements that might be expand buttons
                 clickable_elements = self.driver.find_elements(By.XPATH, "//button | //a | //i | //*[@onclick]")
-                print(f"Found {len(clickable_elements)} potentially clickable elements")
+                log.info("Found %s potentially clickable elements", len(clickable_elements))
                 
                 # Print some of their classes and text for debugging
                 for i, elem in enumerate(clickable_elements[:10]):  # Show first 10
                     try:
                         classes = elem.get_attribute("class") or "no-class"
                         text = elem.text[:50] or "no-text"
-                        print(f"  Element {i+1}: class='{classes}', text='{text}'")
+                        log.info("  Element %s: class='%s', text='%s'", i+1, classes, text)
                     except:
                         pass
                 
-                print("Please check the page structure and update the PLUS_ICON_XPATH in config.py")
+                log.warning("Please check the page structure and update the PLUS_ICON_XPATH in config.py")
                 return
             
-            print(f"Found {len(plus_icons)} subjects to process")
+            log.info("Found %s subjects to process", len(plus_icons))
             
-            # Process each subject
-            for index, icon in enumerate(plus_icons, 1):
-                try:
-                    print(f"\nProcessing subject {index}...")
-                    
-                    # Scroll to element to ensure it's visible
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", icon)
-                    time.sleep(config.INTERACTION_DELAY)
-                    
-                    # Click the plus icon to expand attendance details
-                    self.driver.execute_script("arguments[0].click();", icon)  # Use JS click for better reliability
-                    print(f"  ✓ Expanded subject {index}")
-                    
-                    # Short pause to allow content to load
-                    time.sleep(config.INTERACTION_DELAY)
-                    
-                    # Extract conducted count
-                    conducted = self.extract_conducted_count(index)
-                    
-                    # Extract attended count
-                    attended = self.extract_attended_count(index)
-                    
-                    # Store the data
-                    if conducted is not None and attended is not None:
-                        self.conducted_list.append(conducted)
-                        self.attended_list.append(attended)
-                        print(f"  ✓ Subject {index}: Conducted={conducted}, Attended={attended}")
-                    else:
-                        print(f"  ⚠ Subject {index}: Could not extract data")
+            # Key every row by subject name, so it can be found again after a postback
+            # re-renders the grid and the icons captured above go stale
+            pending = self.driver.execute_script(ROW_KEYS_SCRIPT, list(strategy))
+            if only is not None:
+                pending = [row for row in pending if row["name"] in only]
+            
+            for attempt in range(config.EXTRACTION_RETRIES + 1):
+                if attempt:
+                    delay = config.RETRY_BACKOFF * 2 ** (attempt - 1)
+                    log.info("Retrying %s subject(s) in %.1fs (attempt %s)", len(pending), delay, attempt + 1)
+                    self.metrics.event("retry", subjects=len(pending), attempt=attempt + 1)
+                    time.sleep(delay)
+                    self.wait_for_page_ready()
                 
-                except Exception as e:
-                    print(f"  ✗ Error processing subject {index}: {str(e)}")
-                    continue
+                pending = [row for row in pending if not self.extract_row(strategy, row)]
+                if not pending:
+                    break
+            
+            for row in pending:
+                log.warning("  ⚠ Subject %s: Could not extract data", row["index"])
+            self.unread = [row["name"] for row in pending]
         
         except TimeoutException:
-            print("✗ Page did not load properly")
+            log.warning("✗ Page did not load properly")
+        except BudgetExceeded:
+            raise
         except Exception as e:
-            print(f"✗ Error during attendance extraction: {str(e)}")
+            log.warning("✗ Error during attendance extraction: %s", e)
     
-    def extract_conducted_count(self, subject_index):
+    def extract_row(self, strategy, row):
         """
-        Extract the 'Conducted' count for a subject.
+        Expand one subject row and store its counts.
         
         Args:
-            subject_index (int): The index of the current subject
+            strategy (tuple): The plus icon (type, selector) strategy
+            row (dict): Row key with index, name and summary
         
         Returns:
-            int: The conducted count, or None if not found
+            bool: True if the subject is done (stored or inconsistent), False if it should be retried
         """
-        print(f"    Looking for 'Conducted' count...")
+        index = row["index"]
+        if self.reuse_subject(index, row["name"], row["summary"]):
+            return True
         
-        # Multiple strategies to find conducted count based on HTML structure
-        strategies = [
-            # Strategy 1: Look for span with specific ID pattern (most reliable)
-            lambda: self.driver.find_elements(By.XPATH, "//span[contains(@id, 'lblClsCondID')]"),
+        try:
+            log.debug("\nProcessing subject %s...", index)
+            icon = self.driver.execute_script(LOCATE_ICON_SCRIPT, list(strategy), row["name"], index - 1)
+            if icon is None:
+                log.debug("  Subject %s is not on the page right now", index)
+                return False
             
-            # Strategy 2: Look for text "Conducted" and get the next span
-            lambda: self.driver.find_elements(By.XPATH, "//div[contains(text(), 'Conducted')]/strong/span"),
+            # Scroll the plus icon into view and click it to expand attendance details,
+            # in one command; JS click for better reliability
+            self.driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", icon)
             
-            # Strategy 3: Look for any span after "Conducted" text
-            lambda: self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Conducted')]/following::span[1]"),
+            # Wait for this row's panel instead of sleeping a fixed time
+            fields = self.field_strategies()
+            panel, waited = self.wait_for_row_panel(icon, index - 1, fields)
+            log.info("  ✓ Expanded subject %s (waited %.0f ms)", index, waited * 1000)
             
-            # Strategy 4: Using config XPath as fallback
-            lambda: [self.driver.find_element(By.XPATH, config.CONDUCTED_TEXT_XPATH)],
-        ]
+            self.metrics.event("wait", subject=index, seconds=round(waited, 6), settled=bool(panel))
+            
+            if not panel:
+                # Only this row's own spans count; an earlier subject's panel may still be open
+                return False
+            self.record_field_lookups(fields, [panel])
+            self.metrics.event("selector", subject=index, field="subject", strategy="row_panel")
+            self.capture_panels(strategy, [index - 1])
+            counts = attendance_parser.parse_subject(panel["conducted"], panel["attended"])
         
-        for i, strategy in enumerate(strategies, 1):
-            try:
-                elements = strategy()
-                print(f"    Strategy {i} found {len(elements)} conducted elements")
-                
-                for element in elements:
-                    try:
-                        conducted_text = element.text.strip()
-                        print(f"    Checking conducted text: '{conducted_text}'")
-                        
-                        # The conducted count should be a simple number
-                        if conducted_text.isdigit():
-                            result = int(conducted_text)
-                            print(f"    ✓ Extracted conducted count: {result}")
-                            return result
-                        
-                        # Try to extract number from text that might have extra content
-                        import re
-                        numbers = re.findall(r'\d+', conducted_text)
-                        if numbers:
-                            result = int(numbers[0])  # Take the first number found
-                            print(f"    ✓ Extracted conducted count from text: {result}")
-                            return result
-                            
-                    except (ValueError, AttributeError) as e:
-                        print(f"    Failed to parse conducted text: {e}")
-                        continue
-                        
-            except Exception as e:
-                print(f"    Strategy {i} failed: {e}")
-                continue
+        except ParseError as e:
+            # The panel had settled, so its texts would parse the same way on every retry
+            self.report_inconsistent(index, row["name"], e)
+            return True
+        
+        except WebDriverException as e:
+            # Usually a stale element after a postback re-rendered the grid
+            log.debug("  ✗ Error processing subject %s: %s", index, e)
+            return False
+        
+        self.add_subject(row["name"] or f"Subject {index}", counts.conducted, counts.attended,
+                         counts.breakdown._asdict(), summary=row["summary"])
+        self.save_checkpoint(self.subjects[-1])
+        log.info("  ✓ Subject %s: Conducted=%s, Attended=%s", index, counts.conducted, counts.attended)
+        return True
+    
+    def wait_for_page_ready(self):
+        """
+        Wait until the DOM is parsed and no ASP.NET or jQuery request is running.
         
-        print(f"    ⚠ Could not find conducted count for subject {subject_index}")
-        return None
+        Raises:
+            TimeoutException: If the page is not ready within config.WAIT_TIMEOUT
+        """
+        self.wait_for_script(config.WAIT_TIMEOUT, PAGE_IDLE_SCRIPT)
     
-    def extract_attended_count(self, subject_index):
+    def wait_for_row_panel(self, icon, row_index, fields):
         """
-        Extract the 'Attended' count for a subject.
+        Wait for the expanded panel of one subject row to be populated.
         
         Args:
-            subject_index (int): The index of the current subject
+            icon (WebElement): The plus icon that was clicked
+            row_index (int): Zero-based index of the subject row
+            fields (dict): Strategies per count field, from field_strategies()
         
         Returns:
-            int: The attended count, or None if not found
+            tuple: (panel, seconds waited) where panel holds the row's conducted and
+                   attended texts and the strategies that matched them, or is None if
+                   it did not appear within config.INTERACTION_TIMEOUT
+        """
+        started = time.perf_counter()
+        fields = {field: [list(strategy) for strategy in candidates] for field, candidates in fields.items()}
+        try:
+            panel = self.wait_for_script(config.INTERACTION_TIMEOUT, ROW_PANEL_SCRIPT, icon, row_index, fields)
+        except TimeoutException:
+            panel = None
+        return panel, time.perf_counter() - started
+    
+    def wait_for_script(self, timeout, script, *args):
         """
-        print(f"    Looking for 'Attended' count...")
+        Wait until an injected script returns a truthy value.
+        The CDP backend waits inside the page and is notified once; Selenium polls
+        the script every config.POLL_INTERVAL seconds.
         
-        # Multiple strategies to find attended count based on HTML structure
-        strategies = [
-            # Strategy 1: Look for span with specific ID pattern (most reliable)
-            lambda: self.driver.find_elements(By.XPATH, "//span[contains(@id, 'lblClsAttID')]"),
-            
-            # Strategy 2: Look for text "Attended" and get the next span
-            lambda: self.driver.find_elements(By.XPATH, "//div[contains(text(), 'Attended')]/strong/span"),
-            
-            # Strategy 3: Look for any span after "Attended" text
-            lambda: self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Attended')]/following::span[1]"),
-            
-            # Strategy 4: Using config XPath as fallback
-            lambda: self.driver.find_elements(By.XPATH, config.TOTAL_TEXT_XPATH),
-        ]
+        Returns:
+            The first truthy value returned by the script
         
-        for i, strategy in enumerate(strategies, 1):
-            try:
-                elements = strategy()
-                print(f"    Strategy {i} found {len(elements)} attended elements")
-                
-                for element in elements:
-                    try:
-                        attended_text = element.text.strip()
-                        print(f"    Checking attended text: '{attended_text}'")
-                        
-                        # Parse the attendance format: "P-12/E-1/L-0/MCR-0/R-0/Total-13"
-                        if "Total-" in attended_text:
-                            # Extract the number after "Total-"
-                            total_part = attended_text.split("Total-")[1]
-                            # Get just the number (in case there's more text after)
-                            import re
-                            numbers = re.findall(r'\d+', total_part)
-                            if numbers:
-                                result = int(numbers[0])
-                                print(f"    ✓ Extracted attended count from Total: {result}")
-                                return result
-                        
-                        # Alternative parsing: look for "Total=" format
-                        elif "Total=" in attended_text:
-                            total_part = attended_text.split("Total=")[1]
-                            import re
-                            numbers = re.findall(r'\d+', total_part)
-                            if numbers:
-                                result = int(numbers[0])
-                                print(f"    ✓ Extracted attended count from Total=: {result}")
-                                return result
-                        
-                        # If it's just a number
-                        elif attended_text.isdigit():
-                            result = int(attended_text)
-                            print(f"    ✓ Extracted attended count as number: {result}")
-                            return result
-                        
-                        # Try to find any number in the text as fallback
-                        else:
-                            import re
-                            numbers = re.findall(r'\d+', attended_text)
-                            if numbers:
-                                # If we have multiple numbers, try to find the total
-                                # Look for the last number which is often the total
-                                result = int(numbers[-1])
-                                print(f"    ✓ Extracted attended count as last number: {result}")
-                                return result
-                            
-                    except (ValueError, AttributeError) as e:
-                        print(f"    Failed to parse attended text: {e}")
-                        continue
-                        
-            except Exception as e:
-                print(f"    Strategy {i} failed: {e}")
-                continue
+        Raises:
+            TimeoutException: If the script stays falsy for the whole timeout
+            BudgetExceeded: If the run budget is used up before the wait starts
+        """
+        timeout = self.bounded(timeout)
+        if self.backend == "cdp":
+            return self.driver.wait_until(script, *args, timeout=timeout)
+        return WebDriverWait(self.driver, timeout, poll_frequency=config.POLL_INTERVAL).until(
+            lambda driver: driver.execute_script(script, *args)
+        )
+    
+    def wait_until(self, condition, timeout=None):
+        """
+        Wait for a WebDriverWait condition, within the run budget.
+        
+        Args:
+            condition (callable): Called with the driver until it returns a truthy value
+            timeout (float): Seconds to wait, defaults to config.WAIT_TIMEOUT
+        
+        Returns:
+            The first truthy value returned by the condition
+        """
+        return WebDriverWait(self.driver, self.bounded(timeout or config.WAIT_TIMEOUT)).until(condition)
+    
+    def bounded(self, timeout):
+        """
+        Shorten a wait to what is left of the run and phase budgets.
+        
+        Args:
+            timeout (float): The wait's own timeout in seconds
+        
+        Returns:
+            float: The timeout to use
+        
+        Raises:
+            BudgetExceeded: If the budget is already used up
+        """
+        return timeout if self.budget is None else self.budget.clamp(timeout)
+    
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a phase of the run and hold it to its budget from config.PHASE_BUDGETS.
+        
+        Args:
+            name (str): Phase name
+        """
+        budget_phase = self.budget.phase(name) if self.budget is not None else nullcontext()
+        with self.metrics.phase(name), budget_phase:
+            yield
+    
+    def kill_browser(self, reason):
+        """
+        Kill the browser and its driver with all their processes.
+        Called by the watchdog thread when a deadline has passed and a command is still hanging.
+        
+        Args:
+            reason (BudgetExceeded): Why the budget ran out
+        """
+        driver = self.driver
+        pid = getattr(getattr(getattr(driver, "service", None), "process", None), "pid", None)
+        killed = kill_process_tree(pid) if pid else 0
+        self.metrics.event("timeout", phase=reason.phase, budget=reason.budget, killed=killed)
+        if killed:
+            log.warning("✗ %s - killed the hung browser (%s processes)", reason, killed)
+    
+    def field_strategies(self):
+        """
+        Return the strategies for the conducted/attended spans, best known first.
         
-        print(f"    ⚠ Could not find attended count for subject {subject_index}")
-        return None
+        Returns:
+            dict: Field name to its (type, selector) strategies
+        """
+        return {field: self.selectors.ordered(field) for field in ROW_FIELD_STRATEGIES}
+    
+    def record_lookup(self, field, strategies, matched):
+        """
+        Record the outcome of looking up a field in the selector cache and the metrics.
+        Every strategy tried before the matching one missed.
+        
+        Args:
+            field (str): The field that was looked up
+            strategies (list): The strategies in the order they were tried
+            matched (int): Position of the strategy that matched, -1 for none
+        """
+        tried = strategies[:matched + 1] if matched >= 0 else strategies
+        for position, strategy in enumerate(tried):
+            self.selectors.record(field, strategy, position == matched)
+        if matched >= 0:
+            self.metrics.event("selector", field=field, strategy=strategy_key(strategies[matched]))
+    
+    def record_field_lookups(self, fields, rows):
+        """
+        Record which strategies found the conducted/attended spans of harvested rows.
+        The lookup counts once per harvest, as the first strategy that matched any row.
+        
+        Args:
+            fields (dict): Strategies per count field, as passed to the harvest
+            rows (list): Harvested rows; those that were looked up carry matched
+        """
+        looked_up = [row["matched"] for row in rows if row.get("matched")]
+        if not looked_up:
+            return
+        for field, strategies in fields.items():
+            found = [matched[field] for matched in looked_up if matched.get(field, -1) >= 0]
+            self.record_lookup(field, strategies, min(found) if found else -1)
+    
+    def find_all(self, strategy):
+        """
+        Find all elements matching a (type, selector) strategy.
+        
+        Args:
+            strategy (tuple): ("css" | "xpath" | "id", selector)
+        
+        Returns:
+            list: The matching elements
+        """
+        by, value = strategy
+        return self.driver.find_elements(SELECTOR_TYPES[by], value)
     
     def calculate_and_display_results(self):
         """
@@ -425,13 +1322,16 @@ class JainAttendanceChecker:
         print("ATTENDANCE CALCULATION RESULTS")
         print("="*50)
         
-        if not self.conducted_list or not self.attended_list:
+        if self.inconsistent:
+            print(f"⚠ Left out with inconsistent counts: {', '.join(self.inconsistent)}")
+        
+        if not self.subjects:
             print("✗ No attendance data was extracted successfully")
             return
         
         # Calculate totals
-        total_conducted = sum(self.conducted_list)
-        total_attended = sum(self.attended_list)
+        total_conducted = sum(subject.conducted for subject in self.subjects)
+        total_attended = sum(subject.attended for subject in self.subjects)
         
         # Calculate percentage
         if total_conducted > 0:
@@ -439,11 +1339,15 @@ class JainAttendanceChecker:
         else:
             attendance_percentage = 0
         
+        # Project safe skips and required classes at the good threshold
+        scenario = projection.make_scenario(upcoming=self.upcoming)
+        projected = projection.project({self.session.student_id: self.subjects}, [scenario])
+        
         # Display detailed breakdown
         print(f"\nSubject-wise Breakdown:")
-        for i, (conducted, attended) in enumerate(zip(self.conducted_list, self.attended_list), 1):
-            subject_percentage = (attended / conducted) * 100 if conducted > 0 else 0
-            print(f"  Subject {i}: {attended}/{conducted} ({subject_percentage:.2f}%)")
+        for subject, row in zip(self.subjects, projected):
+            print(f"  {subject.name}: {subject.attended}/{subject.conducted} ({subject.percentage:.2f}%) - "
+                  f"{projection.describe(row)}")
         
         # Display final results
         print(f"\nFINAL RESULTS:")
@@ -451,6 +1355,8 @@ class JainAttendanceChecker:
         print(f"Total Conducted: {total_conducted}")
         print(f"Total Attended: {total_attended}")
         
+        print(f"Outlook: {projection.describe(projected[-1])}")
+        
         # Attendance status using config thresholds
         if attendance_percentage >= config.GOOD_ATTENDANCE_THRESHOLD:
             print(f"✓ Attendance Status: GOOD (≥{config.GOOD_ATTENDANCE_THRESHOLD}%)")
@@ -463,58 +1369,364 @@ class JainAttendanceChecker:
         """
         Clean up resources and close the browser.
         """
+        if not self.driver:
+            return
         print("\nCleaning up...")
-        if self.driver:
+        try:
+            if self.rss_sampler is not None:
+                self.rss_sampler.__exit__(None, None, None)
+                self.metrics.event("memory", peak_rss=self.rss_sampler.peak)
+        except Exception as e:
+            log.debug("Memory sampler did not stop cleanly: %s", e)
+        finally:
+            self.rss_sampler = None
+        try:
             self.driver.quit()
+        except Exception as e:
+            # Expected after the watchdog killed a hung browser
+            log.debug("Browser did not quit cleanly: %s", e)
+        self.driver = None
         print("✓ Browser closed successfully")
     
+    def login(self):
+        """
+        Open the browser and reach the attendance page, restoring the saved
+        session when possible and falling back to the manual login.
+        """
+        # Headless runs need a session that is still valid, since login is manual
+        if self.headless and not (self.use_session and self.session.is_valid()):
+            print("⚠ No valid saved session - opening a visible browser for manual login")
+            self.headless = False
+        
+        # Step 1: Setup browser
+        with self.phase("setup_browser"):
+            self.setup_browser()
+        
+        if self.use_session:
+            with self.phase("restore_session"):
+                restored = self.restore_session()
+            if restored:
+                # Restoring the session already loaded the attendance page
+                self.save_session()
+                return
+        
+        # Step 2: Navigate to login page
+        with self.phase("navigate_to_login"):
+            self.navigate_to_login()
+        
+        # Step 3: Wait for manual login
+        with self.phase("manual_login"):
+            self.wait_for_manual_login()
+        self.save_session()
+        
+        # Step 4: Navigate to attendance page
+        with self.phase("page_load"):
+            self.navigate_to_attendance_page()
+    
     def run(self):
         """
         Main execution method that orchestrates the entire attendance checking process.
         """
+        # Deadlines only apply to budgeted or unattended runs; someone watching an
+        # interactive run is never cut short
+        if self.run_budget is not None or not self.interactive:
+            self.budget = Budget(self.run_budget)
+            self.watchdog.watch(self.budget)
+        else:
+            self.budget = None
         try:
             print("Starting Jain University Attendance Checker")
             print("=" * 45)
             
-            # Step 1: Setup browser
-            self.setup_browser()
-            
-            # Step 2: Navigate to login page
-            self.navigate_to_login()
-            
-            # Step 3: Wait for manual login
-            self.wait_for_manual_login()
-            
-            # Step 4: Navigate to attendance page
-            self.navigate_to_attendance_page()
+            if self.engine == "http" and self.use_session and self.extract_http_with_metrics():
+                # The saved session was enough - no browser needed
+                pass
+            else:
+                # Steps 1-4: Open a browser, log in and load the attendance page
+                self.login()
+                
+                # Step 5: Extract attendance data
+                if self.engine == "http":
+                    # Hand the fresh session over to the HTTP engine and free the browser
+                    self.cleanup()
+                    self.extract_http_with_metrics()
+                else:
+                    with self.phase("extract"):
+                        self.extract_attendance_data()
+                    if self.metrics_format:
+                        self.record_page_stats()
             
-            # Step 5: Extract attendance data
-            self.extract_attendance_data()
+            self.save_snapshot()
             
             # Step 6: Calculate and display results
-            self.calculate_and_display_results()
+            with self.phase("results"):
+                self.calculate_and_display_results()
+                self.save_history()
+                self.export_results()
+            self.finish_checkpoint(completed=True)
             
         except KeyboardInterrupt:
             print("\n\nProcess interrupted by user")
+            self.finish_checkpoint(completed=False)
+        except BudgetExceeded as e:
+            print(f"\n✗ {e} - stopping")
+            self.metrics.event("timeout", phase=e.phase, budget=e.budget, killed=0)
+            self.finish_checkpoint(completed=False)
         except Exception as e:
-            print(f"\n✗ An error occurred: {str(e)}")
+            if self.watchdog.expired is not None:
+                # The watchdog killed the browser, which failed the command that was hanging
+                print(f"\n✗ {self.watchdog.expired} - the browser stopped responding")
+            else:
+                print(f"\n✗ An error occurred: {str(e)}")
+            self.finish_checkpoint(completed=False)
         finally:
-            # Always cleanup
+            # Always cleanup; the watchdog still bounds a browser that hangs on quit
             self.cleanup()
+            self.watchdog.stop()
+            if self.history is not None:
+                self.history.close()
+            self.selectors.save()
+            self.report_metrics()
+    
+    def export_results(self):
+        """
+        Write this run's subject records to the export file, if one was requested.
+        """
+        if not self.export_path or not self.subjects:
+            return
+        from export import open_exporter
+        
+        with open_exporter(self.export_path) as exporter:
+            exporter.write(self.session.student_id, self.subjects)
+        print(f"✓ Results exported to {self.export_path}")
+    
+    def extract_http_with_metrics(self):
+        """
+        Run the HTTP engine inside a timed "extract" phase.
+        
+        Returns:
+            bool: True if the saved session was valid and the page was read
+        """
+        with self.phase("extract"):
+            return self.extract_attendance_data_http()
+    
+    def report_metrics(self):
+        """
+        Emit the collected metrics in the format requested on the command line.
+        """
+        if not self.metrics_format:
+            return
+        if self.metrics_file:
+            with open(self.metrics_file, "w") as metrics_file:
+                self.write_metrics(metrics_file)
+            print(f"✓ Metrics written to {self.metrics_file}")
+        else:
+            self.write_metrics(sys.stdout)
+    
+    def write_metrics(self, stream):
+        """
+        Write the metrics as JSON lines or as a summary table.
+        """
+        if self.metrics_format == "json":
+            self.metrics.write_json_lines(stream)
+        else:
+            self.metrics.print_summary(stream)
 
 
-def main():
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Jain University Attendance Checker")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("--last", action="store_true",
+                        help="print the results stored by the last run and exit, without a browser")
+    parser.add_argument("--offline", action="store_true",
+                        help="never download ChromeDriver; use the cached driver or one on PATH")
+    parser.add_argument("--show-driver-cache", action="store_true",
+                        help="print the cached ChromeDriver entries and exit")
+    parser.add_argument("--clear-driver-cache", action="store_true",
+                        help="remove the cached ChromeDriver entries and exit")
+    parser.add_argument("--student", default="default",
+                        help="name of the saved session to use (default: %(default)s)")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a visible browser when a saved session is still valid")
+    parser.add_argument("--fresh-login", action="store_true",
+                        help="discard the saved session and log in manually")
+    parser.add_argument("--no-session", action="store_true",
+                        help="neither use nor save a session")
+    parser.add_argument("--engine", choices=("selenium", "http"), default=config.EXTRACTION_ENGINE,
+                        help="read the attendance page with Chrome or over plain HTTP "
+                             "with the saved session (default: %(default)s)")
+    parser.add_argument("--backend", choices=("selenium", "cdp"), default=config.BROWSER_BACKEND,
+                        help="drive Chrome through ChromeDriver, or directly over the DevTools "
+                             "protocol without ChromeDriver (default: %(default)s)")
+    parser.add_argument("--no-history", action="store_true",
+                        help="do not read or store attendance history")
+    parser.add_argument("--full", action="store_true",
+                        help="expand and read every subject, even if unchanged since the last run")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="start over instead of resuming an interrupted run")
+    parser.add_argument("--capture", action="store_true",
+                        help="save the page and every expanded panel as a snapshot bundle "
+                             "for offline re-parsing with snapshots.py")
+    parser.add_argument("--budget", type=float, metavar="SECONDS", default=config.RUN_BUDGET,
+                        help="stop the run, and kill a hung browser, after this many seconds; also "
+                             "holds each phase to PHASE_BUDGETS (default: no limit)")
+    parser.add_argument("--non-interactive", action="store_true",
+                        help="never prompt: wait at most LOGIN_WAIT_TIMEOUT seconds for a manual "
+                             "login instead of asking to press Enter, and hold each phase to "
+                             "PHASE_BUDGETS")
+    parser.add_argument("--trend", metavar="SUBJECT",
+                        help="print the stored history of one subject and exit")
+    parser.add_argument("--delta", action="store_true",
+                        help="print the change since the previous run and exit")
+    parser.add_argument("--lean", action="store_true", default=config.LEAN_MODE,
+                        help="block images, fonts, media and trackers, stop waiting at DOM ready "
+                             "and use memory-saving Chrome flags")
+    parser.add_argument("--upcoming", type=int, metavar="N",
+                        help="project skips and required classes over N more classes per subject "
+                             "instead of open-ended")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep the session warm, refresh on a schedule and serve the results "
+                             "as JSON on a local port")
+    parser.add_argument("--interval", type=float, default=config.DAEMON_REFRESH_INTERVAL,
+                        help="daemon refresh interval in seconds (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=config.DAEMON_PORT,
+                        help="daemon query port (default: %(default)s)")
+    parser.add_argument("--export", metavar="FILE",
+                        help="write the subject records to a .jsonl, .csv, .parquet or .arrow file")
+    parser.add_argument("--metrics", choices=("json", "table"),
+                        help="record phase timings, WebDriver commands and selector hits, "
+                             "and emit them as JSON lines or a summary table")
+    parser.add_argument("--metrics-file",
+                        help="write the metrics to this file instead of the console")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true",
+                           help="only log warnings and errors during extraction")
+    verbosity.add_argument("-v", "--verbose", action="store_true",
+                           help="log every selector strategy and element during extraction")
+    return parser.parse_args(argv)
+
+
+def show_history(student_id, subject=None, delta=False):
+    """
+    Print stored history without opening a browser.
+    
+    Args:
+        student_id (str): The student
+        subject (str): Print the trend of this subject
+        delta (bool): Print the change since the previous run
+    """
+    history = HistoryStore()
+    try:
+        if subject:
+            print(f"History of {subject}:")
+            for snapshot in history.trend(student_id, subject):
+                taken = time.strftime("%Y-%m-%d %H:%M", time.localtime(snapshot["taken_at"]))
+                conducted = snapshot["conducted"]
+                percentage = snapshot["attended"] / conducted * 100 if conducted else 0
+                print(f"  {taken}  {snapshot['attended']}/{conducted} ({percentage:.2f}%)")
+        if delta:
+            print("Change since the previous run:")
+            for change in history.delta_since_last_run(student_id):
+                print(f"  {change['subject']}: +{change['attended_change']} attended, "
+                      f"+{change['conducted_change']} conducted "
+                      f"(now {change['attended']}/{change['conducted']})")
+    finally:
+        history.close()
+
+
+def show_last(student_id):
+    """
+    Print the results stored by the last run without opening a browser.
+    
+    Args:
+        student_id (str): The student
+    """
+    history = HistoryStore()
+    try:
+        snapshots = history.latest(student_id)
+    finally:
+        history.close()
+    if not snapshots:
+        print(f"No stored results for {student_id} - run the checker first")
+        return
+    
+    checker = JainAttendanceChecker(student_id=student_id, use_history=False)
+    checker.subjects = [SubjectRecord.from_dict(snapshot, source="history") for snapshot in snapshots.values()]
+    taken = time.strftime("%Y-%m-%d %H:%M", time.localtime(max(s["taken_at"] for s in snapshots.values())))
+    print(f"Last results for {student_id} ({taken}):")
+    checker.calculate_and_display_results()
+
+
+def main(argv=None):
     """
     Entry point of the application.
     Creates an instance of JainAttendanceChecker and runs it.
     """
+    args = parse_args(argv)
+    configure_logging(-1 if args.quiet else 1 if args.verbose else 0)
+    
+    if args.show_driver_cache:
+        print(driver_cache.describe_cache())
+        return
+    if args.clear_driver_cache:
+        if driver_cache.clear_cache():
+            print("✓ ChromeDriver cache cleared")
+        else:
+            print("ChromeDriver cache is already empty")
+        return
+    
+    if args.last:
+        show_last(args.student)
+        return
+    
+    if args.trend or args.delta:
+        show_history(args.student, args.trend, args.delta)
+        return
+    
+    if args.daemon:
+        from daemon import run_daemon
+        run_daemon(args)
+        return
+    
+    if args.export:
+        # Fail on a bad export file now, not after the login and the extraction
+        from export import ExportError, check_export_path
+        try:
+            check_export_path(args.export)
+        except ExportError as e:
+            print(f"✗ {e}")
+            return
+    
     print("Jain University Attendance Checker")
     print("==================================")
     print("This tool will help you check your attendance automatically.")
     print("Make sure you have your login credentials ready.\n")
     
     # Create and run the attendance checker
-    checker = JainAttendanceChecker()
+    checker = JainAttendanceChecker(
+        offline=args.offline,
+        student_id=args.student,
+        headless=args.headless,
+        use_session=not args.no_session,
+        engine=args.engine,
+        metrics_format=args.metrics,
+        metrics_file=args.metrics_file,
+        use_history=not args.no_history,
+        incremental=not args.full,
+        upcoming=args.upcoming,
+        lean=args.lean,
+        export_path=args.export,
+        resume=not args.no_resume,
+        capture=args.capture,
+        backend=args.backend,
+        budget=args.budget,
+        interactive=not args.non_interactive,
+    )
+    if args.fresh_login:
+        checker.session.clear()
     checker.run()
 
 
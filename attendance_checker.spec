@@ -30,6 +30,7 @@ a = Analysis(
         'urllib3',
         'charset_normalizer',
         'idna',
+        'psutil',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,81 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""
+PyInstaller spec file for Jain University Attendance Checker - fast-start build
+Builds a onedir bundle: nothing is unpacked to a temporary directory at launch and
+UPX is off, so --help, --version and --last start almost as fast as from source.
+Selenium and requests are still bundled but only imported when a browser or the
+HTTP engine is used.
+
+Build with:  pyinstaller attendance_checker_onedir.spec --clean
+Output:      dist/JainAttendanceChecker/JainAttendanceChecker
+"""
+
+block_cipher = None
+
+a = Analysis(
+    ['attendance_checker.py'],
+    pathex=[],
+    binaries=[],
+    datas=[
+        ('config.py', '.'),
+    ],
+    hiddenimports=[
+        'selenium',
+        'selenium.webdriver',
+        'selenium.webdriver.chrome',
+        'selenium.webdriver.chrome.service',
+        'selenium.webdriver.chrome.options',
+        'selenium.webdriver.common.by',
+        'selenium.webdriver.support.ui',
+        'selenium.webdriver.support.expected_conditions',
+        'selenium.common.exceptions',
+        'webdriver_manager',
+        'webdriver_manager.chrome',
+        'requests',
+        'certifi',
+        'urllib3',
+        'charset_normalizer',
+        'idna',
+        'psutil',
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['tkinter', 'unittest', 'pydoc', 'doctest'],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='JainAttendanceChecker',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='JainAttendanceChecker',
+)
@@ -0,0 +1,177 @@
+"""
+Attendance Text Parser
+======================
+
+Parses the conducted and attended texts of one subject into typed counts. The attended
+text is the breakdown the portal shows, e.g. "P-12/E-1/L-0/MCR-0/R-0/Total-13"; it is
+read in one pass into every component, not just the total. A bare number, which older
+pages show instead of a breakdown, is read as the Total with no components.
+
+Malformed input is reported with a ParseError naming the field and the reason instead of
+guessing a number from whatever the text holds. With config.STRICT_BREAKDOWN the counts
+are also checked for consistency: the components must add up to Total, and Total may not
+exceed the classes conducted; a bare Total has no components to add up.
+
+All patterns are compiled once at import. parse_batch() parses a list of raw text pairs
+and returns the errors in place, so harvests and snapshot replays parse every row in one
+call.
+
+Usage:
+    counts = parse_subject("40", "P-31/E-4/L-1/MCR-0/R-0/Total-36")
+    counts.attended, counts.breakdown.E      # 36, 4
+"""
+
+import re
+from collections import namedtuple
+
+import config
+from records import BREAKDOWN_KEYS
+
+
+COMPONENTS = BREAKDOWN_KEYS[:-1]
+
+# The portal's own format, matched with a single call
+CANONICAL_PATTERN = re.compile(r"\s*P-(\d+)/E-(\d+)/L-(\d+)/MCR-(\d+)/R-(\d+)/Total-(\d+)\s*")
+
+# One component of any other layout: any order and case, "-", "=" or ":" before the count,
+# and "/", ",", ";", "|" or whitespace between components
+COMPONENT_PATTERN = re.compile(r"\s*(P|E|L|MCR|R|Total)\s*[-=:]\s*(\d+)\s*(?:[/,;|]\s*)?", re.IGNORECASE)
+
+CONDUCTED_PATTERN = re.compile(r"\s*(\d+)\s*")
+
+# An attended text that is only the Total
+PLAIN_TOTAL_PATTERN = CONDUCTED_PATTERN
+
+Breakdown = namedtuple("Breakdown", BREAKDOWN_KEYS)
+
+Counts = namedtuple("Counts", ("conducted", "attended", "breakdown"))
+
+
+class ParseError(ValueError):
+    """
+    Raised when a conducted or attended text is malformed or inconsistent.
+
+    Attributes:
+        field (str): "conducted" or "attended"
+        text (str): The offending text
+        reason (str): What is wrong with it
+    """
+
+    def __init__(self, field, text, reason):
+        super().__init__(f"{field} text {text!r}: {reason}")
+        self.field = field
+        self.text = text
+        self.reason = reason
+
+
+def parse_conducted(text):
+    """
+    Parse a conducted text, which holds a single number.
+
+    Returns:
+        int: The classes conducted
+
+    Raises:
+        ParseError: If the text is not a single number
+    """
+    match = CONDUCTED_PATTERN.fullmatch(text or "")
+    if match is None:
+        raise ParseError("conducted", text, "expected a single number")
+    return int(match.group(1))
+
+
+def _scan_components(text):
+    values = {}
+    position, end = 0, len(text)
+    while position < end:
+        match = COMPONENT_PATTERN.match(text, position)
+        if match is None:
+            if text[position:].isspace():
+                break
+            raise ParseError("attended", text, f"unexpected {text[position:position + 12]!r} at position {position}")
+        name, value = match.groups()
+        key = "Total" if name.lower() == "total" else name.upper()
+        if key in values:
+            raise ParseError("attended", text, f"{key} appears more than once")
+        values[key] = int(value)
+        position = match.end()
+
+    if "Total" not in values:
+        raise ParseError("attended", text, "no Total" if values else "no breakdown")
+    # Components the portal leaves out count as zero
+    return tuple(values.get(key, 0) for key in BREAKDOWN_KEYS)
+
+
+def parse_breakdown(text, strict=None):
+    """
+    Parse an attended breakdown into its components.
+
+    Args:
+        text (str): e.g. "P-12/E-1/L-0/MCR-0/R-0/Total-13", or a bare Total such as "13"
+        strict (bool): Require the components to add up to Total,
+                       defaults to config.STRICT_BREAKDOWN
+
+    Returns:
+        Breakdown: P, E, L, MCR, R and Total as ints; for a bare Total the components are None
+
+    Raises:
+        ParseError: If the text is malformed or, when strict, inconsistent
+    """
+    text = text or ""
+    match = PLAIN_TOTAL_PATTERN.fullmatch(text)
+    if match is not None:
+        return Breakdown(*(None,) * len(COMPONENTS), int(match.group(1)))
+    match = CANONICAL_PATTERN.fullmatch(text)
+    breakdown = Breakdown._make(map(int, match.groups()) if match else _scan_components(text))
+
+    if config.STRICT_BREAKDOWN if strict is None else strict:
+        components = breakdown.P + breakdown.E + breakdown.L + breakdown.MCR + breakdown.R
+        if components != breakdown.Total:
+            raise ParseError("attended", text, f"components add up to {components}, not Total {breakdown.Total}")
+    return breakdown
+
+
+def parse_subject(conducted_text, attended_text, strict=None):
+    """
+    Parse the conducted and attended texts of one subject.
+
+    Args:
+        conducted_text (str): e.g. "40"
+        attended_text (str): e.g. "P-31/E-4/L-1/MCR-0/R-0/Total-36"
+        strict (bool): Check the counts for consistency, defaults to config.STRICT_BREAKDOWN
+
+    Returns:
+        Counts: conducted, attended (the breakdown Total) and the Breakdown
+
+    Raises:
+        ParseError: If either text is malformed or, when strict, the counts are inconsistent
+    """
+    strict = config.STRICT_BREAKDOWN if strict is None else strict
+    conducted = parse_conducted(conducted_text)
+    breakdown = parse_breakdown(attended_text, strict)
+    if strict and breakdown.Total > conducted:
+        raise ParseError("attended", attended_text,
+                         f"Total {breakdown.Total} exceeds the {conducted} classes conducted")
+    return Counts(conducted, breakdown.Total, breakdown)
+
+
+def parse_batch(pairs, strict=None):
+    """
+    Parse many subjects at once.
+
+    Args:
+        pairs (iterable): (conducted_text, attended_text) pairs
+        strict (bool): Check the counts for consistency, defaults to config.STRICT_BREAKDOWN
+
+    Returns:
+        list: One Counts per pair, or the ParseError for a pair that could not be parsed
+    """
+    strict = config.STRICT_BREAKDOWN if strict is None else strict
+    results = []
+    append = results.append
+    for conducted_text, attended_text in pairs:
+        try:
+            append(parse_subject(conducted_text, attended_text, strict))
+        except ParseError as e:
+            append(e)
+    return results
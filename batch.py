@@ -0,0 +1,390 @@
+"""
+Batch Attendance Checker
+========================
+
+Checks attendance for a whole roster of students using their saved sessions.
+
+Instead of one Chrome per student, each worker process starts a single headless Chrome
+and serves its share of the roster from a bounded pool of isolated browser contexts
+(one per student, created over the DevTools protocol). The attendance pages of all
+contexts in the pool load in parallel while the worker harvests them one at a time.
+The roster is sharded round-robin across worker processes to use multiple cores.
+
+Usage:
+    python batch.py roster.csv --workers 4 --contexts 3 --output results.json
+
+The roster is a CSV file with a student_id column, or a JSON list of student ids.
+Students need a saved session from a previous interactive run (--student <id>).
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+import config
+from attendance_checker import DOM_HELPERS_SCRIPT, JainAttendanceChecker
+from export import open_exporter
+from instrumentation import configure_logging
+from run_budget import Budget, Watchdog
+from session_store import SessionStore, is_login_url, to_cdp_cookie
+
+
+# A tab opened in the background is harvested only once its attendance page has fully
+# loaded and no postback is running.
+PAGE_LOADED_SCRIPT = DOM_HELPERS_SCRIPT + """
+return location.href !== "about:blank" && document.readyState === "complete" && pageIdle();
+"""
+
+
+def load_roster(path):
+    """
+    Load student ids from a CSV or JSON roster.
+
+    Args:
+        path (str): Path to the roster file
+
+    Returns:
+        list: Student ids in roster order
+    """
+    with open(path, newline="") as roster_file:
+        if path.lower().endswith(".json"):
+            entries = json.load(roster_file)
+            return [entry["student_id"] if isinstance(entry, dict) else str(entry) for entry in entries]
+        return [row["student_id"].strip() for row in csv.DictReader(roster_file) if row.get("student_id")]
+
+
+def shard(student_ids, workers):
+    """
+    Split the roster round-robin into one shard per worker.
+
+    Args:
+        student_ids (list): The roster
+        workers (int): Number of worker processes
+
+    Returns:
+        list: Non-empty lists of student ids
+    """
+    shards = [student_ids[i::workers] for i in range(workers)]
+    return [ids for ids in shards if ids]
+
+
+class BrowserContextPool:
+    """
+    Isolated browser contexts inside one Chrome, one per student in flight.
+
+    Falls back to a single shared context with cookies cleared between students if
+    this Chrome does not allow creating browser contexts.
+    """
+
+    def __init__(self, driver, size):
+        self.driver = driver
+        self.size = size
+        self.home_handle = driver.current_window_handle
+        try:
+            context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+            driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+            self.isolated = True
+        except WebDriverException:
+            print("⚠ Browser contexts unavailable - students will share one context sequentially")
+            self.isolated = False
+            self.size = 1
+
+    def open(self, student_id, cookies):
+        """
+        Create a context for a student and start loading their attendance page.
+
+        Args:
+            student_id (str): The student
+            cookies (list): The student's saved cookies
+
+        Returns:
+            dict: The slot describing the student's context and tab
+        """
+        slot = {"student_id": student_id, "context_id": None, "handle": self.home_handle}
+        cdp_cookies = [to_cdp_cookie(cookie) for cookie in cookies]
+
+        if not self.isolated:
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": cdp_cookies})
+            self.driver.switch_to.window(self.home_handle)
+            self.driver.execute_script("window.location.href = arguments[0];", config.ATTENDANCE_URL)
+            return slot
+
+        context_id = self.driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        slot["context_id"] = context_id
+        self.driver.execute_cdp_cmd("Storage.setCookies", {"cookies": cdp_cookies, "browserContextId": context_id})
+        # Target ids double as WebDriver window handles
+        slot["handle"] = self.driver.execute_cdp_cmd(
+            "Target.createTarget", {"url": config.ATTENDANCE_URL, "browserContextId": context_id}
+        )["targetId"]
+        return slot
+
+    def activate(self, slot):
+        """
+        Make the student's tab the one WebDriver commands go to.
+        """
+        self.driver.switch_to.window(slot["handle"])
+
+    def close(self, slot):
+        """
+        Close the student's tab and dispose of their context.
+        """
+        if not slot["context_id"]:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": slot["handle"]})
+            self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": slot["context_id"]})
+        except WebDriverException:
+            pass
+        self.driver.switch_to.window(self.home_handle)
+
+
+def _summarize(student_id, status, attempts, elapsed, checker=None, error=None):
+    result = {
+        "student_id": student_id,
+        "status": status,
+        "attempts": attempts,
+        "elapsed": round(elapsed, 3),
+        "error": error,
+        "subjects": [],
+    }
+    if checker is not None and status == "ok":
+        total_conducted = sum(subject.conducted for subject in checker.subjects)
+        total_attended = sum(subject.attended for subject in checker.subjects)
+        result["subjects"] = list(checker.subjects)
+        result["total_conducted"] = total_conducted
+        result["total_attended"] = total_attended
+        result["percentage"] = round(total_attended / total_conducted * 100, 2) if total_conducted else 0
+    return result
+
+
+def run_shard(student_ids, contexts, timeout, retries, offline=False, results_queue=None):
+    """
+    Check a shard of students with one Chrome and a pool of browser contexts.
+    Runs inside a worker process.
+
+    A watchdog gives every harvest its time limit plus config.WATCHDOG_GRACE seconds. If
+    Chrome hangs past that, it is killed, the student is recorded as a timeout (or
+    retried), and a fresh Chrome takes over the rest of the shard, so one hung browser
+    never holds up the worker.
+
+    Args:
+        student_ids (list): Students in this shard
+        contexts (int): Maximum number of contexts in flight
+        timeout (float): Per-student time limit in seconds
+        retries (int): Extra attempts for students that fail
+        offline (bool): Never download ChromeDriver
+        results_queue (Queue): Receives each student's result as soon as it is known;
+                               the results are then not returned
+
+    Returns:
+        list: One result dict per student, empty when results_queue is given
+    """
+    configure_logging(-1)
+    # The context pool switches between tabs by WebDriver window handle, which the CDP
+    # backend does not have, so batch workers always drive Chrome through Selenium
+    checker = JainAttendanceChecker(offline=offline, headless=True, use_session=False, use_history=False,
+                                    interactive=False, backend="selenium")
+    watchdog = Watchdog(checker.kill_browser)
+    results = []
+    queue = [(student_id, 1) for student_id in student_ids]
+
+    def report(result):
+        if results_queue is not None:
+            results_queue.put(result)
+        else:
+            results.append(result)
+
+    try:
+        checker.setup_browser()
+        pool = BrowserContextPool(checker.driver, contexts)
+        in_flight = []
+
+        while queue or in_flight:
+            # Fill the pool so the next pages load while the current one is harvested
+            while queue and len(in_flight) < pool.size:
+                student_id, attempt = queue.pop(0)
+                cookies = SessionStore(student_id).load()
+                if not cookies:
+                    report(_summarize(student_id, "no_session", attempt, 0))
+                    continue
+                slot = pool.open(student_id, cookies)
+                slot.update(attempt=attempt, started=time.perf_counter())
+                in_flight.append(slot)
+            if not in_flight:
+                continue
+
+            slot = in_flight.pop(0)
+            student_id, attempt = slot["student_id"], slot["attempt"]
+            status, error = "failed", None
+            watchdog.watch(Budget(timeout, phases={}))
+            try:
+                pool.activate(slot)
+                checker.wait_for_script(max(timeout - (time.perf_counter() - slot["started"]), 1),
+                                        PAGE_LOADED_SCRIPT)
+                checker.extract_attendance_data_bulk(timeout=timeout)
+                if is_login_url(checker.driver.current_url):
+                    status = "expired"
+                elif checker.unread:
+                    # A partial result is not reported: the student is retried in full
+                    error = f"{len(checker.unread)} subject(s) could not be read"
+                elif checker.subjects:
+                    status = "ok"
+                else:
+                    error = "no subjects extracted"
+            except WebDriverException as e:
+                error = e.msg
+            except Exception:
+                # A browser killed by the watchdog fails with connection errors
+                if watchdog.expired is None:
+                    raise
+            finally:
+                expired = watchdog.release()
+            elapsed = time.perf_counter() - slot["started"]
+
+            if expired is not None:
+                status, error = "timeout", str(expired)
+                # Every tab went down with the browser: reload the other students in a new one
+                queue[:0] = [(other["student_id"], other["attempt"]) for other in in_flight]
+                in_flight = []
+                checker.cleanup()
+                checker.setup_browser()
+                pool = BrowserContextPool(checker.driver, contexts)
+            else:
+                pool.close(slot)
+
+            if status == "ok":
+                report(_summarize(student_id, status, attempt, elapsed, checker))
+            elif status == "expired":
+                report(_summarize(student_id, status, attempt, elapsed))
+            elif attempt > retries:
+                if status == "failed" and elapsed >= timeout:
+                    status = "timeout"
+                report(_summarize(student_id, status, attempt, elapsed, error=error))
+            else:
+                queue.append((student_id, attempt + 1))
+    finally:
+        watchdog.stop()
+        checker.cleanup()
+
+    return results
+
+
+def run_batch(student_ids, workers, contexts, timeout, retries, offline=False, exporter=None,
+              keep_subjects=True):
+    """
+    Check a roster of students across worker processes.
+
+    Workers send each student's result back as soon as it is known, so the exporter
+    receives it while the rest of the shard is still being checked.
+
+    Args:
+        student_ids (list): The roster
+        workers (int): Number of worker processes, each with one Chrome
+        contexts (int): Browser contexts per Chrome
+        timeout (float): Per-student time limit in seconds
+        retries (int): Extra attempts for students that fail
+        offline (bool): Never download ChromeDriver
+        exporter (Exporter): Receives each student's subject records as soon as the
+                             student has been checked
+        keep_subjects (bool): Keep the subjects in the returned results as dicts; turn
+                              off with an exporter to bound memory for large rosters
+
+    Returns:
+        list: One result dict per student, in roster order
+    """
+    shards = shard(student_ids, workers)
+    results = []
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        results_queue = manager.Queue()
+        futures = [executor.submit(run_shard, ids, contexts, timeout, retries, offline, results_queue)
+                   for ids in shards]
+        while len(results) < len(student_ids):
+            try:
+                result = results_queue.get(timeout=1)
+            except queue_module.Empty:
+                # A worker that crashed sends nothing more: surface its error
+                for future in futures:
+                    if future.done():
+                        future.result()
+                if all(future.done() for future in futures) and results_queue.empty():
+                    break
+                continue
+            if exporter is not None:
+                exporter.write(result["student_id"], result["subjects"])
+            result["subjects"] = [subject.to_dict() for subject in result["subjects"]] if keep_subjects else []
+            results.append(result)
+        for future in futures:
+            future.result()
+    order = {student_id: position for position, student_id in enumerate(student_ids)}
+    return sorted(results, key=lambda result: order.get(result["student_id"], len(order)))
+
+
+def print_summary(results, elapsed):
+    """
+    Print one line per student and the overall throughput.
+    """
+    print("\n" + "=" * 50)
+    print("BATCH RESULTS")
+    print("=" * 50)
+    for result in results:
+        if result["status"] == "ok":
+            print(f"  ✓ {result['student_id']}: {result['percentage']:.2f}% "
+                  f"({result['total_attended']}/{result['total_conducted']})")
+        else:
+            detail = f" - {result['error']}" if result.get("error") else ""
+            print(f"  ✗ {result['student_id']}: {result['status']}{detail}")
+
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    rate = len(results) / elapsed * 60 if elapsed > 0 else 0
+    print(f"\n{succeeded}/{len(results)} students checked in {elapsed:.1f}s ({rate:.1f} students/min)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check attendance for a roster of students")
+    parser.add_argument("roster", help="CSV with a student_id column, or a JSON list of student ids")
+    parser.add_argument("--workers", type=int, default=config.BATCH_WORKERS or os.cpu_count() or 1,
+                        help="worker processes, each running one Chrome")
+    parser.add_argument("--contexts", type=int, default=config.BATCH_CONTEXTS_PER_BROWSER,
+                        help="isolated browser contexts per Chrome (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=config.BATCH_STUDENT_TIMEOUT,
+                        help="seconds allowed per student (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=config.BATCH_RETRIES,
+                        help="extra attempts for failed students (default: %(default)s)")
+    parser.add_argument("--offline", action="store_true", help="never download ChromeDriver")
+    parser.add_argument("--output", help="write the aggregated results as JSON to this file")
+    parser.add_argument("--export", metavar="FILE",
+                        help="stream the subject records to a .jsonl, .csv, .parquet or .arrow file")
+    args = parser.parse_args()
+
+    student_ids = load_roster(args.roster)
+    print(f"Checking {len(student_ids)} students with {args.workers} worker(s), "
+          f"{args.contexts} context(s) each")
+
+    exporter = open_exporter(args.export) if args.export else None
+    started = time.perf_counter()
+    try:
+        results = run_batch(student_ids, args.workers, args.contexts, args.timeout, args.retries, args.offline,
+                            exporter, keep_subjects=bool(args.output) or exporter is None)
+    finally:
+        if exporter is not None:
+            exporter.close()
+    print_summary(results, time.perf_counter() - started)
+    if exporter is not None:
+        print(f"✓ {exporter.rows} subject records exported to {args.export}")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
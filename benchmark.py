@@ -0,0 +1,249 @@
+"""
+End-to-end Benchmark
+====================
+
+Drives JainAttendanceChecker against the synthetic stand-in portal (fake_portal.py)
+at several subject counts and reports wall time per phase, the number of WebDriver
+commands and the peak memory of the process tree (Python, chromedriver and Chrome).
+
+Save the JSON output to compare changes to the extraction loop across commits:
+    python benchmark.py --sizes 5 50 500 --json before.json
+    python benchmark.py --sizes 5 50 500 --json after.json --mode per_subject
+
+--startup instead measures how long the no-browser commands (--help, --version, --last)
+take to start, from source or from a built executable, against config.STARTUP_BUDGET_MS:
+    python benchmark.py --startup
+    python benchmark.py --startup --executable dist/JainAttendanceChecker/JainAttendanceChecker
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import config
+import fake_portal
+from attendance_checker import JainAttendanceChecker
+from instrumentation import PeakRssSampler, configure_logging
+
+
+DEFAULT_SIZES = (5, 50, 500)
+
+STARTUP_COMMANDS = (["--help"], ["--version"], ["--last"])
+
+# Modules that only the browser engine needs; none of them may load at startup
+HEAVY_MODULES = ("selenium", "webdriver_manager", "requests", "urllib3")
+
+
+def point_config_at(server):
+    """
+    Point the checker's URLs at a running stand-in portal.
+    """
+    config.LOGIN_URL = fake_portal.base_url(server)
+    config.ATTENDANCE_URL = fake_portal.base_url(server) + fake_portal.ATTENDANCE_PATH
+
+
+def _phase_report(metrics):
+    phases = {event["name"]: event["seconds"] for event in metrics.phases()}
+    commands = {event["name"]: event["commands"] for event in metrics.phases()}
+    return phases, commands
+
+
+def bench_selenium(subjects, mode, offline, lean=False):
+    """
+    Run one browser benchmark against a fresh synthetic portal.
+
+    Returns:
+        dict: Phase timings, command counts, page stats and extraction results
+    """
+    config.EXTRACTION_MODE = mode
+    checker = JainAttendanceChecker(offline=offline, headless=True, use_session=False, use_history=False,
+                                    lean=lean)
+    metrics = checker.metrics
+
+    try:
+        with metrics.phase("setup_browser"):
+            checker.setup_browser()
+        with metrics.phase("login"):
+            checker.driver.get(config.LOGIN_URL + "/?auto=1")
+        with metrics.phase("page_load"):
+            checker.navigate_to_attendance_page()
+        with metrics.phase("extract"):
+            checker.extract_attendance_data()
+        checker.record_page_stats()
+    finally:
+        checker.cleanup()
+
+    phases, commands = _phase_report(metrics)
+    commands["extract_latency"] = metrics.command_seconds
+    page = next((event for event in metrics.events if event["event"] == "page"), {})
+    return {"phases": phases, "commands": commands, "extracted": len(checker.subjects),
+            "page_bytes": page.get("bytes"), "dom_interactive_ms": page.get("dom_interactive_ms")}
+
+
+def bench_http(subjects):
+    """
+    Run one HTTP engine benchmark against a fresh synthetic portal.
+
+    Returns:
+        dict: Phase timings and extraction results
+    """
+    from http_engine import HttpAttendanceEngine
+
+    checker = JainAttendanceChecker(use_session=False, use_history=False)
+    engine = HttpAttendanceEngine({fake_portal.SESSION_COOKIE: "benchmark"})
+    try:
+        with checker.metrics.phase("extract"):
+            checker.store_harvested_rows(engine.harvest(), "http_engine")
+    finally:
+        engine.close()
+    phases, commands = _phase_report(checker.metrics)
+    return {"phases": phases, "commands": {}, "extracted": len(checker.subjects)}
+
+
+def run_benchmark(sizes, engine, mode, latency, offline, lean=False):
+    """
+    Benchmark each subject count against its own synthetic portal.
+
+    Returns:
+        list: One result dict per size
+    """
+    results = []
+    for size in sizes:
+        server = fake_portal.serve_synthetic(subjects=size, latency=latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        point_config_at(server)
+        try:
+            with PeakRssSampler() as sampler:
+                started = time.perf_counter()
+                if engine == "http":
+                    result = bench_http(size)
+                else:
+                    result = bench_selenium(size, mode, offline, lean)
+                result["total"] = time.perf_counter() - started
+        finally:
+            server.shutdown()
+            server.server_close()
+        result.update(subjects=size, engine=engine, mode=mode, lean=lean, peak_rss=sampler.peak)
+        results.append(result)
+    return results
+
+
+def bench_startup(executable=None, runs=10):
+    """
+    Time the no-browser commands from process start to exit.
+
+    Args:
+        executable (str): A built executable, defaults to running attendance_checker.py
+        runs (int): Runs per command
+
+    Returns:
+        list: One dict per command with the median and slowest time in milliseconds
+    """
+    base = [executable] if executable else [sys.executable, "attendance_checker.py"]
+    results = []
+    for arguments in STARTUP_COMMANDS:
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(base + arguments, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            timings.append((time.perf_counter() - started) * 1000)
+        results.append({"command": " ".join(arguments), "median_ms": statistics.median(timings),
+                        "max_ms": max(timings)})
+    return results
+
+
+def heavy_modules_at_import():
+    """
+    Return the browser-engine modules loaded by importing attendance_checker.
+    """
+    check = (f"import sys, attendance_checker; "
+             f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True).stdout
+    return output.split()
+
+
+def print_startup_report(results, budget):
+    """
+    Print the startup timings against the budget.
+
+    Returns:
+        bool: True if every command started within the budget
+    """
+    within = True
+    print(f"{'command':>14}  {'median (ms)':>12}  {'max (ms)':>10}")
+    for result in results:
+        mark = "✓" if result["median_ms"] <= budget else "✗"
+        within = within and result["median_ms"] <= budget
+        print(f"{result['command']:>14}  {result['median_ms']:>12.1f}  {result['max_ms']:>10.1f}  {mark}")
+    print(f"Startup budget: {budget} ms (median)")
+    return within
+
+
+def print_report(results):
+    """
+    Print the benchmark results as a table.
+    """
+    phase_names = []
+    for result in results:
+        phase_names.extend(name for name in result["phases"] if name not in phase_names)
+
+    header = ["subjects", "extracted"] + [f"{name} (s)" for name in phase_names] + \
+             ["total (s)", "commands", "page (KB)", "DOM (ms)", "peak RSS (MB)"]
+    print("  ".join(f"{column:>14}" for column in header))
+    for result in results:
+        row = [result["subjects"], result["extracted"]]
+        row += [f"{result['phases'].get(name, 0):.3f}" for name in phase_names]
+        page_bytes, dom_ms = result.get("page_bytes"), result.get("dom_interactive_ms")
+        row += [f"{result['total']:.3f}", result["commands"].get("extract", "-"),
+                f"{page_bytes / 1024:.1f}" if page_bytes is not None else "-",
+                f"{dom_ms:.0f}" if dom_ms is not None else "-",
+                f"{result['peak_rss'] / 1024 / 1024:.1f}" if result["peak_rss"] is not None else "-"]
+        print("  ".join(f"{value:>14}" for value in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark attendance extraction against a local portal")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="subject counts to benchmark (default: 5 50 500)")
+    parser.add_argument("--engine", choices=("selenium", "http"), default="selenium")
+    parser.add_argument("--mode", choices=("bulk", "per_subject"), default=config.EXTRACTION_MODE,
+                        help="extraction mode for the selenium engine")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each portal response")
+    parser.add_argument("--offline", action="store_true", help="never download ChromeDriver")
+    parser.add_argument("--lean", action="store_true",
+                        help="use the lean page-load profile for the selenium engine")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    parser.add_argument("--startup", action="store_true",
+                        help="measure the startup time of --help, --version and --last instead")
+    parser.add_argument("--executable", help="built executable to measure with --startup")
+    parser.add_argument("--runs", type=int, default=10, help="runs per command with --startup")
+    args = parser.parse_args()
+    configure_logging(-1)
+
+    if args.startup:
+        results = bench_startup(args.executable, args.runs)
+        within = print_startup_report(results, config.STARTUP_BUDGET_MS)
+        if not args.executable:
+            heavy = heavy_modules_at_import()
+            print(f"⚠ Loaded at import: {', '.join(heavy)}" if heavy else "✓ No browser modules loaded at import")
+            within = within and not heavy
+        if args.json:
+            with open(args.json, "w") as json_file:
+                json.dump(results, json_file, indent=2)
+        sys.exit(0 if within else 1)
+
+    results = run_benchmark(args.sizes, args.engine, args.mode, args.latency, args.offline, args.lean)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
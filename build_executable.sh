@@ -16,25 +16,36 @@ echo "Installing/updating dependencies..."
 pip install -r requirements.txt
 pip install pyinstaller
 
+# "./build_executable.sh --onedir" builds the fast-start variant
+SPEC="attendance_checker.spec"
+EXECUTABLE="dist/JainAttendanceChecker"
+if [ "$1" = "--onedir" ]; then
+    SPEC="attendance_checker_onedir.spec"
+    EXECUTABLE="dist/JainAttendanceChecker/JainAttendanceChecker"
+fi
+
 # Clean previous builds
 echo "Cleaning previous builds..."
 rm -rf build/ dist/ __pycache__/
 
 # Build the executable
 echo "Building executable..."
-pyinstaller attendance_checker.spec --clean
+pyinstaller "$SPEC" --clean
 
 # Check if build was successful
-if [ -d "dist" ] && [ -f "dist/JainAttendanceChecker" ]; then
+if [ -d "dist" ] && [ -f "$EXECUTABLE" ]; then
     echo ""
     echo "✅ Build successful!"
-    echo "Executable created at: dist/JainAttendanceChecker"
+    echo "Executable created at: $EXECUTABLE"
     echo ""
     echo "File size:"
-    ls -lh dist/JainAttendanceChecker
+    ls -lh "$EXECUTABLE"
     echo ""
     echo "To run the executable:"
-    echo "  ./dist/JainAttendanceChecker"
+    echo "  ./$EXECUTABLE"
+    echo ""
+    echo "To check the startup time:"
+    echo "  python benchmark.py --startup --executable $EXECUTABLE"
     echo ""
     echo "To distribute:"
     echo "  Copy the entire 'dist' folder to target machine"
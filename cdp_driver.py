@@ -0,0 +1,661 @@
+"""
+Chrome DevTools Protocol Driver
+===============================
+
+Drives Chrome directly over the DevTools protocol instead of through chromedriver. Every
+Selenium command is an HTTP request to chromedriver, which then talks to Chrome; this
+backend launches Chrome itself and sends the protocol messages over one websocket, so
+there is no chromedriver binary to download and one hop less per command.
+
+The websocket runs on an asyncio event loop in a background thread. Commands are sent
+without waiting for the previous reply, so independent commands can be pipelined, and
+page loads and waits are signalled by protocol events and in-page observers instead of
+being polled from Python.
+
+CdpDriver implements the part of the Selenium WebDriver API the checker uses, raising the
+same exceptions, so the extraction code runs unchanged on either backend.
+
+Usage:
+    driver = CdpDriver(["--headless=new"])
+    driver.get(config.ATTENDANCE_URL)
+    rows = driver.execute_script("return document.title;")
+    driver.quit()
+"""
+
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import (JavascriptException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException,
+                                        WebDriverException)
+
+import config
+import driver_cache
+
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Locator types of the Selenium API, translated by the FIND_SCRIPT below
+FIND_SCRIPT = """
+var by = arguments[0], value = arguments[1];
+if (by === "xpath") {
+    var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) {
+        nodes.push(snapshot.snapshotItem(i));
+    }
+    return nodes;
+}
+var selector = by === "id" ? "[id='" + value + "']" : by === "name" ? "[name='" + value + "']" : value;
+return Array.prototype.slice.call(document.querySelectorAll(selector));
+"""
+
+# Wraps an injected script. Elements cross the protocol as {"__node": id} handles kept in a
+# per-document registry, so results come back by value in a single round trip; a handle
+# whose element was removed from the page is reported as stale, as Selenium does.
+SCRIPT_PRELUDE = """
+var registry = window.__attendanceNodes || (window.__attendanceNodes = {next: 1, nodes: {}});
+function unwrap(value) {
+    if (value && typeof value === "object") {
+        if (value.__node) {
+            var node = registry.nodes[value.__node];
+            if (!node || !node.isConnected) {
+                throw new Error("stale element reference: " + value.__node);
+            }
+            return node;
+        }
+        if (Array.isArray(value)) {
+            return value.map(unwrap);
+        }
+        var plain = {};
+        for (var key in value) {
+            plain[key] = unwrap(value[key]);
+        }
+        return plain;
+    }
+    return value;
+}
+function wrap(value) {
+    if (value instanceof Node) {
+        var id = registry.next++;
+        registry.nodes[id] = value;
+        return {__node: id};
+    }
+    if (value instanceof NodeList || value instanceof HTMLCollection || Array.isArray(value)) {
+        return Array.prototype.map.call(value, wrap);
+    }
+    if (value && typeof value === "object") {
+        var plain = {};
+        for (var key in value) {
+            plain[key] = wrap(value[key]);
+        }
+        return plain;
+    }
+    return value === undefined ? null : value;
+}
+"""
+
+SYNC_RUNNER = """
+return wrap(run.apply(null, unwrap(args)));
+"""
+
+# execute_async_script: the script receives a callback as its last argument
+ASYNC_RUNNER = """
+return new Promise(function (resolve, reject) {
+    var timer = setTimeout(function () { reject(new Error("script timeout")); }, timeoutMs);
+    var callArgs = unwrap(args);
+    callArgs.push(function (value) {
+        clearTimeout(timer);
+        resolve(wrap(value));
+    });
+    run.apply(null, callArgs);
+});
+"""
+
+# wait_until: re-evaluates the script whenever the DOM changes, plus a slow timer for state
+# that changes without a mutation (e.g. a finished XHR), and resolves on the first truthy value
+WAIT_RUNNER = """
+return new Promise(function (resolve) {
+    var callArgs = unwrap(args);
+    var done = false;
+    var observer = new MutationObserver(check);
+    var poll = setInterval(check, 100);
+    var timer = setTimeout(function () { finish(null); }, timeoutMs);
+    function finish(value) {
+        done = true;
+        observer.disconnect();
+        clearInterval(poll);
+        clearTimeout(timer);
+        resolve(value);
+    }
+    function check() {
+        if (done) {
+            return;
+        }
+        var value = null;
+        try {
+            value = run.apply(null, callArgs);
+        } catch (e) {
+            value = null;
+        }
+        if (value) {
+            finish(wrap(value));
+        }
+    }
+    observer.observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+    check();
+});
+"""
+
+
+class CdpError(WebDriverException):
+    """Raised when Chrome answers a protocol command with an error."""
+
+
+class WebSocket:
+    """
+    Minimal client side of RFC 6455 on asyncio streams: text messages, ping and close.
+    The DevTools endpoint is local and unencrypted, so nothing more is needed.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url):
+        parts = urlsplit(url)
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80, limit=2 ** 26)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((
+            f"GET {parts.path or '/'} HTTP/1.1\r\n"
+            f"Host: {parts.hostname}:{parts.port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        response = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        if " 101 " not in response.split("\r\n", 1)[0] or accept not in response:
+            writer.close()
+            raise ConnectionError(f"DevTools websocket handshake failed: {response.splitlines()[0]}")
+        return cls(reader, writer)
+
+    async def _write_frame(self, opcode, payload):
+        # Client frames are always masked
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, length)
+        mask = os.urandom(4)
+        if length:
+            key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+            payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+        self.writer.write(header + mask + payload)
+        await self.writer.drain()
+
+    async def send(self, text):
+        await self._write_frame(0x1, text.encode())
+
+    async def recv(self):
+        """
+        Return the next text message, answering pings on the way.
+
+        Raises:
+            ConnectionError: When Chrome closes the connection
+        """
+        chunks = []
+        while True:
+            first, second = await self.reader.readexactly(2)
+            opcode, length = first & 0x0F, second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            payload = await self.reader.readexactly(length)
+            if opcode == 0x8:
+                raise ConnectionError("DevTools websocket closed")
+            if opcode == 0x9:
+                await self._write_frame(0xA, payload)
+                continue
+            if opcode in (0x0, 0x1, 0x2):
+                chunks.append(payload)
+                if first & 0x80:
+                    return b"".join(chunks).decode()
+
+    async def close(self):
+        try:
+            await self._write_frame(0x8, b"")
+        except (ConnectionError, RuntimeError):
+            pass
+        self.writer.close()
+
+
+class CdpConnection:
+    """
+    One websocket to the browser, shared by every attached page session.
+    Replies are matched to commands by id, so any number of commands can be in flight.
+    """
+
+    def __init__(self, url, timeout=None):
+        self.timeout = timeout or config.WAIT_TIMEOUT
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="cdp", daemon=True)
+        self._thread.start()
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = []
+        self._disconnected = None
+        self.websocket = self._run(WebSocket.connect(url))
+        self._reader = asyncio.run_coroutine_threadsafe(self._read_loop(), self.loop)
+
+    def _run(self, coroutine, timeout=None):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout or self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutException("No reply from Chrome over the DevTools protocol")
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = json.loads(await self.websocket.recv())
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CdpError(message["error"].get("message", "protocol error")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                    continue
+                for listener in list(self._listeners):
+                    method, session_id, future = listener
+                    if message.get("method") == method and message.get("sessionId") == session_id:
+                        self._listeners.remove(listener)
+                        if not future.done():
+                            future.set_result(message.get("params", {}))
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self._fail(f"Chrome disconnected: {e}")
+        except Exception as e:
+            # A message the reader cannot handle leaves no way to match later replies
+            self._fail(f"DevTools connection failed: {e!r}")
+
+    def _fail(self, reason):
+        # Later commands fail at once instead of waiting for a reply that cannot come
+        self._disconnected = WebDriverException(reason)
+        for future in list(self._pending.values()) + [listener[2] for listener in self._listeners]:
+            if not future.done():
+                future.set_exception(WebDriverException(reason))
+        self._pending.clear()
+        self._listeners.clear()
+
+    async def _send(self, method, params, session_id):
+        if self._disconnected is not None:
+            raise self._disconnected
+        message_id = next(self._ids)
+        future = self.loop.create_future()
+        self._pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        await self.websocket.send(json.dumps(message))
+        return future
+
+    async def _call_many(self, commands, session_id):
+        # Every command is written before the first reply is awaited
+        futures = [await self._send(method, params, session_id) for method, params in commands]
+        return await asyncio.gather(*futures)
+
+    def execute(self, method, params=None, session_id=None, timeout=None):
+        """
+        Send one command and wait for its reply.
+        """
+        return self.execute_many([(method, params)], session_id, timeout)[0]
+
+    def execute_many(self, commands, session_id=None, timeout=None):
+        """
+        Pipeline independent commands: send them all, then wait for every reply.
+
+        Args:
+            commands (list): (method, params) pairs
+            session_id (str): Page session to send them to, None for the browser
+            timeout (float): Seconds to wait for the replies
+
+        Returns:
+            list: The results, in command order
+        """
+        return self._run(self._call_many(commands, session_id), timeout)
+
+    async def _listen(self, method, session_id):
+        future = self.loop.create_future()
+        self._listeners.append((method, session_id, future))
+        return await future
+
+    def expect_event(self, method, session_id=None):
+        """
+        Start listening for an event before the command that triggers it is sent.
+        The listener is registered before any command submitted afterwards is written.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the event params
+        """
+        return asyncio.run_coroutine_threadsafe(self._listen(method, session_id), self.loop)
+
+    def close(self):
+        """
+        Close the websocket and stop the event loop.
+        """
+        try:
+            self._run(self.websocket.close(), timeout=2)
+        except Exception:
+            pass
+        self._reader.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+
+
+class CdpSession:
+    """
+    Commands to one attached page. Plays the role of Selenium's command executor,
+    so instrumentation.wrap_driver() counts and times the protocol commands.
+    """
+
+    def __init__(self, connection, session_id):
+        self.connection = connection
+        self.session_id = session_id
+
+    def execute(self, command, params=None, timeout=None):
+        return self.connection.execute(command, params, self.session_id, timeout)
+
+    def execute_many(self, commands, timeout=None):
+        return self.connection.execute_many(commands, self.session_id, timeout)
+
+    def expect_event(self, method):
+        return self.connection.expect_event(method, self.session_id)
+
+
+class CdpElement:
+    """
+    Handle to an element returned by a script, usable as a script argument.
+    """
+
+    def __init__(self, driver, node_id):
+        self._driver = driver
+        self.id = node_id
+
+    def to_json(self):
+        return {"__node": self.id}
+
+    @property
+    def text(self):
+        return self._driver.execute_script("return arguments[0].innerText;", self)
+
+    def get_attribute(self, name):
+        return self._driver.execute_script("return arguments[0].getAttribute(arguments[1]);", self, name)
+
+    def click(self):
+        self._driver.execute_script("arguments[0].click();", self)
+
+    def __eq__(self, other):
+        return isinstance(other, CdpElement) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+def _read_debugging_port(user_data_dir, process, timeout):
+    # Chrome writes the port it picked for --remote-debugging-port=0 and the browser
+    # target path to this file once DevTools is listening
+    port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise WebDriverException(f"Chrome exited during startup with code {process.returncode}")
+        try:
+            with open(port_file) as active_port:
+                port, path = active_port.read().split()[:2]
+            return f"ws://127.0.0.1:{port}{path}"
+        except (OSError, ValueError):
+            time.sleep(0.02)
+    raise TimeoutException("Chrome did not open its DevTools port")
+
+
+class CdpDriver:
+    """
+    Chrome launched and driven over the DevTools protocol, with a Selenium-style API.
+    """
+
+    def __init__(self, arguments=(), page_load_strategy="normal", binary=None, timeout=None):
+        """
+        Launch Chrome and attach to its first page.
+
+        Args:
+            arguments (list): Chrome command line switches, as for ChromeOptions
+            page_load_strategy (str): "normal" waits for the load event, "eager" for DOM ready
+            binary (str): Chrome executable, defaults to driver_cache.find_chrome()
+            timeout (float): Seconds to wait for Chrome and for page loads
+        """
+        binary = binary or driver_cache.find_chrome()
+        if not binary:
+            raise WebDriverException("Chrome was not found; set CHROME_BINARY in config.py")
+
+        self.timeout = timeout or config.CDP_PAGE_LOAD_TIMEOUT
+        self.load_event = "Page.domContentEventFired" if page_load_strategy == "eager" else "Page.loadEventFired"
+        self.script_timeout = 30
+
+        arguments = list(arguments)
+        profile = next((arg.split("=", 1)[1] for arg in arguments if arg.startswith("--user-data-dir=")), None)
+        self._temp_profile = None
+        if profile is None:
+            profile = self._temp_profile = tempfile.mkdtemp(prefix="attendance-cdp-")
+            arguments.append(f"--user-data-dir={profile}")
+        else:
+            os.makedirs(profile, exist_ok=True)
+        # A stale port file from a previous run would point at a dead browser
+        try:
+            os.remove(os.path.join(profile, "DevToolsActivePort"))
+        except OSError:
+            pass
+
+        self.process = subprocess.Popen(
+            [binary, "--remote-debugging-port=0", "--no-first-run", "--no-default-browser-check",
+             *arguments, "about:blank"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        # Same shape as Selenium's service, so callers find the browser process the same way
+        self.service = SimpleNamespace(process=self.process)
+
+        try:
+            self.connection = CdpConnection(_read_debugging_port(profile, self.process, self.timeout))
+            targets = self.connection.execute("Target.getTargets")["targetInfos"]
+            page = next((target for target in targets if target["type"] == "page"), None)
+            target_id = page["targetId"] if page else \
+                self.connection.execute("Target.createTarget", {"url": "about:blank"})["targetId"]
+            session_id = self.connection.execute(
+                "Target.attachToTarget", {"targetId": target_id, "flatten": True}
+            )["sessionId"]
+        except Exception:
+            self._terminate()
+            raise
+
+        self.command_executor = CdpSession(self.connection, session_id)
+        self.execute_cdp_batch([("Page.enable", {}), ("Runtime.enable", {})])
+
+    def execute_cdp_cmd(self, cmd, cmd_args=None):
+        """
+        Send one DevTools protocol command to the page.
+        """
+        return self.command_executor.execute(cmd, cmd_args or {})
+
+    def execute_cdp_batch(self, commands):
+        """
+        Pipeline independent DevTools protocol commands in one round trip.
+
+        Args:
+            commands (list): (method, params) pairs
+
+        Returns:
+            list: The results, in command order
+        """
+        return self.command_executor.execute_many(commands)
+
+    def _navigate(self, method, params):
+        loaded = self.command_executor.expect_event(self.load_event)
+        result = self.command_executor.execute(method, params)
+        if result.get("errorText"):
+            loaded.cancel()
+            raise WebDriverException(f"Navigation failed: {result['errorText']}")
+        try:
+            loaded.result(self.timeout)
+        except FutureTimeoutError:
+            loaded.cancel()
+            raise TimeoutException(f"Page did not load within {self.timeout}s")
+
+    def get(self, url):
+        self._navigate("Page.navigate", {"url": url})
+
+    def refresh(self):
+        self._navigate("Page.reload", {})
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def _call(self, runner, script, args, timeout):
+        declaration = f"function (args, timeoutMs) {{{SCRIPT_PRELUDE}\nvar run = function () {{\n{script}\n}};\n{runner}}}"
+        arguments = json.dumps([self._encode(arg) for arg in args])
+        reply = self.command_executor.execute("Runtime.evaluate", {
+            "expression": f"({declaration})({arguments}, {int(timeout * 1000)})",
+            "awaitPromise": True,
+            "returnByValue": True,
+        }, timeout=timeout + 5)
+        if "exceptionDetails" in reply:
+            details = reply["exceptionDetails"]
+            message = (details.get("exception") or {}).get("description") or details.get("text", "")
+            if "stale element reference" in message:
+                raise StaleElementReferenceException(message)
+            if "script timeout" in message:
+                raise TimeoutException(message)
+            raise JavascriptException(message)
+        return self._decode(reply["result"].get("value"))
+
+    def _encode(self, value):
+        if isinstance(value, CdpElement):
+            return value.to_json()
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._encode(item) for key, item in value.items()}
+        return value
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        if isinstance(value, dict):
+            if set(value) == {"__node"}:
+                return CdpElement(self, value["__node"])
+            return {key: self._decode(item) for key, item in value.items()}
+        return value
+
+    def execute_script(self, script, *args):
+        return self._call(SYNC_RUNNER, script, args, self.timeout)
+
+    def execute_async_script(self, script, *args):
+        return self._call(ASYNC_RUNNER, script, args, self.script_timeout)
+
+    def wait_until(self, script, *args, timeout=None):
+        """
+        Wait inside the page until a script returns a truthy value.
+        The page re-checks on every DOM change and reports back once, so the wait costs
+        one protocol command however long it takes.
+
+        Returns:
+            The first truthy value returned by the script
+
+        Raises:
+            TimeoutException: If the script stays falsy for the whole timeout
+        """
+        timeout = timeout or config.WAIT_TIMEOUT
+        value = self._call(WAIT_RUNNER, script, args, timeout)
+        if not value:
+            raise TimeoutException(f"Condition not met within {timeout}s")
+        return value
+
+    def find_elements(self, by, value):
+        return self.execute_script(FIND_SCRIPT, by, value)
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element found for {by}: {value}")
+        return elements[0]
+
+    @property
+    def current_url(self):
+        # Read from the navigation history rather than the page: while the page is being
+        # replaced, e.g. during a login redirect, there is no context to evaluate in
+        history = self.execute_cdp_cmd("Page.getNavigationHistory")
+        return history["entries"][history["currentIndex"]]["url"]
+
+    @property
+    def title(self):
+        return self.execute_script("return document.title;")
+
+    @property
+    def page_source(self):
+        return self.execute_script("return document.documentElement.outerHTML;")
+
+    def get_cookies(self):
+        """
+        Return the page's cookies in Selenium's format.
+        """
+        cookies = []
+        for cookie in self.execute_cdp_cmd("Network.getCookies")["cookies"]:
+            converted = {key: cookie[key] for key in ("name", "value", "domain", "path", "httpOnly", "secure")
+                         if key in cookie}
+            if cookie.get("expires", -1) > 0:
+                converted["expiry"] = int(cookie["expires"])
+            if cookie.get("sameSite"):
+                converted["sameSite"] = cookie["sameSite"]
+            cookies.append(converted)
+        return cookies
+
+    def _terminate(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self._temp_profile:
+            shutil.rmtree(self._temp_profile, ignore_errors=True)
+
+    def quit(self):
+        """
+        Close Chrome and the websocket.
+        """
+        try:
+            self.connection.execute("Browser.close", timeout=5)
+        except Exception:
+            pass
+        self.connection.close()
+        self._terminate()
@@ -0,0 +1,79 @@
+"""
+Extraction Checkpoint
+=====================
+
+Records every subject as soon as it has been extracted, so a run that crashes or is
+interrupted resumes where it stopped instead of starting over. The checkpoint is a small
+JSON file per student, rewritten atomically after each subject and removed once the run
+has completed. Checkpoints older than config.CHECKPOINT_MAX_AGE are ignored, so a resumed
+run never reports stale counts.
+"""
+
+import json
+import os
+import time
+
+import config
+from records import SubjectRecord
+
+
+class Checkpoint:
+    """
+    Subjects completed by an unfinished run of one student.
+    """
+
+    def __init__(self, student_id="default"):
+        self.student_id = student_id
+        self.path = os.path.join(os.path.expanduser(config.CHECKPOINT_DIR), f"{student_id}.json")
+        self.started_at = time.time()
+        self.subjects = {}
+
+    def load(self):
+        """
+        Load the subjects of an unfinished run, if it is recent enough.
+
+        Returns:
+            dict: Subject name to SubjectRecord, empty if there is nothing to resume
+        """
+        try:
+            with open(self.path) as checkpoint_file:
+                data = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return {}
+        if time.time() - data.get("started_at", 0) > config.CHECKPOINT_MAX_AGE:
+            self.clear()
+            return {}
+
+        self.started_at = data["started_at"]
+        self.subjects = {subject["name"]: SubjectRecord.from_dict(subject, source="checkpoint")
+                         for subject in data.get("subjects", [])}
+        return dict(self.subjects)
+
+    def add(self, *records):
+        """
+        Record completed subjects and write the checkpoint.
+
+        Args:
+            *records (SubjectRecord): The extracted subjects
+        """
+        if not records:
+            return
+        for record in records:
+            self.subjects[record.name] = record
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump({"student_id": self.student_id, "started_at": self.started_at,
+                       "subjects": [subject.to_dict() for subject in self.subjects.values()]},
+                      checkpoint_file)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """
+        Remove the checkpoint after a completed run.
+        """
+        self.subjects = {}
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
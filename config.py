@@ -12,16 +12,166 @@ ATTENDANCE_URL = "https://student.jgianveshana.com/ui/Academics/js_Class_Attenda
 
 # Timeouts and delays (in seconds)
 WAIT_TIMEOUT = 20
-INTERACTION_DELAY = 0.5
+# Upper bound for a subject's panel to appear after expanding it. Waits end as soon
+# as the panel is populated; POLL_INTERVAL is how often readiness is checked.
+INTERACTION_TIMEOUT = 5
+POLL_INTERVAL = 0.05
+
+# Extraction mode: "bulk" reads every subject with one injected script,
+# "per_subject" expands and reads the subjects one at a time
+EXTRACTION_MODE = "bulk"
+
+# Local data directory for caches and saved state
+APP_DATA_DIR = "~/.jain_attendance"
+DRIVER_CACHE_FILE = APP_DATA_DIR + "/driver_cache.json"
+
+# Saved login sessions (one directory per student)
+SESSION_DIR = APP_DATA_DIR + "/sessions"
+USE_CHROME_PROFILE = True
+
+# Attendance history used for trends and to skip re-reading unchanged subjects
+HISTORY_DB = APP_DATA_DIR + "/history.sqlite3"
+
+# Week selector of the attendance page, used by the multi-week crawl (week_crawl.py).
+# The date is submitted in WEEK_DATE_FORMAT; the day columns of the week grid are
+# headed with dates in WEEK_DAY_FORMAT.
+WEEK_GRID_ID = "gvWeekAttendance"
+WEEK_DATE_FIELD = "ctl00$ContentPlaceHolder1$txtWeekDate"
+WEEK_SUBMIT_FIELD = "ctl00$ContentPlaceHolder1$btnShowWeek"
+WEEK_SUBMIT_VALUE = "Show"
+WEEK_DATE_FORMAT = "%d/%m/%Y"
+WEEK_DAY_FORMAT = "%d-%b-%Y"
+# Marks that count as attended, matching the P/E/L/MCR/R components of the total
+ATTENDED_MARKS = ("P", "E", "L", "MCR", "R")
+# Weeks fetched at the same time; keep this low to stay polite to the portal
+CRAWL_CONCURRENCY = 4
+
+# Daemon mode: refresh every DAEMON_REFRESH_INTERVAL seconds, give or take up to
+# DAEMON_REFRESH_JITTER, touch the session every DAEMON_KEEPALIVE_INTERVAL seconds
+# in between, and serve the results on DAEMON_HOST:DAEMON_PORT
+DAEMON_REFRESH_INTERVAL = 900
+DAEMON_REFRESH_JITTER = 120
+DAEMON_KEEPALIVE_INTERVAL = 300
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8766
+
+# Rows buffered per Parquet row group / Arrow record batch when exporting
+EXPORT_BATCH_ROWS = 10000
+
+# Selector strategy cache: the strategy that last found each field is tried first,
+# and a strategy is demoted after this many misses in a row
+SELECTOR_CACHE_FILE = APP_DATA_DIR + "/selector_cache.json"
+SELECTOR_DEMOTE_AFTER = 3
+
+# Resumable extraction: every extracted subject is written to a per-student checkpoint,
+# so an interrupted run picks up where it stopped. Checkpoints older than this are ignored.
+CHECKPOINT_DIR = APP_DATA_DIR + "/checkpoints"
+CHECKPOINT_MAX_AGE = 6 * 3600  # seconds
+
+# Subjects that fail (e.g. a stale element after a postback) are retried this many times,
+# waiting RETRY_BACKOFF seconds before the first retry and doubling it each time
+EXTRACTION_RETRIES = 3
+RETRY_BACKOFF = 0.5
+
+# Page snapshots written by --capture and re-parsed by snapshots.py
+SNAPSHOT_DIR = APP_DATA_DIR + "/snapshots"
+SNAPSHOT_COMPRESSLEVEL = 6  # gzip level, 1 (fastest) to 9 (smallest)
+REPLAY_WORKERS = None  # None: one per CPU core
+
+# Browser backend: "selenium" drives Chrome through ChromeDriver, "cdp" launches Chrome
+# and drives it over the DevTools protocol on one websocket, without ChromeDriver
+BROWSER_BACKEND = "selenium"
+CHROME_BINARY = None  # None: find Chrome in the usual install locations
+CDP_PAGE_LOAD_TIMEOUT = 60  # seconds
+
+# Run budget: the most seconds a whole run may take (None for no limit), and the most
+# each phase may take inside it. The phase limits apply only to budgeted runs (--budget
+# or RUN_BUDGET) and unattended ones (--non-interactive, the daemon); an interactive run
+# without a budget is never cut short. Waits are shortened to fit the budget; once a
+# deadline has passed by WATCHDOG_GRACE seconds, a hung browser is killed with all its processes.
+RUN_BUDGET = None
+PHASE_BUDGETS = {
+    "setup_browser": 120,
+    "restore_session": 60,
+    "navigate_to_login": 60,
+    "page_load": 60,
+    "extract": 180,
+    "results": 60,
+}
+WATCHDOG_GRACE = 10
+# Non-interactive runs (--non-interactive, the daemon, batch workers) never prompt:
+# they wait this many seconds for the login to be completed in the browser, then stop
+LOGIN_WAIT_TIMEOUT = 180
+
+# Extraction engine: "selenium" drives Chrome, "http" fetches the page with the
+# saved session cookies and replays the ASP.NET postbacks without a browser
+EXTRACTION_ENGINE = "selenium"
+HTTP_POOL_SIZE = 4
+HTTP_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+
+# Batch mode (batch.py): worker processes (0 = one per CPU core), isolated
+# browser contexts per Chrome, per-student time limit and retries
+BATCH_WORKERS = 0
+BATCH_CONTEXTS_PER_BROWSER = 4
+BATCH_STUDENT_TIMEOUT = 60
+BATCH_RETRIES = 2
+
+# Median start-to-exit time allowed for --help, --version and --last (benchmark.py --startup)
+STARTUP_BUDGET_MS = 250
 
 # Browser settings
 WINDOW_SIZE = "1920,1080"
 
+# Lean mode (--lean): only the DOM text matters, so block everything else over the
+# DevTools protocol, use the "eager" page-load strategy and trim Chrome's memory use.
+# Patterns use the Network.setBlockedURLs wildcard syntax.
+LEAN_MODE = False
+LEAN_BLOCKED_URL_PATTERNS = [
+    # Images and icons
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.bmp*",
+    # Web fonts and icon font stylesheets
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*boxicons*", "*font-awesome*", "*fontawesome*",
+    # Media
+    "*.mp4*", "*.webm*", "*.mp3*", "*.ogg*",
+    # Third-party analytics and widgets
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*clarity.ms*",
+]
+LEAN_CHROME_FLAGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--js-flags=--max-old-space-size=256",
+]
+LEAN_DISABLED_FEATURES = ["Translate", "MediaRouter", "OptimizationHints", "BackForwardCache"]
+
+# Check every parsed breakdown: P+E+L+MCR+R must equal Total, and Total may not exceed the
+# classes conducted. Inconsistent subjects are reported instead of stored.
+STRICT_BREAKDOWN = True
+
 # Attendance thresholds (percentages)
 GOOD_ATTENDANCE_THRESHOLD = 75
 WARNING_ATTENDANCE_THRESHOLD = 65
 
-# XPath selectors for web elements
+# XPath selector for the plus icons that expand the subjects
 PLUS_ICON_XPATH = "//i[contains(@class, 'bx-plus-circle')]"
-CONDUCTED_TEXT_XPATH = "//span[contains(@id, 'lblClsCondID')]"
-TOTAL_TEXT_XPATH = "//span[contains(@id, 'lblClsAttID')]"
+# The conducted and attended spans are looked up inside the subject's own row and the
+# detail row below it, so these XPaths are relative to the row
+CONDUCTED_TEXT_XPATH = ".//span[contains(@id, 'lblClsCondID')]"
+TOTAL_TEXT_XPATH = ".//span[contains(@id, 'lblClsAttID')]"
+
+# Fast selectors tried before the XPaths above, as (type, selector) pairs where type is
+# "css", "xpath" or "id". Add one here if the portal markup changes. Selectors for the
+# conducted and attended spans are scoped to the subject's row; the HTTP engine uses
+# those that name a part of the span id, like [id*='...'] or contains(@id, '...').
+FAST_SELECTORS = {
+    "plus_icon": [("css", "i.bx-plus-circle")],
+    "conducted": [("css", "span[id*='lblClsCondID']")],
+    "attended": [("css", "span[id*='lblClsAttID']")],
+}
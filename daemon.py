@@ -0,0 +1,302 @@
+"""
+Attendance Daemon
+=================
+
+Keeps one authenticated session warm and refreshes the attendance page on a schedule,
+so a refresh costs one page reload (or one HTTP fetch with the "http" engine) instead of
+a driver setup, Chrome launch and login. Refreshes are spread with random jitter, and a
+keepalive request between them stops the portal session from timing out.
+
+The latest results are served from memory as JSON on a local port:
+    GET  /attendance    latest results (also served at /)
+    GET  /health        daemon status without the subjects
+    POST /refresh       refresh now instead of waiting for the schedule
+
+Usage:
+    python attendance_checker.py --daemon --student alice --interval 900
+    curl http://127.0.0.1:8766/attendance
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+import projection
+from attendance_checker import JainAttendanceChecker
+from instrumentation import LOGGER_NAME
+from session_store import is_login_url
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Fetches the attendance page from inside the browser without navigating away, so the
+# portal session stays alive between refreshes
+KEEPALIVE_SCRIPT = """
+var done = arguments[arguments.length - 1];
+fetch(arguments[0], {method: "HEAD", credentials: "include", redirect: "manual"})
+    .then(function (response) { done(response.type !== "opaqueredirect" && response.ok); })
+    .catch(function () { done(false); });
+"""
+
+
+class AttendanceDaemon:
+    """
+    Warm checker session with scheduled refreshes and an in-memory JSON snapshot.
+    """
+
+    def __init__(self, student_id="default", engine="selenium", headless=True, offline=False,
+                 interval=None, jitter=None, keepalive=None, host=None, port=None, backend=None):
+        # Nobody is at the console to confirm a manual login, so the checker never prompts
+        self.checker = JainAttendanceChecker(offline=offline, student_id=student_id, headless=headless,
+                                             engine=engine, backend=backend, interactive=False)
+        self.interval = interval or config.DAEMON_REFRESH_INTERVAL
+        self.jitter = config.DAEMON_REFRESH_JITTER if jitter is None else jitter
+        self.keepalive_interval = keepalive or config.DAEMON_KEEPALIVE_INTERVAL
+        self.address = (host or config.DAEMON_HOST, config.DAEMON_PORT if port is None else port)
+        self.refreshes = 0
+        self.status = "starting"
+        self.error = None
+        self.updated_at = None
+        self.server = None
+        self._refresh_now = threading.Event()
+        self._stop = threading.Event()
+        # Pre-encoded responses; replaced as a whole so readers never see a partial update
+        self._snapshot = b"{}"
+        self._health = b"{}"
+        self._publish()
+
+    def _publish(self, subjects=None):
+        health = {
+            "student_id": self.checker.session.student_id,
+            "status": self.status,
+            "error": self.error,
+            "updated_at": self.updated_at,
+            "refreshes": self.refreshes,
+        }
+        snapshot = dict(health)
+        if subjects is not None:
+            total_conducted = sum(subject.conducted for subject in subjects)
+            total_attended = sum(subject.attended for subject in subjects)
+            rows = projection.project({health["student_id"]: subjects})
+            snapshot.update(
+                total_conducted=total_conducted,
+                total_attended=total_attended,
+                percentage=round(total_attended / total_conducted * 100, 2) if total_conducted else 0,
+                subjects=[dict(subject.to_dict(), percentage=row["percentage"], safe_skip=row["safe_skip"],
+                               required_attend=row["required_attend"])
+                          for subject, row in zip(subjects, rows)],
+                outlook=projection.describe(rows[-1]),
+            )
+            self._snapshot = json.dumps(snapshot).encode()
+        else:
+            # Keep the last results, but report the current status with them
+            previous = json.loads(self._snapshot)
+            previous.update(health)
+            self._snapshot = json.dumps(previous).encode()
+        self._health = json.dumps(health).encode()
+
+    def snapshot(self):
+        """
+        Return the latest results as encoded JSON.
+        """
+        return self._snapshot
+
+    def health(self):
+        """
+        Return the daemon status as encoded JSON.
+        """
+        return self._health
+
+    def start(self):
+        """
+        Log in once, read the page and start serving. Blocks until stop() is called.
+        """
+        checker = self.checker
+        if checker.engine == "http" and checker.use_session and checker.session.is_valid():
+            log.info("✓ Saved session is valid - no browser needed")
+        else:
+            checker.login()
+            if checker.engine == "http":
+                # Only the session was needed; the HTTP engine does the refreshes
+                checker.cleanup()
+
+        self.server = ThreadingHTTPServer(self.address, self._handler())
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        print(f"✓ Serving attendance at http://{host}:{port}/attendance")
+
+        self.refresh(reload=False)
+        try:
+            self._loop()
+        finally:
+            self.shutdown()
+
+    def _next_refresh(self):
+        return time.monotonic() + max(1.0, self.interval + random.uniform(-self.jitter, self.jitter))
+
+    def _loop(self):
+        next_refresh = self._next_refresh()
+        next_keepalive = time.monotonic() + self.keepalive_interval
+        while not self._stop.is_set():
+            timeout = max(0.0, min(next_refresh, next_keepalive) - time.monotonic())
+            requested = self._refresh_now.wait(timeout)
+            if self._stop.is_set():
+                break
+            now = time.monotonic()
+            if requested or now >= next_refresh:
+                self._refresh_now.clear()
+                self.refresh()
+                next_refresh = self._next_refresh()
+                next_keepalive = time.monotonic() + self.keepalive_interval
+            elif now >= next_keepalive:
+                self.keepalive()
+                next_keepalive = now + self.keepalive_interval
+
+    def refresh(self, reload=True):
+        """
+        Re-read the attendance page and publish the results.
+
+        Args:
+            reload (bool): Reload the page first; False when it was just loaded by login()
+        """
+        checker = self.checker
+        started = time.perf_counter()
+        try:
+            with checker.metrics.phase("refresh"):
+                if checker.engine == "http":
+                    read = checker.extract_attendance_data_http()
+                else:
+                    read = self._refresh_browser(reload)
+            if not read:
+                self.status = "login_required"
+                self.error = "The saved session has expired"
+                self._publish()
+                log.warning("⚠ Session expired - log in again with attendance_checker.py --fresh-login")
+                return
+
+            # Only store a snapshot when something was read from the live page
+            if any(subject.source != "history" for subject in checker.subjects):
+                checker.save_history()
+            self.refreshes += 1
+            self.status = "ok"
+            self.error = None
+            self.updated_at = time.time()
+            self._publish(list(checker.subjects))
+            log.info("✓ Refreshed %s subjects in %.2fs", len(checker.subjects), time.perf_counter() - started)
+        except Exception as e:
+            self.status = "stale"
+            self.error = str(e)
+            self._publish()
+            log.warning("✗ Refresh failed, serving the previous results: %s", e)
+
+    def _refresh_browser(self, reload):
+        checker = self.checker
+        if reload:
+            checker.driver.refresh()
+        if is_login_url(checker.driver.current_url) and not checker.restore_session():
+            return False
+        checker.wait_for_page_ready()
+        checker.extract_attendance_data()
+        return True
+
+    def keepalive(self):
+        """
+        Touch the portal session without reloading the page.
+        """
+        try:
+            if self.checker.engine == "http":
+                alive = self.checker.session.is_valid()
+            else:
+                alive = self.checker.driver.execute_async_script(KEEPALIVE_SCRIPT, config.ATTENDANCE_URL)
+        except Exception as e:
+            log.debug("Keepalive failed: %s", e)
+            alive = False
+        if not alive:
+            # Let the next refresh find out whether the session can be restored
+            log.info("⚠ Keepalive failed - refreshing now")
+            self._refresh_now.set()
+
+    def request_refresh(self):
+        """
+        Ask the loop to refresh as soon as possible.
+        """
+        self._refresh_now.set()
+
+    def stop(self):
+        """
+        Stop the refresh loop; start() then shuts down and returns.
+        """
+        self._stop.set()
+        self._refresh_now.set()
+
+    def shutdown(self):
+        """
+        Stop serving and release the browser and the history store.
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.checker.cleanup()
+        if self.checker.history is not None:
+            self.checker.history.close()
+            self.checker.history = None
+        self.checker.selectors.save()
+
+    def _handler(self):
+        daemon = self
+
+        class QueryHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _send(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path in ("/", "/attendance"):
+                    self._send(200, daemon.snapshot())
+                elif self.path == "/health":
+                    self._send(200, daemon.health())
+                else:
+                    self._send(404, b'{"error": "not found"}')
+
+            def do_POST(self):
+                if self.path == "/refresh":
+                    daemon.request_refresh()
+                    self._send(202, b'{"status": "refresh requested"}')
+                else:
+                    self._send(404, b'{"error": "not found"}')
+
+            def log_message(self, format, *args):
+                pass
+
+        return QueryHandler
+
+
+def run_daemon(args):
+    """
+    Run the daemon with the options parsed by attendance_checker.parse_args().
+    """
+    daemon = AttendanceDaemon(
+        student_id=args.student,
+        engine=args.engine,
+        headless=True,
+        offline=args.offline,
+        interval=args.interval,
+        port=args.port,
+        backend=args.backend,
+    )
+    try:
+        daemon.start()
+    except KeyboardInterrupt:
+        print("\nDaemon stopped")
+        daemon.shutdown()
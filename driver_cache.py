@@ -0,0 +1,278 @@
+"""
+ChromeDriver Cache
+==================
+
+Resolves the ChromeDriver executable that matches the installed Chrome browser and
+remembers the verified path, keyed on Chrome's major version. Repeat runs reuse the
+cached path without any network access; the driver is only resolved again when Chrome
+is upgraded or when launching with the cached driver fails.
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import time
+
+import config
+
+
+VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+DRIVER_NAMES = ("chromedriver", "chromedriver.exe")
+
+MAC_CHROME_PLIST = "/Applications/Google Chrome.app/Contents/Info.plist"
+
+MAC_CHROME_BINARY = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+
+LINUX_CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+
+WINDOWS_CHROME_BINARIES = (
+    r"%ProgramFiles%\Google\Chrome\Application\chrome.exe",
+    r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe",
+    r"%LocalAppData%\Google\Chrome\Application\chrome.exe",
+)
+
+WINDOWS_VERSION_QUERIES = (
+    ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"],
+    ["reg", "query", r"HKEY_LOCAL_MACHINE\Software\Google\Chrome\BLBeacon", "/v", "version"],
+)
+
+
+class DriverCacheError(Exception):
+    """Raised when no usable ChromeDriver can be resolved."""
+
+
+def _cache_file():
+    return os.path.expanduser(config.DRIVER_CACHE_FILE)
+
+
+def _run_for_version(command):
+    import subprocess
+
+    try:
+        output = subprocess.run(command, capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+
+def detect_chrome_version():
+    """
+    Detect the installed Chrome version without starting the browser.
+
+    Returns:
+        str: The full version, e.g. "126.0.6478.126", or None if Chrome was not found
+    """
+    if sys.platform == "darwin" and os.path.exists(MAC_CHROME_PLIST):
+        import plistlib
+
+        try:
+            with open(MAC_CHROME_PLIST, "rb") as plist_file:
+                return plistlib.load(plist_file).get("CFBundleShortVersionString")
+        except (OSError, plistlib.InvalidFileException):
+            pass
+
+    if sys.platform.startswith("win"):
+        for query in WINDOWS_VERSION_QUERIES:
+            version = _run_for_version(query)
+            if version:
+                return version
+        return None
+
+    for binary in LINUX_CHROME_BINARIES:
+        path = shutil.which(binary)
+        if path:
+            version = _run_for_version([path, "--version"])
+            if version:
+                return version
+    return None
+
+
+def find_chrome():
+    """
+    Locate the Chrome executable, for backends that launch Chrome themselves.
+
+    Returns:
+        str: Path to the executable, or None if Chrome was not found
+    """
+    if config.CHROME_BINARY:
+        return os.path.expanduser(config.CHROME_BINARY)
+    if sys.platform == "darwin" and os.path.exists(MAC_CHROME_BINARY):
+        return MAC_CHROME_BINARY
+    if sys.platform.startswith("win"):
+        for candidate in WINDOWS_CHROME_BINARIES:
+            path = os.path.expandvars(candidate)
+            if os.path.exists(path):
+                return path
+        return None
+    for binary in LINUX_CHROME_BINARIES:
+        path = shutil.which(binary)
+        if path:
+            return path
+    return None
+
+
+def major_version(version):
+    """
+    Return the cache key for a Chrome version.
+
+    Args:
+        version (str): Full Chrome version, or None
+
+    Returns:
+        str: The major version, or "unknown"
+    """
+    return version.split(".")[0] if version else "unknown"
+
+
+def load_cache():
+    """
+    Load the driver cache from disk.
+
+    Returns:
+        dict: Cache entries keyed by Chrome major version
+    """
+    try:
+        with open(_cache_file()) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    """
+    Write the driver cache to disk.
+
+    Args:
+        cache (dict): Cache entries keyed by Chrome major version
+    """
+    path = _cache_file()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as cache_file:
+        json.dump(cache, cache_file, indent=2)
+    os.replace(temp_path, path)
+
+
+def clear_cache():
+    """
+    Remove the driver cache file.
+
+    Returns:
+        bool: True if a cache file was removed
+    """
+    try:
+        os.remove(_cache_file())
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def invalidate(chrome_major):
+    """
+    Drop the cached driver for one Chrome major version.
+
+    Args:
+        chrome_major (str): The cache key to remove
+    """
+    cache = load_cache()
+    if cache.pop(chrome_major, None) is not None:
+        save_cache(cache)
+
+
+def describe_cache():
+    """
+    Describe the cache contents for display.
+
+    Returns:
+        str: A human readable summary of the cache
+    """
+    cache = load_cache()
+    lines = [f"ChromeDriver cache: {_cache_file()}"]
+    if not cache:
+        lines.append("  (empty)")
+    for chrome_major, entry in sorted(cache.items()):
+        verified = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("verified_at", 0)))
+        lines.append(f"  Chrome {chrome_major}: {entry.get('driver_path')} "
+                     f"(Chrome {entry.get('chrome_version')}, verified {verified})")
+    return "\n".join(lines)
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _find_executable(driver_path):
+    """
+    Work around the webdriver-manager bug where the returned path points at
+    THIRD_PARTY_NOTICES instead of the chromedriver binary.
+    """
+    if _is_executable(driver_path) and "THIRD_PARTY_NOTICES" not in driver_path:
+        return driver_path
+
+    driver_dir = os.path.dirname(driver_path)
+    for root, dirs, files in os.walk(driver_dir):
+        for file in files:
+            if file in DRIVER_NAMES:
+                candidate_path = os.path.join(root, file)
+                os.chmod(candidate_path, 0o755)
+                return candidate_path
+    return None
+
+
+def _verify(driver_path):
+    """Check that the driver binary actually runs."""
+    return _run_for_version([driver_path, "--version"]) is not None
+
+
+def _download_driver():
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return _find_executable(ChromeDriverManager().install())
+
+
+def resolve_driver_path(offline=False, force=False):
+    """
+    Resolve the ChromeDriver executable for the installed Chrome.
+
+    Args:
+        offline (bool): Never touch the network; only use the cache or a driver on PATH
+        force (bool): Ignore the cached entry and resolve the driver again
+
+    Returns:
+        tuple: (driver_path, chrome_major)
+
+    Raises:
+        DriverCacheError: If no usable driver could be found
+    """
+    chrome_version = detect_chrome_version()
+    chrome_major = major_version(chrome_version)
+
+    cache = load_cache()
+    entry = cache.get(chrome_major)
+    if not force and entry and _is_executable(entry.get("driver_path")):
+        return entry["driver_path"], chrome_major
+
+    if offline:
+        driver_path = shutil.which("chromedriver")
+        if not driver_path:
+            raise DriverCacheError(
+                f"No cached ChromeDriver for Chrome {chrome_major} and none on PATH (offline mode)"
+            )
+    else:
+        print(f"Resolving ChromeDriver for Chrome {chrome_version or 'unknown version'}...")
+        driver_path = _download_driver()
+
+    if not driver_path or not _verify(driver_path):
+        raise DriverCacheError(f"ChromeDriver at {driver_path} is not a working executable")
+
+    cache[chrome_major] = {
+        "chrome_version": chrome_version,
+        "driver_path": driver_path,
+        "verified_at": time.time(),
+    }
+    save_cache(cache)
+    return driver_path, chrome_major
@@ -0,0 +1,230 @@
+"""
+Result Export
+=============
+
+Streams subject records to a file as they are produced: one row per student and subject,
+with the counts, the percentage and the P/E/L/MCR/R/Total breakdown as columns.
+
+JSONL and CSV rows are written as soon as they arrive. Parquet and Arrow files are
+columnar, so rows are buffered up to config.EXPORT_BATCH_ROWS and written as one row
+group or record batch at a time; memory stays bounded however large the roster is.
+Parquet and Arrow need pyarrow, which is optional.
+
+Usage:
+    with open_exporter("results.parquet") as exporter:
+        exporter.write("alice", checker.subjects)
+"""
+
+import abc
+import csv
+import importlib.util
+import json
+import os
+
+import config
+from records import BREAKDOWN_KEYS
+
+
+COLUMNS = ("student_id", "subject", "conducted", "attended", "percentage") + BREAKDOWN_KEYS + \
+          ("summary", "source")
+
+FORMATS = {".jsonl": "jsonl", ".csv": "csv", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+
+class ExportError(Exception):
+    """Raised when an export format is unknown or its dependency is missing."""
+
+
+def record_row(student_id, record):
+    """
+    Flatten one subject record into an export row.
+
+    Args:
+        student_id (str): The student
+        record (SubjectRecord): The subject
+
+    Returns:
+        dict: Values keyed by COLUMNS
+    """
+    row = {
+        "student_id": student_id,
+        "subject": record.name,
+        "conducted": record.conducted,
+        "attended": record.attended,
+        "percentage": round(record.percentage, 2),
+    }
+    for key in BREAKDOWN_KEYS:
+        row[key] = record.breakdown.get(key)
+    row["summary"] = record.summary
+    row["source"] = record.source
+    return row
+
+
+class Exporter(abc.ABC):
+    """
+    Base class: writes the records of one student at a time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+
+    def write(self, student_id, records):
+        """
+        Append the records of one student.
+
+        Args:
+            student_id (str): The student
+            records (iterable): SubjectRecord objects
+        """
+        for record in records:
+            self._write_row(record_row(student_id, record))
+            self.rows += 1
+
+    @abc.abstractmethod
+    def _write_row(self, row):
+        """
+        Write one row of values keyed by COLUMNS.
+        """
+
+    def close(self):
+        """
+        Flush and close the file.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlExporter(Exporter):
+    """
+    One JSON object per line.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = open(path, "w")
+
+    def _write_row(self, row):
+        self.file.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class CsvExporter(Exporter):
+    """
+    CSV with a header row.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = open(path, "w", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def _write_row(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowExporter(Exporter):
+    """
+    Columnar Parquet or Arrow IPC file, written in bounded batches.
+    """
+
+    def __init__(self, path, format="parquet", batch_rows=None):
+        super().__init__(path)
+        try:
+            import pyarrow
+        except ImportError:
+            raise ExportError(f"{format.capitalize()} export needs pyarrow: pip install pyarrow")
+
+        self.pa = pyarrow
+        self.batch_rows = batch_rows or config.EXPORT_BATCH_ROWS
+        self.columns = {column: [] for column in COLUMNS}
+        self.pending = 0
+        self.schema = pyarrow.schema(
+            [("student_id", pyarrow.string()), ("subject", pyarrow.string()),
+             ("conducted", pyarrow.int32()), ("attended", pyarrow.int32()),
+             ("percentage", pyarrow.float64())]
+            + [(key, pyarrow.int32()) for key in BREAKDOWN_KEYS]
+            + [("summary", pyarrow.string()), ("source", pyarrow.string())]
+        )
+        if format == "parquet":
+            import pyarrow.parquet
+
+            self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        else:
+            import pyarrow.ipc
+
+            self.writer = pyarrow.ipc.new_file(path, self.schema)
+
+    def _write_row(self, row):
+        for column in COLUMNS:
+            self.columns[column].append(row[column])
+        self.pending += 1
+        if self.pending >= self.batch_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        batch = self.pa.record_batch([self.columns[column] for column in COLUMNS], schema=self.schema)
+        self.writer.write_batch(batch)
+        self.columns = {column: [] for column in COLUMNS}
+        self.pending = 0
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def check_export_path(path, format=None):
+    """
+    Check that a file can be exported to without creating it, so a bad --export fails
+    before the run rather than after it.
+
+    Args:
+        path (str): Output file
+        format (str): "jsonl", "csv", "parquet" or "arrow"; defaults to the extension
+
+    Returns:
+        str: The export format
+
+    Raises:
+        ExportError: If the format is unknown or pyarrow is missing
+    """
+    format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in FORMATS.values():
+        raise ExportError(f"Unknown export format for {path}; use one of {', '.join(sorted(FORMATS))}")
+    if format in ("parquet", "arrow") and importlib.util.find_spec("pyarrow") is None:
+        raise ExportError(f"{format.capitalize()} export needs pyarrow: pip install pyarrow")
+    return format
+
+
+def open_exporter(path, format=None):
+    """
+    Open an exporter for a file, choosing the format from its extension.
+
+    Args:
+        path (str): Output file
+        format (str): "jsonl", "csv", "parquet" or "arrow"; defaults to the extension
+
+    Returns:
+        Exporter: The open exporter; close it or use it as a context manager
+
+    Raises:
+        ExportError: If the format is unknown or pyarrow is missing
+    """
+    format = check_export_path(path, format)
+    if format == "jsonl":
+        return JsonlExporter(path)
+    if format == "csv":
+        return CsvExporter(path)
+    return ArrowExporter(path, format)
@@ -0,0 +1,467 @@
+"""
+Local Stand-in Portal
+=====================
+
+Serves the attendance portal from a local HTTP server so the extraction engines can be
+exercised and benchmarked without the live university portal.
+
+Two modes are available:
+
+Recorded pages, served from one directory:
+    attendance.html                 served for GET requests to the attendance page
+    attendance__<target>.html       served for a postback whose __EVENTTARGET is <target>
+                                    ("$" replaced by "_"); falls back to attendance.html
+
+Synthetic portal, generated on the fly with the real markup (bx-plus-circle icons,
+lblClsCondID/lblClsAttID spans, "P-12/E-1/L-0/MCR-0/R-0/Total-13" breakdowns, login
+redirect, ASP.NET postbacks, a week selector with a day-by-day grid) and a configurable
+subject count, latency and failure rate.
+
+Usage:
+    python fake_portal.py recorded_pages/ --port 8765
+    python fake_portal.py --subjects 50 --latency 0.05 --failure-rate 0.01
+"""
+
+import argparse
+import html
+import os
+import random
+import re
+import secrets
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+LOGIN_PATH = "/"
+ATTENDANCE_PATH = "/ui/Academics/js_Class_Attendance_for_a_Week.aspx"
+SESSION_COOKIE = "ASP.NET_SessionId"
+
+CONTROL_PREFIX = "ContentPlaceHolder1_gvAttendance"
+POSTBACK_PREFIX = "ctl00$ContentPlaceHolder1$gvAttendance$ctl"
+WEEK_DATE_FIELD = "ctl00$ContentPlaceHolder1$txtWeekDate"
+WEEK_GRID_ID = "ContentPlaceHolder1_gvWeekAttendance"
+
+SUBJECT_NAMES = (
+    "Mathematics", "Physics", "Chemistry", "Data Structures", "Operating Systems",
+    "Computer Networks", "Database Systems", "Software Engineering", "Compiler Design",
+    "Machine Learning", "Discrete Mathematics", "Digital Electronics",
+)
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Student Login</title></head><body>
+<form method="post" action="/">
+<input type="text" name="txtCollegeID" placeholder="College ID" />
+<input type="text" name="txtDOB" placeholder="Date of Birth" />
+<input type="text" name="txtCaptcha" placeholder="CAPTCHA" />
+<input type="submit" name="btnLogin" value="Login" />
+</form>
+</body></html>
+"""
+
+SCRIPT_MANAGER = "ctl00$ScriptManager1"
+UPDATE_PANEL = "ctl00$ContentPlaceHolder1$upAttendance"
+
+# Client side of the stand-in: clicking a plus icon issues an async postback, like an
+# ASP.NET UpdatePanel. The answer is a delta of "length|type|id|content|" records
+# holding the row's details and the new ViewState, and the same PageRequestManager
+# state the extractor watches is exposed. Like PageRequestManager, only one async
+# postback runs at a time: starting a new one aborts the one still in flight.
+PORTAL_SCRIPT = """
+<script>
+var activePostback = null;
+window.Sys = {WebForms: {PageRequestManager: {
+    getInstance: function () {
+        return {get_isInAsyncPostBack: function () { return activePostback !== null; }};
+    },
+    _initialize: function () {}
+}}};
+function applyDelta(text) {
+    var position = 0;
+    while (position < text.length) {
+        var lengthEnd = text.indexOf("|", position);
+        var typeEnd = text.indexOf("|", lengthEnd + 1);
+        var idEnd = text.indexOf("|", typeEnd + 1);
+        var length = parseInt(text.substring(position, lengthEnd), 10);
+        var type = text.substring(lengthEnd + 1, typeEnd);
+        var id = text.substring(typeEnd + 1, idEnd);
+        var content = text.substr(idEnd + 1, length);
+        position = idEnd + length + 2;
+        if (type === "updatePanel") {
+            var panel = document.getElementById(id);
+            panel.innerHTML = content;
+            panel.parentNode.style.display = "";
+        } else if (type === "hiddenField") {
+            document.getElementById(id).value = content;
+        }
+    }
+}
+function __doPostBack(target, argument) {
+    var form = document.forms[0];
+    var data = new FormData(form);
+    data.set("__EVENTTARGET", target);
+    data.set("__EVENTARGUMENT", argument);
+    data.set("%(manager)s", "%(panel)s|" + target);
+    data.set("__ASYNCPOST", "true");
+    if (activePostback !== null) {
+        activePostback.abort();
+    }
+    var postback = new AbortController();
+    activePostback = postback;
+    fetch(form.action, {method: "POST", body: new URLSearchParams(data), signal: postback.signal,
+                        headers: {"X-MicrosoftAjax": "Delta=true"}})
+        .then(function (response) { return response.text(); })
+        .then(function (text) {
+            if (activePostback === postback) {
+                applyDelta(text);
+            }
+        })
+        .catch(function () {})
+        .finally(function () {
+            if (activePostback === postback) {
+                activePostback = null;
+            }
+        });
+}
+Sys.WebForms.PageRequestManager._initialize('%(manager)s', 'form1', ['t%(panel)s', '%(panel_id)s'], [], [], 90, 'ctl00');
+</script>
+""" % {"manager": SCRIPT_MANAGER, "panel": UPDATE_PANEL, "panel_id": UPDATE_PANEL.replace("$", "_")[6:]}
+
+
+def _safe_name(target):
+    return re.sub(r"[^A-Za-z0-9_-]", "_", target)
+
+
+def generate_subjects(count, seed=0):
+    """
+    Generate deterministic attendance data for the synthetic portal.
+
+    Args:
+        count (int): Number of subjects
+        seed (int): Random seed
+
+    Returns:
+        list: Dicts with name, conducted and the P/E/L/MCR/R/Total breakdown
+    """
+    rng = random.Random(seed)
+    subjects = []
+    for index in range(count):
+        conducted = rng.randint(10, 60)
+        present = rng.randint(conducted // 2, conducted)
+        excused = rng.randint(0, (conducted - present) // 2)
+        late = rng.randint(0, conducted - present - excused)
+        breakdown = {"P": present, "E": excused, "L": late, "MCR": 0, "R": 0}
+        breakdown["Total"] = sum(breakdown.values())
+        name = SUBJECT_NAMES[index % len(SUBJECT_NAMES)]
+        if index >= len(SUBJECT_NAMES):
+            name = f"{name} {index // len(SUBJECT_NAMES) + 1}"
+        subjects.append({"name": name, "conducted": conducted, "breakdown": breakdown})
+    return subjects
+
+
+def format_breakdown(breakdown):
+    """
+    Format a breakdown the way the portal shows it, e.g. "P-12/E-1/L-0/MCR-0/R-0/Total-13".
+    """
+    return "/".join(f"{key}-{breakdown[key]}" for key in ("P", "E", "L", "MCR", "R", "Total"))
+
+
+def render_detail(index, subject):
+    """
+    Render the expanded panel of one subject.
+    """
+    return (
+        f'<div class="col">Conducted <strong><span id="{CONTROL_PREFIX}_lblClsCondID_{index}">'
+        f'{subject["conducted"]}</span></strong></div>'
+        f'<div class="col">Attended <strong><span id="{CONTROL_PREFIX}_lblClsAttID_{index}">'
+        f'{format_breakdown(subject["breakdown"])}</span></strong></div>'
+    )
+
+
+def delta_record(kind, record_id, content):
+    """
+    Format one record of an async postback response.
+    """
+    return f"{len(content)}|{kind}|{record_id}|{content}|"
+
+
+def render_delta(index, subject):
+    """
+    Render the response to the async postback that expands one subject: its panel and
+    the new ViewState, as ASP.NET's PageRequestManager expects them.
+    """
+    return (
+        delta_record("updatePanel", f"detail_{index}", render_detail(index, subject))
+        + delta_record("hiddenField", "__VIEWSTATE", secrets.token_hex(16))
+        + delta_record("hiddenField", "__EVENTVALIDATION", secrets.token_hex(8))
+    )
+
+
+def week_marks(index, day, seed=0):
+    """
+    Generate the deterministic marks of one subject on one day.
+
+    Returns:
+        list: Zero to two marks, mostly "P" with the occasional "A"
+    """
+    if day.weekday() == 6 or day > date.today():
+        return []
+    rng = random.Random(f"{seed}-{index}-{day.isoformat()}")
+    return ["P" if rng.random() < 0.85 else "A" for _ in range(rng.choice((0, 1, 1, 2)))]
+
+
+def render_week_grid(subjects, week_start, seed=0):
+    """
+    Render the day-by-day grid of one week (Monday to Saturday).
+    """
+    days = [week_start + timedelta(days=offset) for offset in range(6)]
+    header = "".join(f"<th>{day.strftime('%a %d-%b-%Y')}</th>" for day in days)
+    rows = []
+    for index, subject in enumerate(subjects):
+        cells = "".join(f"<td>{' '.join(week_marks(index, day, seed)) or '-'}</td>" for day in days)
+        rows.append(f"<tr><td>{html.escape(subject['name'])}</td>{cells}</tr>")
+    return (
+        f'<table class="table" id="{WEEK_GRID_ID}">\n<tr><th>Subject</th>{header}</tr>\n'
+        + "\n".join(rows) + "\n</table>\n"
+    )
+
+
+def render_attendance_page(subjects, expanded=(), week=None, seed=0):
+    """
+    Render the weekly attendance page.
+
+    Args:
+        subjects (list): Subjects from generate_subjects()
+        expanded (iterable): Indexes of the subjects whose panel is expanded
+        week (date): Any day of the week to show, defaults to today
+        seed (int): Random seed of the day-by-day marks
+
+    Returns:
+        str: The page markup
+    """
+    week = week or date.today()
+    week_start = week - timedelta(days=week.weekday())
+    rows = []
+    for index, subject in enumerate(subjects):
+        target = f"{POSTBACK_PREFIX}{index + 2:02d}$lnkExpand"
+        style = "" if index in expanded else ' style="display:none"'
+        total = subject["breakdown"]["Total"]
+        rows.append(
+            f'<tr><td>{index + 1}</td><td>{html.escape(subject["name"])}</td>'
+            f'<td class="summary">{total}/{subject["conducted"]}</td>'
+            f'<td><a href="javascript:__doPostBack(&#39;{target}&#39;,&#39;&#39;)">'
+            f'<i class="bx bx-plus-circle"></i></a></td></tr>'
+            f'<tr class="detail"{style}><td colspan="4" id="detail_{index}">'
+            f'{render_detail(index, subject) if index in expanded else ""}</td></tr>'
+        )
+    return (
+        "<!DOCTYPE html>\n<html><head><title>Class Attendance for a Week</title></head><body>\n"
+        f'<form method="post" action="{ATTENDANCE_PATH}" id="form1">\n'
+        '<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="" />\n'
+        '<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="" />\n'
+        f'<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{secrets.token_hex(16)}" />\n'
+        f'<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{secrets.token_hex(8)}" />\n'
+        f'<input type="text" name="{WEEK_DATE_FIELD}" value="{week_start.strftime("%d/%m/%Y")}" />\n'
+        '<input type="submit" name="ctl00$ContentPlaceHolder1$btnShowWeek" value="Show" />\n'
+        '<table class="table" id="ContentPlaceHolder1_gvAttendance">\n'
+        "<tr><th>#</th><th>Subject</th><th>Summary</th><th></th></tr>\n"
+        + "\n".join(rows)
+        + "\n</table>\n" + render_week_grid(subjects, week_start, seed)
+        + "</form>\n" + PORTAL_SCRIPT + "</body></html>\n"
+    )
+
+
+class PortalHandler(BaseHTTPRequestHandler):
+    """
+    Common plumbing for the stand-in portal handlers.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body=b"", headers=None):
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RecordedPortalHandler(PortalHandler):
+    """
+    Serves the recorded attendance page and its postback responses.
+    """
+
+    pages_dir = "."
+
+    def _page(self, name):
+        path = os.path.join(self.pages_dir, name + ".html")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as page_file:
+            return page_file.read()
+
+    def do_GET(self):
+        if urlsplit(self.path).path != ATTENDANCE_PATH:
+            self._send(404, b"Not found")
+            return
+        self._send(200, self._page("attendance") or b"")
+
+    def do_POST(self):
+        target = self._form().get("__EVENTTARGET", "")
+        body = self._page("attendance__" + _safe_name(target)) or self._page("attendance") or b""
+        self._send(200, body)
+
+
+class SyntheticPortalHandler(PortalHandler):
+    """
+    Generates the portal with a login redirect, configurable latency and failures.
+    """
+
+    subjects = []
+    latency = 0.0
+    failure_rate = 0.0
+    seed = 0
+
+    def _delay_or_fail(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            self._send(500, b"Injected failure")
+            return True
+        return False
+
+    def _logged_in(self):
+        return f"{SESSION_COOKIE}=" in (self.headers.get("Cookie") or "")
+
+    def _login(self):
+        cookie = f"{SESSION_COOKIE}={secrets.token_hex(12)}; Path=/; HttpOnly"
+        self._send(302, headers={"Location": ATTENDANCE_PATH, "Set-Cookie": cookie})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == LOGIN_PATH:
+            # "?auto=1" logs in without the form, for unattended tests and benchmarks
+            if "auto=1" in url.query:
+                self._login()
+            else:
+                self._send(200, LOGIN_PAGE)
+        elif url.path == ATTENDANCE_PATH:
+            if not self._logged_in():
+                self._send(302, headers={"Location": LOGIN_PATH})
+            elif not self._delay_or_fail():
+                self._send(200, render_attendance_page(self.subjects, seed=self.seed))
+        else:
+            self._send(404, b"Not found")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        form = self._form()
+        if url.path == LOGIN_PATH:
+            self._login()
+            return
+        if url.path != ATTENDANCE_PATH:
+            self._send(404, b"Not found")
+            return
+        if not self._logged_in():
+            self._send(302, headers={"Location": LOGIN_PATH})
+            return
+        if self._delay_or_fail():
+            return
+
+        # The week selector submits a date; the week shown follows it
+        try:
+            week = datetime.strptime(form.get(WEEK_DATE_FIELD, ""), "%d/%m/%Y").date()
+        except ValueError:
+            week = None
+
+        match = re.search(r"gvAttendance\$ctl(\d+)\$", form.get("__EVENTTARGET", ""))
+        index = int(match.group(1)) - 2 if match else -1
+        if "X-MicrosoftAjax" in self.headers and 0 <= index < len(self.subjects):
+            self._send(200, render_delta(index, self.subjects[index]))
+        else:
+            self._send(200, render_attendance_page(self.subjects, expanded={index}, week=week, seed=self.seed))
+
+
+def serve(pages_dir, port=0):
+    """
+    Start serving recorded pages.
+
+    Args:
+        pages_dir (str): Directory holding the recorded pages
+        port (int): Port to listen on, 0 picks a free port
+
+    Returns:
+        ThreadingHTTPServer: The server; call serve_forever() or run it in a thread
+    """
+    handler = type("Handler", (RecordedPortalHandler,), {"pages_dir": pages_dir})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def serve_synthetic(subjects=10, latency=0.0, failure_rate=0.0, seed=0, port=0):
+    """
+    Start a synthetic portal.
+
+    Args:
+        subjects (int): Number of subjects on the attendance page
+        latency (float): Seconds added to every page and postback response
+        failure_rate (float): Probability of answering a page or postback with HTTP 500
+        seed (int): Random seed for the generated attendance data
+        port (int): Port to listen on, 0 picks a free port
+
+    Returns:
+        ThreadingHTTPServer: The server; call serve_forever() or run it in a thread
+    """
+    handler = type("Handler", (SyntheticPortalHandler,), {
+        "subjects": generate_subjects(subjects, seed),
+        "latency": latency,
+        "failure_rate": failure_rate,
+        "seed": seed,
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def base_url(server):
+    """
+    Return the root URL of a running stand-in portal.
+    """
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the student portal")
+    parser.add_argument("pages_dir", nargs="?", help="directory holding recorded pages")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--subjects", type=int, default=10, help="subjects on the synthetic page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of an HTTP 500")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        server = serve(args.pages_dir, args.port)
+    else:
+        server = serve_synthetic(args.subjects, args.latency, args.failure_rate, args.seed, args.port)
+    print(f"Serving at {base_url(server)}{ATTENDANCE_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Attendance History
+==================
+
+SQLite-backed history of per-subject attendance snapshots, keyed by student, subject
+and time. Besides trend and delta queries, the latest snapshot of each subject is used
+for incremental extraction: a subject whose collapsed-row summary has not changed since
+the last run is served from the store instead of being expanded and read again.
+
+The multi-week crawl stores per-day, per-subject records here too, together with the
+weeks it has fetched; closed weeks are never fetched again.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+import config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    taken_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    student_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    conducted INTEGER NOT NULL,
+    attended INTEGER NOT NULL,
+    breakdown TEXT NOT NULL DEFAULT '{}',
+    source TEXT NOT NULL DEFAULT 'live'
+);
+CREATE TABLE IF NOT EXISTS weeks (
+    student_id TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    closed INTEGER NOT NULL DEFAULT 0,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (student_id, week_start)
+);
+CREATE TABLE IF NOT EXISTS daily (
+    student_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    conducted INTEGER NOT NULL,
+    attended INTEGER NOT NULL,
+    marks TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (student_id, day, subject)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_student_time ON runs (student_id, taken_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_student_subject_time ON snapshots (student_id, subject, taken_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_run ON snapshots (run_id);
+"""
+
+
+def _row_to_snapshot(row):
+    snapshot = dict(row)
+    snapshot["breakdown"] = json.loads(snapshot["breakdown"])
+    return snapshot
+
+
+class HistoryStore:
+    """
+    Per-subject attendance snapshots for every run.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path or config.HISTORY_DB)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def record_run(self, student_id, subjects, taken_at=None):
+        """
+        Store one snapshot per subject for a completed run.
+
+        Args:
+            student_id (str): The student
+            subjects (list): SubjectRecord objects
+            taken_at (float): Timestamp of the run, defaults to now
+
+        Returns:
+            int: The id of the stored run
+        """
+        taken_at = taken_at or time.time()
+        with self.connection:
+            run_id = self.connection.execute(
+                "INSERT INTO runs (student_id, taken_at) VALUES (?, ?)", (student_id, taken_at)
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO snapshots (run_id, student_id, subject, taken_at, summary, conducted, "
+                "attended, breakdown, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, student_id, subject.name, taken_at, subject.summary, subject.conducted,
+                     subject.attended, json.dumps(subject.breakdown), subject.source)
+                    for subject in subjects
+                ],
+            )
+        return run_id
+
+    def latest(self, student_id):
+        """
+        Return the most recent snapshot of every subject of a student.
+
+        Args:
+            student_id (str): The student
+
+        Returns:
+            dict: Subject name to snapshot dict
+        """
+        rows = self.connection.execute(
+            "SELECT * FROM snapshots WHERE run_id = "
+            "(SELECT id FROM runs WHERE student_id = ? ORDER BY taken_at DESC LIMIT 1)",
+            (student_id,),
+        ).fetchall()
+        return {row["subject"]: _row_to_snapshot(row) for row in rows}
+
+    def trend(self, student_id, subject, limit=None):
+        """
+        Return the snapshots of one subject, oldest first.
+
+        Args:
+            student_id (str): The student
+            subject (str): The subject name
+            limit (int): Only return the most recent snapshots
+
+        Returns:
+            list: Snapshot dicts
+        """
+        rows = self.connection.execute(
+            "SELECT * FROM snapshots WHERE student_id = ? AND subject = ? ORDER BY taken_at DESC LIMIT ?",
+            (student_id, subject, limit or -1),
+        ).fetchall()
+        return [_row_to_snapshot(row) for row in reversed(rows)]
+
+    def delta_since_last_run(self, student_id):
+        """
+        Compare the two most recent runs of a student.
+
+        Args:
+            student_id (str): The student
+
+        Returns:
+            list: Dicts with subject, conducted/attended before and after, and the change
+        """
+        run_ids = [row["id"] for row in self.connection.execute(
+            "SELECT id FROM runs WHERE student_id = ? ORDER BY taken_at DESC LIMIT 2", (student_id,)
+        )]
+        if not run_ids:
+            return []
+        current = {row["subject"]: row for row in self.connection.execute(
+            "SELECT * FROM snapshots WHERE run_id = ?", (run_ids[0],))}
+        previous = {}
+        if len(run_ids) > 1:
+            previous = {row["subject"]: row for row in self.connection.execute(
+                "SELECT * FROM snapshots WHERE run_id = ?", (run_ids[1],))}
+
+        deltas = []
+        for subject, now in current.items():
+            before = previous.get(subject)
+            deltas.append({
+                "subject": subject,
+                "conducted_before": before["conducted"] if before else 0,
+                "attended_before": before["attended"] if before else 0,
+                "conducted": now["conducted"],
+                "attended": now["attended"],
+                "conducted_change": now["conducted"] - (before["conducted"] if before else 0),
+                "attended_change": now["attended"] - (before["attended"] if before else 0),
+            })
+        return deltas
+
+    def record_week(self, student_id, week_start, records, closed, fetched_at=None):
+        """
+        Replace the per-day records of one crawled week.
+
+        Args:
+            student_id (str): The student
+            week_start (str): ISO date of the Monday of the week
+            records (list): Dicts with day, subject, conducted, attended and marks
+            closed (bool): Whether the week is over and will not change any more
+            fetched_at (float): Timestamp of the fetch, defaults to now
+        """
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM daily WHERE student_id = ? AND week_start = ?", (student_id, week_start))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO daily (student_id, day, subject, week_start, conducted, "
+                "attended, marks) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (student_id, record["day"], record["subject"], week_start, record["conducted"],
+                     record["attended"], " ".join(record["marks"]))
+                    for record in records
+                ],
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO weeks (student_id, week_start, closed, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (student_id, week_start, int(closed), fetched_at or time.time()),
+            )
+
+    def closed_weeks(self, student_id):
+        """
+        Return the ISO Monday dates of the closed weeks already stored for a student.
+        """
+        return {row["week_start"] for row in self.connection.execute(
+            "SELECT week_start FROM weeks WHERE student_id = ? AND closed = 1", (student_id,))}
+
+    def daily(self, student_id, start=None, end=None):
+        """
+        Return the per-day, per-subject records of a student, oldest first.
+
+        Args:
+            student_id (str): The student
+            start (str): First ISO date to include
+            end (str): Last ISO date to include
+
+        Returns:
+            list: Dicts with day, subject, week_start, conducted, attended and marks
+        """
+        rows = self.connection.execute(
+            "SELECT * FROM daily WHERE student_id = ? AND day >= ? AND day <= ? ORDER BY day, subject",
+            (student_id, start or "", end or "9999-12-31"),
+        ).fetchall()
+        records = []
+        for row in rows:
+            record = dict(row)
+            record["marks"] = record["marks"].split()
+            records.append(record)
+        return records
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.connection.close()
@@ -0,0 +1,560 @@
+"""
+HTTP Extraction Engine
+======================
+
+Browserless alternative to the Selenium path. Once logged in, the attendance page is
+plain ASP.NET WebForms markup, so it can be fetched with the saved session cookies over
+a pooled keep-alive HTTP connection. Subjects whose details are not in the initial page
+are expanded by replaying the __doPostBack form submission behind their plus icon.
+
+When the page has an UpdatePanel, the postbacks are sent as async postbacks, as the
+browser does: the portal answers with a small delta holding the updated panel and the
+new ViewState instead of the whole page. Only the expanded row's spans are read from
+each answer, so expanding every subject costs time linear in the number of subjects.
+"""
+
+import html as html_module
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from selector_cache import ROW_FIELD_STRATEGIES, configured_strategies, id_part
+from session_store import is_login_url
+
+
+POSTBACK_PATTERN = re.compile(r"__doPostBack\(\s*'([^']*)'\s*,\s*'([^']*)'\s*\)")
+
+ROW_INDEX_PATTERN = re.compile(r"_(\d+)$")
+
+# Sys.WebForms.PageRequestManager._initialize('ctl00$ScriptManager1', 'form1',
+#     ['tctl00$ContentPlaceHolder1$UpdatePanel1', 'ContentPlaceHolder1_UpdatePanel1'], ...)
+SCRIPT_MANAGER_PATTERN = re.compile(
+    r"PageRequestManager\._initialize\(\s*'([^']+)'\s*,\s*'[^']*'\s*,\s*\[\s*'([^']*)'"
+)
+
+HIDDEN_INPUT_PATTERN = re.compile(r"<input\b[^>]*\btype=[\"']?hidden[^>]*>", re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r"\s(name|value)=(?:\"([^\"]*)\"|'([^']*)')", re.IGNORECASE)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+ASYNC_POSTBACK_HEADERS = {"X-MicrosoftAjax": "Delta=true", "Cache-Control": "no-cache"}
+
+
+class SessionExpiredError(Exception):
+    """Raised when the portal redirects the request to the login page."""
+
+
+def find_script_manager(html):
+    """
+    Find the ScriptManager and the first UpdatePanel of a page, needed for async postbacks.
+
+    Args:
+        html (str): The page source
+
+    Returns:
+        tuple: (ScriptManager field name, UpdatePanel unique id), or None if the page has none
+    """
+    match = SCRIPT_MANAGER_PATTERN.search(html)
+    if match is None or len(match.group(2)) < 2:
+        return None
+    # Panel ids carry a leading "t" or "f" flag: whether child controls trigger updates
+    return match.group(1), match.group(2)[1:]
+
+
+def parse_delta(text):
+    """
+    Split the response to an async postback into its records.
+
+    The response is a sequence of "length|type|id|content|" records, e.g. one
+    "updatePanel" record per updated panel and one "hiddenField" record per hidden field.
+
+    Args:
+        text (str): The response body
+
+    Returns:
+        list: (type, id, content) tuples
+
+    Raises:
+        ValueError: If the text is not a delta response
+    """
+    records = []
+    position, end = 0, len(text)
+    while position < end:
+        length_end = text.index("|", position)
+        type_end = text.index("|", length_end + 1)
+        id_end = text.index("|", type_end + 1)
+        content_end = id_end + 1 + int(text[position:length_end])
+        if text[content_end:content_end + 1] != "|":
+            raise ValueError(f"malformed delta record at position {position}")
+        records.append((text[length_end + 1:type_end], text[type_end + 1:id_end], text[id_end + 1:content_end]))
+        position = content_end + 1
+    return records
+
+
+def read_hidden_fields(html):
+    """
+    Read the hidden form fields of a page without parsing the rest of it.
+
+    Returns:
+        dict: Field name to value
+    """
+    fields = {}
+    for tag in HIDDEN_INPUT_PATTERN.findall(html):
+        attributes = {name.lower(): double or single for name, double, single in ATTRIBUTE_PATTERN.findall(tag)}
+        if attributes.get("name"):
+            fields[html_module.unescape(attributes["name"])] = html_module.unescape(attributes.get("value", ""))
+    return fields
+
+
+def field_id_parts(fields=None):
+    """
+    Return the span id parts to look for per count field.
+
+    Markup is not queried with CSS or XPath here, so only the strategies that name a
+    part of the span id are used, e.g. "css:span[id*='lblClsCondID']".
+
+    Args:
+        fields (dict): Field name ("conducted", "attended") to its (type, selector)
+                       strategies, defaults to the configured ones
+
+    Returns:
+        dict: Field name to a list of (strategy position, id part)
+    """
+    if fields is None:
+        fields = {field: configured_strategies(field) for field in ROW_FIELD_STRATEGIES}
+    return {field: [(position, id_part(strategy)) for position, strategy in enumerate(strategies)
+                    if id_part(strategy)]
+            for field, strategies in fields.items()}
+
+
+def read_row_texts(html, position, fields=None):
+    """
+    Read the conducted/attended texts of one row from markup, without parsing the rest.
+
+    Finds the row's spans by their GridView control ids, which end in the row index,
+    e.g. "gvAttendance_lblClsCondID_3".
+
+    Args:
+        html (str): A page, or the panel markup returned by an async postback
+        position (int): 0-based row position
+        fields (dict): Strategies per count field, see field_id_parts()
+
+    Returns:
+        dict: conducted and attended texts, matched - the position of the strategy that
+              found each - and fragment - the markup from the first span to the last - or
+              None if the row's spans are not in the markup
+    """
+    texts, bounds, matched = {}, [], {}
+    for field, parts in field_id_parts(fields).items():
+        for strategy, part in parts:
+            match = re.search(rf"<span\b[^>]*\bid=[\"'][^\"']*{re.escape(part)}_{position}[\"'][^>]*>(.*?)</span>",
+                              html, re.DOTALL)
+            if match is not None:
+                break
+        else:
+            return None
+        texts[field] = " ".join(html_module.unescape(TAG_PATTERN.sub("", match.group(1))).split())
+        matched[field] = strategy
+        bounds += [match.start(), match.end()]
+    texts["matched"] = matched
+    texts["fragment"] = html[min(bounds):max(bounds)]
+    return texts
+
+
+class AttendancePageParser(HTMLParser):
+    """
+    Single-pass parser for the weekly attendance page.
+
+    Collects the hidden WebForms fields needed to replay a postback and one entry per
+    plus icon holding the subject name, its postback target and the conducted/attended
+    span texts that follow it. The rows of the day-by-day week grid are kept as well.
+    """
+
+    def __init__(self, icon_class="bx-plus-circle", fields=None):
+        super().__init__(convert_charrefs=True)
+        self.icon_class = icon_class
+        self.fields = field_id_parts(fields)
+        self.form_fields = {}
+        self.subjects = []
+        self._rows = []
+        self._cells = []
+        self._links = []
+        self._span = None
+        self._tables = []
+        self.week_rows = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "input":
+            if (attrs.get("type") or "").lower() == "hidden" and attrs.get("name"):
+                self.form_fields[attrs["name"]] = attrs.get("value") or ""
+        elif tag == "table":
+            self._tables.append(attrs.get("id") or "")
+        elif tag == "tr":
+            self._rows.append([])
+        elif tag in ("td", "th"):
+            self._cells.append([])
+        elif tag == "a":
+            self._links.append(_postback_of(attrs))
+        elif tag == "span":
+            span_id = attrs.get("id") or ""
+            for field, parts in self.fields.items():
+                strategy = next((strategy for strategy, part in parts if part in span_id), None)
+                if strategy is not None:
+                    self._span = (field, span_id, [], strategy)
+                    break
+
+        if self.icon_class in (attrs.get("class") or "").split():
+            postback = _postback_of(attrs)
+            if postback is None:
+                postback = next((link for link in reversed(self._links) if link), None)
+            self.add_subject(self._rows[-1] if self._rows else [], postback)
+
+    def add_subject(self, cells, postback=None):
+        """
+        Start a subject entry; its conducted/attended spans are filled in as they are parsed.
+        """
+        self.subjects.append({"cells": cells, "postback": postback, "conducted": "", "attended": "",
+                              "matched": {}})
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self._tables:
+            self._tables.pop()
+        elif tag == "tr" and self._rows:
+            row = self._rows.pop()
+            if self._tables and config.WEEK_GRID_ID in self._tables[-1]:
+                self.week_rows.append(row)
+        elif tag in ("td", "th") and self._cells:
+            value = " ".join("".join(self._cells.pop()).split())
+            if self._rows:
+                self._rows[-1].append(value)
+        elif tag == "a" and self._links:
+            self._links.pop()
+        elif tag == "span" and self._span:
+            field, span_id, chunks, strategy = self._span
+            self._span = None
+            subject = self._owner(span_id)
+            if subject is not None:
+                subject[field] = " ".join("".join(chunks).split())
+                subject["matched"][field] = strategy
+
+    def handle_data(self, data):
+        if self._span:
+            self._span[2].append(data)
+        if self._cells:
+            self._cells[-1].append(data)
+
+    def _owner(self, span_id):
+        # GridView control ids end in the row index, e.g. "gvAttendance_lblClsCondID_3";
+        # otherwise the span belongs to the subject whose icon came right before it
+        match = ROW_INDEX_PATTERN.search(span_id)
+        if match and int(match.group(1)) < len(self.subjects):
+            return self.subjects[int(match.group(1))]
+        return self.subjects[-1] if self.subjects else None
+
+    def rows(self):
+        """
+        Return the parsed subjects in the same shape as the bulk harvest script.
+
+        Returns:
+            list: Dicts with index, name, summary, conducted, attended and postback, and
+                  for rows whose spans were found, matched - the position of the strategy
+                  that found each field, -1 for none
+        """
+        rows = []
+        for index, subject in enumerate(self.subjects, 1):
+            name = next((cell for cell in subject["cells"] if cell and not cell.isdigit()), "")
+            row = {
+                "index": index,
+                "name": name,
+                "summary": " ".join(cell for cell in subject["cells"] if cell),
+                "conducted": subject["conducted"],
+                "attended": subject["attended"],
+                "postback": subject["postback"],
+            }
+            if subject["matched"]:
+                row["matched"] = {field: subject["matched"].get(field, -1) for field in self.fields}
+            rows.append(row)
+        return rows
+
+    def week_days(self):
+        """
+        Return the day-by-day marks of the week grid.
+
+        The first row holds the dates of the week after the subject column, every other
+        row a subject name followed by that day's marks (e.g. "P", "P A"; "-" or empty
+        when there was no class).
+
+        Returns:
+            list: Dicts with day (ISO date), subject and marks (list of str)
+        """
+        if not self.week_rows:
+            return []
+        header, *body = self.week_rows
+        days = [_parse_day(cell) for cell in header[1:]]
+        records = []
+        for cells in body:
+            if not cells or not cells[0]:
+                continue
+            for day, cell in zip(days, cells[1:]):
+                marks = [mark for mark in re.split(r"[\s,/]+", cell) if mark and mark != "-"]
+                if day and marks:
+                    records.append({"day": day, "subject": cells[0], "marks": marks})
+        return records
+
+
+def _parse_day(cell):
+    # Header cells may carry the weekday as well, e.g. "Mon 15-Jul-2024"
+    for candidate in (cell, cell.split()[-1] if cell else ""):
+        try:
+            return datetime.strptime(candidate, config.WEEK_DAY_FORMAT).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _postback_of(attrs):
+    for name in ("href", "onclick"):
+        match = POSTBACK_PATTERN.search(attrs.get(name) or "")
+        if match:
+            return match.group(1), match.group(2)
+    return None
+
+
+def parse_attendance_page(html, fields=None):
+    """
+    Parse the attendance page markup.
+
+    Args:
+        html (str): The page source
+        fields (dict): Strategies per count field, see field_id_parts()
+
+    Returns:
+        AttendancePageParser: The parser holding form fields and subject rows
+    """
+    parser = AttendancePageParser(fields=fields)
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def parse_panel(html, name="", position=0, fields=None):
+    """
+    Read the conducted/attended texts of one subject from a captured panel.
+
+    Args:
+        html (str): The expanded row and panel markup, or a whole page after a postback
+        name (str): Subject name, used to find the subject on a whole page
+        position (int): 0-based row position, used when the name does not match
+        fields (dict): Strategies per count field, see field_id_parts()
+
+    Returns:
+        dict: The conducted and attended texts, empty strings when not found, and matched -
+              the position of the strategy that found each, -1 for none
+    """
+    page = parse_attendance_page(html, fields)
+    rows = page.rows()
+    if not rows or not any(row["conducted"] or row["attended"] for row in rows):
+        # A bare panel fragment: its spans belong to the one subject it was captured for
+        page = AttendancePageParser(icon_class=None, fields=fields)
+        page.add_subject([])
+        page.feed(html)
+        page.close()
+        rows = page.rows()
+    match = next((row for row in rows if name and row["name"] == name), None)
+    if match is None:
+        match = rows[position] if position < len(rows) else rows[-1]
+    matched = match.get("matched") or {field: -1 for field in page.fields}
+    return {"conducted": match["conducted"], "attended": match["attended"], "matched": matched}
+
+
+class HttpAttendanceEngine:
+    """
+    Fetches and expands the attendance page over HTTP with saved session cookies.
+    """
+
+    def __init__(self, cookies=None, url=None, pool_size=None, recorder=None, budget=None, fields=None):
+        self.url = url or config.ATTENDANCE_URL
+        self.recorder = recorder
+        self.budget = budget
+        # Strategies per count field, in the order the selector cache prefers
+        self.fields = fields
+        self.last_html = ""
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or config.HTTP_POOL_SIZE)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.http.headers["User-Agent"] = config.HTTP_USER_AGENT
+        if cookies:
+            self.http.cookies.update(cookies)
+
+    def _request(self, method, **kwargs):
+        # Every request ends by the run's deadline; none is sent once it has passed
+        if self.budget is None:
+            return self.http.request(method, self.url, timeout=config.WAIT_TIMEOUT, **kwargs)
+        try:
+            return self.http.request(method, self.url, timeout=self.budget.clamp(config.WAIT_TIMEOUT), **kwargs)
+        except requests.Timeout:
+            # Cut short by the budget rather than by the portal
+            self.budget.check()
+            raise
+
+    def _check(self, response):
+        if is_login_url(response.url):
+            raise SessionExpiredError("The portal redirected to the login page")
+        response.raise_for_status()
+
+    def _parse(self, response):
+        self._check(response)
+        self.last_html = response.text
+        return parse_attendance_page(response.text, self.fields)
+
+    def fetch_page(self):
+        """
+        Fetch and parse the attendance page.
+
+        Returns:
+            AttendancePageParser: The parsed page
+        """
+        return self._parse(self._request("GET"))
+
+    def postback(self, page, target, argument=""):
+        """
+        Replay a WebForms postback using the hidden fields of the current page.
+
+        Args:
+            page (AttendancePageParser): The page the postback is issued from
+            target (str): The __EVENTTARGET of the control
+            argument (str): The __EVENTARGUMENT of the control
+
+        Returns:
+            AttendancePageParser: The page returned by the postback
+        """
+        form = dict(page.form_fields)
+        form["__EVENTTARGET"] = target
+        form["__EVENTARGUMENT"] = argument
+        return self._parse(self._request("POST", data=form))
+
+    def fetch_week(self, week_start):
+        """
+        Show the week containing a date by submitting the week selector.
+
+        Args:
+            week_start (date): Any day of the week to show, normally its Monday
+
+        Returns:
+            AttendancePageParser: The page of that week
+        """
+        page = self.fetch_page()
+        form = dict(page.form_fields)
+        form["__EVENTTARGET"] = ""
+        form["__EVENTARGUMENT"] = ""
+        form[config.WEEK_DATE_FIELD] = week_start.strftime(config.WEEK_DATE_FORMAT)
+        form[config.WEEK_SUBMIT_FIELD] = config.WEEK_SUBMIT_VALUE
+        return self._parse(self._request("POST", data=form))
+
+    def expand(self, form, postback, position, name="", script_manager=None):
+        """
+        Expand one subject with a postback and read its conducted/attended texts.
+
+        Args:
+            form (dict): Hidden form fields of the page; updated in place with the
+                         ViewState returned by the postback, for the next one
+            postback (tuple): The (__EVENTTARGET, __EVENTARGUMENT) of the subject's plus icon
+            position (int): 0-based row position
+            name (str): Subject name, used when the spans carry no row index
+            script_manager (tuple): From find_script_manager(); None sends a full postback
+
+        Returns:
+            dict: conducted and attended texts, matched - the position of the strategy that
+                  found each - and fragment - the markup they were read from
+        """
+        target, argument = postback
+        fields = dict(form, __EVENTTARGET=target, __EVENTARGUMENT=argument)
+        headers = None
+        if script_manager is not None:
+            manager, panel = script_manager
+            fields[manager] = f"{panel}|{target}"
+            fields["__ASYNCPOST"] = "true"
+            headers = ASYNC_POSTBACK_HEADERS
+        response = self._request("POST", data=fields, headers=headers)
+        self._check(response)
+
+        markup = self._read_postback(response.text, form)
+        texts = read_row_texts(markup, position, self.fields)
+        if texts is None:
+            # Spans without a row index: fall back to parsing the returned markup
+            texts = dict(parse_panel(markup, name, position, self.fields), fragment=markup)
+        return texts
+
+    def _read_postback(self, text, form):
+        try:
+            records = parse_delta(text)
+        except ValueError:
+            # Not a delta: the portal answered with the whole page
+            form.update(read_hidden_fields(text))
+            return text
+
+        panels = []
+        for kind, record_id, content in records:
+            if kind == "updatePanel":
+                panels.append(content)
+            elif kind == "hiddenField":
+                form[record_id] = content
+            elif kind == "pageRedirect":
+                if is_login_url(unquote(content)):
+                    raise SessionExpiredError("The portal redirected to the login page")
+                raise requests.HTTPError(f"Async postback redirected to {unquote(content)}")
+            elif kind == "error":
+                raise requests.HTTPError(f"Async postback failed ({record_id}): {content}")
+        return "".join(panels)
+
+    def harvest(self, known=None):
+        """
+        Read every subject, expanding the ones whose values are not on the page yet.
+
+        Args:
+            known (dict): Subject name to the collapsed-row summary of the last run;
+                          subjects whose summary is unchanged are not expanded
+
+        Returns:
+            list: Dicts with index, name, summary, conducted and attended texts, and
+                  matched for the rows whose spans were looked up
+
+        Raises:
+            SessionExpiredError: If the saved session is no longer valid
+            BudgetExceeded: If the run budget runs out before every subject is expanded
+        """
+        page = self.fetch_page()
+        rows = page.rows()
+        if self.recorder is not None:
+            self.recorder.page = self.last_html
+        form = dict(page.form_fields)
+        script_manager = find_script_manager(self.last_html)
+        known = known or {}
+        for position, row in enumerate(rows):
+            if (row["conducted"] and row["attended"]) or not row["postback"]:
+                continue
+            if known.get(row["name"]) == row["summary"]:
+                row["unchanged"] = True
+                continue
+            if self.budget is not None:
+                self.budget.check()
+            # ViewState changes with every postback, so they are replayed in sequence
+            texts = self.expand(form, row["postback"], position, row["name"], script_manager)
+            row["conducted"] = texts["conducted"]
+            row["attended"] = texts["attended"]
+            row["matched"] = texts["matched"]
+            if self.recorder is not None:
+                self.recorder.add_panel(row["index"], row["name"], texts["fragment"])
+        return rows
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.http.close()
@@ -0,0 +1,342 @@
+"""
+Instrumentation
+===============
+
+Structured timing for a checker run: the duration of every phase, the number and latency
+of WebDriver commands (by wrapping the driver's command executor), which selector
+strategy found each subject's values, retries or fallbacks, and page load and memory
+figures of the browser. Events are kept in memory and can be written as JSON lines or
+printed as a summary table.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+LOGGER_NAME = "attendance_checker"
+
+
+def configure_logging(verbosity=0):
+    """
+    Configure console logging for the checker.
+
+    Args:
+        verbosity (int): -1 for quiet (warnings only), 0 for normal, 1 for debug output
+    """
+    level = {-1: logging.WARNING, 0: logging.INFO}.get(verbosity, logging.DEBUG)
+    logger = logging.getLogger(LOGGER_NAME)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)
+
+
+def _children_by_parent():
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                # The command name may contain spaces, so split after its closing parenthesis
+                parent = int(stat_file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    return children
+
+
+def _proc_rss(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _import_psutil():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil
+
+
+def process_tree(pid=None):
+    """
+    Return the ids of a process and all of its descendants.
+
+    Uses psutil when it is installed and /proc on Linux; elsewhere only the process
+    itself is returned.
+
+    Args:
+        pid (int): Root process, defaults to the current process
+
+    Returns:
+        list: Process ids, the root first
+    """
+    pid = pid or os.getpid()
+    psutil = _import_psutil()
+    if psutil is not None:
+        try:
+            return [pid] + [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return [pid]
+
+    if os.path.isdir("/proc"):
+        children = _children_by_parent()
+        tree, pending = [], [pid]
+        while pending:
+            current = pending.pop()
+            tree.append(current)
+            pending.extend(children.get(current, []))
+        return tree
+
+    return [pid]
+
+
+def process_tree_rss(pid=None):
+    """
+    Return the resident memory of a process and all of its descendants.
+
+    Uses psutil when it is installed and /proc on Linux.
+
+    Args:
+        pid (int): Root process, defaults to the current process
+
+    Returns:
+        int: Resident set size in bytes, or None if it cannot be measured here or the
+             process has exited
+    """
+    pid = pid or os.getpid()
+    psutil = _import_psutil()
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            # Gone already, e.g. chromedriver after quit() or a browser killed by the watchdog
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    if os.path.isdir("/proc"):
+        return sum(_proc_rss(process) for process in process_tree(pid))
+
+    # The peak RSS of this process alone would be mistaken for the browser's
+    return None
+
+
+class PeakRssSampler:
+    """
+    Samples the memory of a process tree in the background and keeps the peak.
+    The peak stays None where the tree's memory cannot be measured.
+    """
+
+    def __init__(self, interval=0.1, pid=None):
+        self.interval = interval
+        self.pid = pid
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = process_tree_rss(self.pid)
+        if rss is not None:
+            self.peak = max(self.peak or 0, rss)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class Instrumentation:
+    """
+    Collects structured events for one run.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.command_count = 0
+        self.command_seconds = 0.0
+        self.commands = {}
+        self._phase = None
+
+    def event(self, kind, **fields):
+        """
+        Record an event.
+
+        Args:
+            kind (str): Event type, e.g. "phase", "selector", "retry"
+            **fields: Event details
+        """
+        fields["event"] = kind
+        fields["time"] = time.time()
+        self.events.append(fields)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a phase of the run and count the WebDriver commands issued during it.
+
+        Args:
+            name (str): Phase name
+        """
+        outer = self._phase
+        self._phase = name
+        commands_before = self.command_count
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self._phase = outer
+            self.event("phase", name=name, status=status,
+                       seconds=round(time.perf_counter() - started, 6),
+                       commands=self.command_count - commands_before)
+
+    def wrap_driver(self, driver):
+        """
+        Count the commands a WebDriver sends and measure their latency.
+
+        Args:
+            driver (WebDriver): The driver to instrument, Selenium or cdp_driver.CdpDriver
+        """
+        executor = driver.command_executor
+        execute = executor.execute
+
+        def record(command, elapsed):
+            self.command_count += 1
+            self.command_seconds += elapsed
+            count, seconds = self.commands.get(command, (0, 0.0))
+            self.commands[command] = (count + 1, seconds + elapsed)
+
+        def timed_execute(command, params=None, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return execute(command, params, *args, **kwargs)
+            finally:
+                record(command, time.perf_counter() - started)
+
+        executor.execute = timed_execute
+
+        # The CDP backend also pipelines commands; each one counts, sharing the wait
+        execute_many = getattr(executor, "execute_many", None)
+        if execute_many is None:
+            return
+
+        def timed_execute_many(commands, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return execute_many(commands, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                for command, _ in commands:
+                    record(command, elapsed / len(commands))
+
+        executor.execute_many = timed_execute_many
+
+    def phases(self):
+        """
+        Return the recorded phase events in the order they finished.
+        """
+        return [event for event in self.events if event["event"] == "phase"]
+
+    def write_json_lines(self, stream):
+        """
+        Write every event, followed by a command summary, as JSON lines.
+
+        Args:
+            stream: A writable text stream
+        """
+        for event in self.events:
+            stream.write(json.dumps(event) + "\n")
+        stream.write(json.dumps({
+            "event": "commands",
+            "count": self.command_count,
+            "seconds": round(self.command_seconds, 6),
+            "by_command": {name: {"count": count, "seconds": round(seconds, 6)}
+                           for name, (count, seconds) in self.commands.items()},
+        }) + "\n")
+
+    def print_summary(self, stream=None):
+        """
+        Print a summary table of phases, commands and selector strategies.
+
+        Args:
+            stream: A writable text stream, defaults to stdout
+        """
+        stream = stream or sys.stdout
+        stream.write("\nRUN METRICS\n")
+        stream.write(f"{'phase':<24}{'seconds':>10}{'commands':>10}{'status':>8}\n")
+        for event in self.phases():
+            stream.write(f"{event['name']:<24}{event['seconds']:>10.3f}{event['commands']:>10}"
+                         f"{event['status']:>8}\n")
+
+        if self.command_count:
+            average = self.command_seconds / self.command_count * 1000
+            stream.write(f"\nWebDriver commands: {self.command_count} "
+                         f"({self.command_seconds:.3f}s total, {average:.1f} ms average)\n")
+            for name, (count, seconds) in sorted(self.commands.items(), key=lambda item: -item[1][1]):
+                stream.write(f"  {name:<30}{count:>6}{seconds:>10.3f}s\n")
+
+        hits = {}
+        for event in self.events:
+            if event["event"] == "selector":
+                key = (event["field"], event["strategy"])
+                hits[key] = hits.get(key, 0) + 1
+        if hits:
+            stream.write("\nSelector strategies:\n")
+            for (field, strategy), count in sorted(hits.items()):
+                stream.write(f"  {field:<12}{strategy:<28}{count:>6}\n")
+
+        for event in self.events:
+            if event["event"] == "page":
+                stream.write(f"\nPage: {event['bytes'] / 1024:.1f} KB in {event['resources']} resources, "
+                             f"DOM usable after {event['dom_interactive_ms']:.0f} ms, "
+                             f"loaded after {event['load_ms']:.0f} ms\n")
+            elif event["event"] == "memory":
+                if event["peak_rss"] is None:
+                    stream.write("Peak Chrome RSS: unavailable (install psutil)\n")
+                else:
+                    stream.write(f"Peak Chrome RSS: {event['peak_rss'] / 1024 / 1024:.1f} MB\n")
+
+        others = [event for event in self.events if event["event"] in ("retry", "fallback")]
+        if others:
+            stream.write(f"\nRetries and fallbacks: {len(others)}\n")
+
+        timeouts = [event for event in self.events if event["event"] == "timeout"]
+        if timeouts:
+            stream.write("\n")
+        for event in timeouts:
+            killed = f", killed {event['killed']} browser processes" if event["killed"] else ""
+            stream.write(f"Timeout: {event['phase']} exceeded its {event['budget']:g}s budget{killed}\n")
@@ -0,0 +1,270 @@
+"""
+Attendance Projection
+=====================
+
+Closed-form what-if answers for attendance thresholds: how many classes a student can
+still skip and how many they must attend to reach a threshold, per subject and overall.
+
+A scenario is a threshold percentage and, optionally, the number of classes still
+scheduled per subject. Without a schedule the answers are open-ended: the number of
+classes that can be skipped in a row, and the number that must be attended in a row.
+With a schedule of u upcoming classes the answers refer to the end of that schedule,
+and the two add up to u whenever the threshold is reachable.
+
+Whole rosters (students x subjects x scenarios) are evaluated column-wise, with numpy
+when it is installed and plain Python otherwise.
+
+Usage:
+    python projection.py results.json --upcoming 0 10 20 --threshold 75 65
+    python projection.py --student alice --student bob --threshold 75
+"""
+
+import argparse
+import json
+import math
+import sys
+
+import config
+from records import SubjectRecord
+
+
+OVERALL = "OVERALL"
+
+# Guards floor/ceil against float error when the threshold is not a whole number
+EPSILON = 1e-9
+
+
+def make_scenario(threshold=None, upcoming=None, name=None):
+    """
+    Build a projection scenario.
+
+    Args:
+        threshold (float): Target percentage, defaults to config.GOOD_ATTENDANCE_THRESHOLD
+        upcoming (int or dict): Classes still scheduled per subject, or a dict of subject
+                                name to classes; None for an open-ended projection
+        name (str): Label shown in the results
+
+    Returns:
+        dict: The scenario
+    """
+    threshold = config.GOOD_ATTENDANCE_THRESHOLD if threshold is None else threshold
+    if not 0 < threshold < 100:
+        raise ValueError(f"Threshold must be between 0 and 100 (exclusive), got {threshold}")
+    if name is None:
+        name = f"{threshold:g}%" + (f" +{upcoming}" if isinstance(upcoming, int) else "")
+    return {"name": name, "threshold": threshold, "upcoming": upcoming}
+
+
+def _upcoming_for(scenario, subject):
+    upcoming = scenario["upcoming"]
+    if isinstance(upcoming, dict):
+        return upcoming.get(subject, 0)
+    return upcoming
+
+
+def _compute_python(attended, conducted, threshold, upcoming):
+    safe, required, reachable = [], [], []
+    for a, c, p, u in zip(attended, conducted, threshold, upcoming):
+        if u < 0:
+            # Open-ended: skip k in a row while a / (c + k) >= p, or attend n in a row
+            safe.append(max(0, math.floor((100 * a - p * c) / p + EPSILON)))
+            required.append(max(0, math.ceil((p * c - 100 * a) / (100 - p) - EPSILON)))
+            reachable.append(True)
+        else:
+            # Attend n of the u upcoming classes so that (a + n) / (c + u) >= p
+            needed = max(0, math.ceil((p * (c + u) - 100 * a) / 100 - EPSILON))
+            safe.append(max(0, u - needed))
+            required.append(needed)
+            reachable.append(needed <= u)
+    return safe, required, reachable
+
+
+def _compute_numpy(np, attended, conducted, threshold, upcoming):
+    a = np.asarray(attended, dtype=float)
+    c = np.asarray(conducted, dtype=float)
+    p = np.asarray(threshold, dtype=float)
+    u = np.asarray(upcoming, dtype=float)
+    open_ended = u < 0
+
+    open_safe = np.floor((100 * a - p * c) / p + EPSILON)
+    open_required = np.ceil((p * c - 100 * a) / (100 - p) - EPSILON)
+    needed = np.maximum(0, np.ceil((p * (c + u) - 100 * a) / 100 - EPSILON))
+
+    safe = np.where(open_ended, open_safe, u - needed)
+    required = np.where(open_ended, open_required, needed)
+    reachable = open_ended | (needed <= u)
+    return (np.maximum(0, safe).astype(int).tolist(), np.maximum(0, required).astype(int).tolist(),
+            reachable.tolist())
+
+
+def compute(attended, conducted, threshold, upcoming):
+    """
+    Compute the projection for columns of equal length.
+
+    Args:
+        attended (list): Classes attended
+        conducted (list): Classes conducted
+        threshold (list): Target percentages
+        upcoming (list): Classes still scheduled, or -1 for an open-ended projection
+
+    Returns:
+        tuple: (safe_skip, required_attend, reachable) lists
+    """
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    if numpy is not None:
+        return _compute_numpy(numpy, attended, conducted, threshold, upcoming)
+    return _compute_python(attended, conducted, threshold, upcoming)
+
+
+def project(students, scenarios=None):
+    """
+    Project every subject of every student under every scenario.
+
+    Args:
+        students (dict): Student id to a list of SubjectRecord objects
+        scenarios (list): Scenarios from make_scenario, defaults to an open-ended
+                          projection at config.GOOD_ATTENDANCE_THRESHOLD
+
+    Returns:
+        list: One row dict per student, subject and scenario, plus an OVERALL row per
+              student and scenario, with percentage, safe_skip, required_attend and
+              reachable
+    """
+    scenarios = scenarios or [make_scenario()]
+    keys, attended, conducted, threshold, upcoming = [], [], [], [], []
+
+    for student_id, subjects in students.items():
+        for scenario in scenarios:
+            total_attended = total_conducted = total_upcoming = 0
+            for subject in subjects:
+                classes = _upcoming_for(scenario, subject.name)
+                keys.append((student_id, subject.name, scenario["name"]))
+                attended.append(subject.attended)
+                conducted.append(subject.conducted)
+                threshold.append(scenario["threshold"])
+                upcoming.append(-1 if classes is None else classes)
+                total_attended += subject.attended
+                total_conducted += subject.conducted
+                total_upcoming += classes or 0
+
+            keys.append((student_id, OVERALL, scenario["name"]))
+            attended.append(total_attended)
+            conducted.append(total_conducted)
+            threshold.append(scenario["threshold"])
+            upcoming.append(-1 if scenario["upcoming"] is None else total_upcoming)
+
+    safe, required, reachable = compute(attended, conducted, threshold, upcoming)
+
+    rows = []
+    for i, (student_id, subject, scenario) in enumerate(keys):
+        rows.append({
+            "student_id": student_id,
+            "subject": subject,
+            "scenario": scenario,
+            "attended": attended[i],
+            "conducted": conducted[i],
+            "percentage": round(attended[i] / conducted[i] * 100, 2) if conducted[i] else 0,
+            "threshold": threshold[i],
+            "upcoming": upcoming[i] if upcoming[i] >= 0 else None,
+            "safe_skip": safe[i],
+            "required_attend": required[i],
+            "reachable": reachable[i],
+        })
+    return rows
+
+
+def describe(row):
+    """
+    Return a short human-readable verdict for one projection row.
+    """
+    if not row["reachable"]:
+        return f"cannot reach {row['threshold']:g}% even attending all {row['upcoming']} classes"
+    if row["required_attend"]:
+        return f"must attend {row['required_attend']} to reach {row['threshold']:g}%"
+    return f"can skip {row['safe_skip']} and stay at {row['threshold']:g}%"
+
+
+def print_table(rows, stream=None):
+    """
+    Print projection rows as a table.
+
+    Args:
+        rows (list): Rows from project()
+        stream: A writable text stream, defaults to stdout
+    """
+    stream = stream or sys.stdout
+    stream.write(f"{'student':<16}{'subject':<28}{'scenario':<12}{'current':>9}"
+                 f"{'can skip':>10}{'must attend':>13}\n")
+    for row in rows:
+        required = row["required_attend"] if row["reachable"] else "✗"
+        stream.write(f"{row['student_id'][:15]:<16}{row['subject'][:27]:<28}{row['scenario']:<12}"
+                     f"{row['percentage']:>8.2f}%{row['safe_skip']:>10}{required:>13}\n")
+
+
+def load_students(results_path=None, student_ids=()):
+    """
+    Load subject data from a batch results file and/or the latest stored history.
+
+    Args:
+        results_path (str): JSON written by batch.py --output
+        student_ids (list): Students to read from the history store
+
+    Returns:
+        dict: Student id to a list of SubjectRecord objects
+    """
+    students = {}
+    if results_path:
+        with open(results_path) as results_file:
+            for result in json.load(results_file):
+                if result.get("status") == "ok":
+                    students[result["student_id"]] = [SubjectRecord.from_dict(subject)
+                                                      for subject in result["subjects"]]
+
+    if student_ids:
+        from history_store import HistoryStore
+
+        history = HistoryStore()
+        try:
+            for student_id in student_ids:
+                students[student_id] = [SubjectRecord.from_dict(snapshot, source="history")
+                                        for snapshot in history.latest(student_id).values()]
+        finally:
+            history.close()
+    return students
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project safe skips and required classes per subject")
+    parser.add_argument("results", nargs="?", help="JSON results written by batch.py --output")
+    parser.add_argument("--student", action="append", default=[],
+                        help="also project the latest stored history of this student (repeatable)")
+    parser.add_argument("--threshold", type=float, nargs="+", default=[config.GOOD_ATTENDANCE_THRESHOLD],
+                        help="target percentages (default: %(default)s)")
+    parser.add_argument("--upcoming", type=int, nargs="+",
+                        help="classes still scheduled per subject; one scenario per value "
+                             "(default: open-ended)")
+    parser.add_argument("--overall-only", action="store_true", help="only print the OVERALL rows")
+    parser.add_argument("--json", help="write the projection rows to this JSON file")
+    args = parser.parse_args()
+
+    students = load_students(args.results, args.student)
+    if not students:
+        parser.error("no students to project; pass a results file or --student")
+
+    scenarios = [make_scenario(threshold, upcoming)
+                 for threshold in args.threshold for upcoming in (args.upcoming or [None])]
+    rows = project(students, scenarios)
+
+    print_table([row for row in rows if row["subject"] == OVERALL] if args.overall_only else rows)
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(rows, json_file, indent=2)
+        print(f"✓ Projection written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Subject Records
+===============
+
+Compact per-subject result record shared by the extraction engines, the history store,
+projections and exports. Each record keeps the subject name, the conducted and attended
+counts, the P/E/L/MCR/R/Total breakdown and where the values came from, so results never
+depend on the position of a subject in a list.
+"""
+
+BREAKDOWN_KEYS = ("P", "E", "L", "MCR", "R", "Total")
+
+
+class SubjectRecord:
+    """
+    Extracted attendance of one subject.
+
+    Attributes:
+        name (str): Subject name as shown on the portal
+        conducted (int): Classes conducted
+        attended (int): Classes attended (the breakdown total)
+        breakdown (dict): Counts per component, e.g. {"P": 12, "E": 1, ..., "Total": 13}
+        summary (str): Collapsed-row text, used to detect changed subjects
+        source (str): "live" when read from the page, "history" when served from the store
+    """
+
+    __slots__ = ("name", "conducted", "attended", "breakdown", "summary", "source")
+
+    def __init__(self, name, conducted, attended, breakdown=None, summary="", source="live"):
+        self.name = name
+        self.conducted = conducted
+        self.attended = attended
+        self.breakdown = breakdown or {}
+        self.summary = summary or ""
+        self.source = source or "live"
+
+    @property
+    def percentage(self):
+        """
+        Attendance percentage, 0 when no classes were conducted.
+        """
+        return self.attended / self.conducted * 100 if self.conducted else 0
+
+    def to_dict(self):
+        """
+        Return the record as a JSON-serialisable dict.
+        """
+        return {
+            "name": self.name,
+            "conducted": self.conducted,
+            "attended": self.attended,
+            "breakdown": dict(self.breakdown),
+            "summary": self.summary,
+            "source": self.source,
+        }
+
+    @classmethod
+    def from_dict(cls, data, source=None):
+        """
+        Build a record from a dict written by to_dict() or a history snapshot.
+
+        Args:
+            data (dict): Subject dict ("name") or history snapshot ("subject")
+            source (str): Override the stored source, e.g. "history"
+
+        Returns:
+            SubjectRecord: The record
+        """
+        return cls(
+            data.get("name") or data.get("subject"),
+            data["conducted"],
+            data["attended"],
+            data.get("breakdown"),
+            data.get("summary", ""),
+            source or data.get("source"),
+        )
+
+    def __repr__(self):
+        return (f"SubjectRecord({self.name!r}, conducted={self.conducted}, attended={self.attended}, "
+                f"source={self.source!r})")
+
+    # Pickled as a plain tuple when results cross batch worker processes
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
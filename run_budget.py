@@ -0,0 +1,240 @@
+"""
+Run Budget and Watchdog
+=======================
+
+Bounds how long a run may take, so unattended runs finish in predictable time.
+
+A Budget holds the deadline of the whole run (config.RUN_BUDGET) and of every phase
+listed in config.PHASE_BUDGETS. Waits are clamped to what is left of the tightest
+deadline, and a wait that starts with nothing left raises BudgetExceeded at once.
+
+A clamped wait cannot help when the browser itself hangs and a WebDriver or DevTools
+command never returns. The Watchdog thread covers that case: once the tightest deadline
+has passed by config.WATCHDOG_GRACE seconds it calls its on_expire callback - the
+checker kills the ChromeDriver/Chrome process tree, which fails the blocked command -
+and keeps the reason, so the run can report why it stopped.
+
+Usage:
+    budget = Budget(300)
+    with Watchdog(kill_browser).watching(budget):
+        with budget.phase("extract"):
+            wait = budget.clamp(config.WAIT_TIMEOUT)
+"""
+
+import importlib.util
+import os
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+from instrumentation import process_tree
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised when a run or one of its phases has used up its time budget.
+
+    Attributes:
+        phase (str): The phase whose budget ran out, or "run" for the whole run
+        budget (float): That budget in seconds
+    """
+
+    def __init__(self, phase, budget):
+        scope = "Run" if phase == "run" else f"Phase {phase!r}"
+        super().__init__(f"{scope} exceeded its {budget:g}s budget")
+        self.phase = phase
+        self.budget = budget
+
+
+class Budget:
+    """
+    Deadlines of one run and of the phases it is in.
+    """
+
+    def __init__(self, total=None, phases=None):
+        """
+        Args:
+            total (float): Seconds for the whole run, None for no limit
+            phases (dict): Seconds per phase name, defaults to config.PHASE_BUDGETS
+        """
+        self.total = total
+        self.phases = config.PHASE_BUDGETS if phases is None else phases
+        self.started = time.monotonic()
+        self._limits = [("run", self.started + total, total)] if total else []
+
+    def current(self):
+        """
+        Return the tightest limit in force.
+
+        Returns:
+            tuple: (phase, deadline, budget) with a time.monotonic() deadline,
+                   or None if nothing is limited
+        """
+        limits = self._limits
+        return min(limits, key=lambda limit: limit[1]) if limits else None
+
+    def remaining(self):
+        """
+        Return the seconds left before the tightest deadline, or None without one.
+        """
+        limit = self.current()
+        return None if limit is None else limit[1] - time.monotonic()
+
+    def check(self):
+        """
+        Raise BudgetExceeded if the tightest deadline has passed.
+        """
+        limit = self.current()
+        if limit is not None and time.monotonic() >= limit[1]:
+            raise BudgetExceeded(limit[0], limit[2])
+
+    def clamp(self, timeout):
+        """
+        Shorten a wait so it ends by the tightest deadline.
+
+        Args:
+            timeout (float): The wait's own timeout in seconds
+
+        Returns:
+            float: The timeout, or the time left if that is shorter
+
+        Raises:
+            BudgetExceeded: If there is no time left
+        """
+        self.check()
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Hold a phase to its budget from config.PHASE_BUDGETS, if it has one.
+
+        Args:
+            name (str): Phase name, as timed by Instrumentation.phase()
+
+        Raises:
+            BudgetExceeded: If the run has no time left when the phase starts
+        """
+        self.check()
+        seconds = self.phases.get(name)
+        if not seconds:
+            yield
+            return
+        limit = (name, time.monotonic() + seconds, seconds)
+        # Replaced as a whole so the watchdog thread never sees a partial update
+        self._limits = self._limits + [limit]
+        try:
+            yield
+        finally:
+            self._limits = [other for other in self._limits if other is not limit]
+
+
+def kill_process_tree(pid):
+    """
+    Kill a process and all of its descendants.
+
+    Args:
+        pid (int): Root process, e.g. ChromeDriver or Chrome
+
+    Returns:
+        int: Number of processes signalled
+    """
+    if os.name == "nt" and importlib.util.find_spec("psutil") is None:
+        # Without psutil the tree cannot be listed on Windows; taskkill walks it itself
+        result = subprocess.run(["taskkill", "/T", "/F", "/PID", str(pid)], capture_output=True)
+        return 1 if result.returncode == 0 else 0
+    # Windows has no SIGKILL; os.kill() terminates the process with any other signal
+    kill_signal = getattr(signal, "SIGKILL", signal.SIGTERM)
+    killed = 0
+    # Collect the whole tree first: children are reparented once their parent dies
+    for process in process_tree(pid):
+        try:
+            os.kill(process, kill_signal)
+            killed += 1
+        except OSError:
+            continue
+    return killed
+
+
+class Watchdog:
+    """
+    Background thread that calls on_expire once the budget it watches has run out.
+    """
+
+    def __init__(self, on_expire, grace=None, interval=0.5):
+        """
+        Args:
+            on_expire (callable): Called from the watchdog thread with the BudgetExceeded
+            grace (float): Seconds past a deadline before on_expire is called,
+                           defaults to config.WATCHDOG_GRACE
+            interval (float): Seconds between checks
+        """
+        self.on_expire = on_expire
+        self.grace = config.WATCHDOG_GRACE if grace is None else grace
+        self.interval = interval
+        self.budget = None
+        self.expired = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, budget):
+        """
+        Start watching a budget, replacing the previous one.
+
+        Args:
+            budget (Budget): The budget to enforce
+        """
+        self.expired = None
+        self.budget = budget
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+            self._thread.start()
+
+    def release(self):
+        """
+        Stop watching the current budget.
+
+        Returns:
+            BudgetExceeded: Why the watchdog fired, or None if it did not
+        """
+        self.budget = None
+        return self.expired
+
+    @contextmanager
+    def watching(self, budget):
+        """
+        Watch a budget for the duration of a block.
+        """
+        self.watch(budget)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def stop(self):
+        """
+        Stop the watchdog thread.
+        """
+        self.release()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            budget = self.budget
+            limit = budget.current() if budget is not None else None
+            if limit is None or self.expired is not None:
+                continue
+            if time.monotonic() >= limit[1] + self.grace:
+                self.expired = BudgetExceeded(limit[0], limit[2])
+                try:
+                    self.on_expire(self.expired)
+                except Exception:
+                    pass
@@ -0,0 +1,152 @@
+"""
+Selector Strategy Cache
+=======================
+
+Remembers which selector found each field (the plus icons that expand the subjects and
+the conducted/attended spans inside a subject's row) and tries it first on the next run. A strategy that misses SELECTOR_DEMOTE_AFTER times
+in a row is demoted behind the others, so a markup change re-tunes the order on its
+own. Fast selectors from config.FAST_SELECTORS are tried before the built-in ones until
+the cache has learned otherwise.
+
+Strategies are (type, selector) pairs where type is "css", "xpath" or "id".
+"""
+
+import json
+import os
+import re
+
+import config
+
+# Built-in strategies for the fields read inside a subject's row, tried after
+# config.FAST_SELECTORS. The plus icon strategies live with the browser engine.
+ROW_FIELD_STRATEGIES = {
+    "conducted": [("xpath", config.CONDUCTED_TEXT_XPATH)],
+    "attended": [("xpath", config.TOTAL_TEXT_XPATH)],
+}
+
+# [id*='lblClsCondID'] in CSS, contains(@id, 'lblClsCondID') in XPath
+ID_PART_PATTERNS = (
+    re.compile(r"\[id\*=[\"']?([^\"'\]]+)"),
+    re.compile(r"contains\(\s*@id\s*,\s*[\"']([^\"']+)[\"']\s*\)"),
+)
+
+
+def strategy_key(strategy):
+    """
+    Return the cache key of a (type, selector) strategy, e.g. "css:i.bx-plus-circle".
+    """
+    return f"{strategy[0]}:{strategy[1]}"
+
+
+def id_part(strategy):
+    """
+    Return the part of the element id a strategy looks for, e.g. "lblClsCondID" for
+    "css:span[id*='lblClsCondID']", or None if it does not match on the id.
+    """
+    for pattern in ID_PART_PATTERNS:
+        match = pattern.search(strategy[1])
+        if match:
+            return match.group(1)
+    return None
+
+
+def configured_strategies(field, strategies=None):
+    """
+    Return the fast selectors of a field followed by its built-in strategies, without
+    duplicates and before any reordering by the cache.
+
+    Args:
+        field (str): The field being looked up
+        strategies (list): Built-in strategies, defaults to ROW_FIELD_STRATEGIES[field]
+
+    Returns:
+        list: (type, selector) strategies
+    """
+    if strategies is None:
+        strategies = ROW_FIELD_STRATEGIES.get(field, [])
+    candidates = []
+    for strategy in list(config.FAST_SELECTORS.get(field, [])) + list(strategies):
+        strategy = tuple(strategy)
+        if strategy not in candidates:
+            candidates.append(strategy)
+    return candidates
+
+
+class SelectorCache:
+    """
+    Persisted hit/miss statistics per field and strategy.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path or config.SELECTOR_CACHE_FILE)
+        self.changed = False
+        try:
+            with open(self.path) as cache_file:
+                self.fields = json.load(cache_file)
+        except (OSError, ValueError):
+            self.fields = {}
+
+    def ordered(self, field, strategies=None):
+        """
+        Order the candidate strategies for a field, best first.
+
+        The configured fast selectors come before the given built-in strategies. The
+        strategy that last succeeded is moved to the front and strategies with
+        repeated misses are moved to the back.
+
+        Args:
+            field (str): The field being looked up, e.g. "plus_icon"
+            strategies (list): Built-in (type, selector) strategies, defaults to
+                               ROW_FIELD_STRATEGIES[field]
+
+        Returns:
+            list: (type, selector) strategies in the order to try them
+        """
+        candidates = configured_strategies(field, strategies)
+
+        stats = self.fields.get(field, {})
+        last_hit = stats.get("last_hit")
+
+        def rank(item):
+            position, strategy = item
+            entry = stats.get("strategies", {}).get(strategy_key(strategy), {})
+            demoted = entry.get("consecutive_misses", 0) >= config.SELECTOR_DEMOTE_AFTER
+            preferred = strategy_key(strategy) == last_hit and not demoted
+            return (not preferred, demoted, position)
+
+        return [strategy for position, strategy in sorted(enumerate(candidates), key=rank)]
+
+    def record(self, field, strategy, hit):
+        """
+        Record the outcome of one lookup.
+
+        Args:
+            field (str): The field that was looked up
+            strategy (tuple): The (type, selector) strategy that was tried
+            hit (bool): Whether the strategy produced a value
+        """
+        stats = self.fields.setdefault(field, {"last_hit": None, "strategies": {}})
+        key = strategy_key(strategy)
+        entry = stats["strategies"].setdefault(key, {"hits": 0, "misses": 0, "consecutive_misses": 0})
+        if hit:
+            entry["hits"] += 1
+            entry["consecutive_misses"] = 0
+            self.changed = self.changed or stats["last_hit"] != key
+            stats["last_hit"] = key
+        else:
+            entry["misses"] += 1
+            entry["consecutive_misses"] += 1
+            self.changed = True
+
+    def save(self):
+        """
+        Write the statistics to disk if they changed.
+        """
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(self.fields, cache_file, indent=2)
+        os.replace(temp_path, self.path)
+        self.changed = False
@@ -0,0 +1,138 @@
+"""
+Session Store
+=============
+
+Persists the authenticated portal session after a successful manual login, so later
+runs can skip the login page. Each student gets a directory holding a reusable Chrome
+profile and a cookie jar with the authentication and ASP.NET session cookies.
+"""
+
+import json
+import os
+import shutil
+import time
+from urllib.parse import urljoin
+
+import config
+
+
+class SessionStore:
+    """
+    Saved login state for one student.
+    """
+
+    def __init__(self, student_id="default"):
+        self.student_id = student_id
+        self.directory = os.path.join(os.path.expanduser(config.SESSION_DIR), student_id)
+        self.profile_dir = os.path.join(self.directory, "chrome-profile")
+        self.cookies_file = os.path.join(self.directory, "cookies.json")
+
+    def save(self, cookies):
+        """
+        Save the browser cookies, readable only by the current user.
+
+        Args:
+            cookies (list): Cookie dicts as returned by driver.get_cookies()
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.cookies_file + ".tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as cookies_file:
+            json.dump({"saved_at": time.time(), "cookies": cookies}, cookies_file)
+        os.replace(temp_path, self.cookies_file)
+
+    def load(self):
+        """
+        Load the saved cookies.
+
+        Returns:
+            list: Cookie dicts, or an empty list if there is no saved session
+        """
+        try:
+            with open(self.cookies_file) as cookies_file:
+                return json.load(cookies_file).get("cookies", [])
+        except (OSError, ValueError):
+            return []
+
+    def clear(self):
+        """
+        Forget the saved session, including the Chrome profile.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def cookie_jar(self):
+        """
+        Build a requests cookie jar from the saved cookies.
+
+        Returns:
+            RequestsCookieJar: The saved cookies
+        """
+        import requests
+
+        jar = requests.cookies.RequestsCookieJar()
+        for cookie in self.load():
+            jar.set(cookie["name"], cookie["value"],
+                    domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+        return jar
+
+    def is_valid(self, timeout=None):
+        """
+        Check the saved session with a single request to the attendance page.
+
+        Args:
+            timeout (float): Request timeout in seconds, defaults to config.WAIT_TIMEOUT
+
+        Returns:
+            bool: True if the portal served the attendance page instead of redirecting to login
+        """
+        if not self.load():
+            return False
+        import requests
+
+        try:
+            response = requests.get(config.ATTENDANCE_URL, cookies=self.cookie_jar(),
+                                    allow_redirects=False, timeout=timeout or config.WAIT_TIMEOUT)
+        except requests.RequestException:
+            return False
+        # Redirects are not followed, so where the portal sends us is in the Location header
+        if response.is_redirect:
+            return not is_login_url(urljoin(config.ATTENDANCE_URL, response.headers["Location"]))
+        return response.status_code == 200
+
+
+def is_login_url(url):
+    """
+    Check whether a URL is the portal's login page.
+
+    Args:
+        url (str): The URL to check
+
+    Returns:
+        bool: True for the login page
+    """
+    return "login" in url.lower() or url.rstrip("/") == config.LOGIN_URL.rstrip("/")
+
+
+def to_cdp_cookie(cookie):
+    """
+    Convert a Selenium cookie dict to Network.setCookie parameters.
+
+    Args:
+        cookie (dict): Cookie as returned by driver.get_cookies()
+
+    Returns:
+        dict: Parameters for the DevTools Network.setCookie command
+    """
+    params = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain", ""),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        params["sameSite"] = cookie["sameSite"]
+    if "expiry" in cookie:
+        params["expires"] = cookie["expiry"]
+    return params
@@ -0,0 +1,276 @@
+"""
+Page Snapshots
+==============
+
+Records the attendance page and the expanded panel of every subject into a compressed
+snapshot bundle, and replays the conducted/attended parsing over archived bundles
+without a browser or a login. A bundle is one gzip-compressed JSON file holding the page
+source, the panel markup per subject and the subjects extracted when it was captured,
+so a replay can report every subject whose values a parser change would alter.
+
+Bundles are written by a run with --capture to config.SNAPSHOT_DIR/<student>/. Replays
+are spread over worker processes, so thousands of bundles re-parse in seconds.
+
+Usage:
+    python attendance_checker.py --capture
+    python snapshots.py                           # replay every archived bundle
+    python snapshots.py bundles/ --workers 8 --json replay.json
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from records import SubjectRecord
+
+
+BUNDLE_FORMAT = 1
+BUNDLE_SUFFIX = ".json.gz"
+
+
+class SnapshotRecorder:
+    """
+    Collects the markup of one extraction and writes it as a bundle.
+    """
+
+    def __init__(self, student_id="default", engine="selenium", url=None):
+        self.student_id = student_id
+        self.engine = engine
+        self.url = url or config.ATTENDANCE_URL
+        self.captured_at = time.time()
+        self.page = ""
+        self.panels = {}
+
+    def add_panel(self, index, name, html):
+        """
+        Record the expanded panel of one subject.
+
+        Args:
+            index (int): 1-based row position
+            name (str): Subject name
+            html (str): The expanded row and panel markup, or the page after the postback
+        """
+        self.panels[index] = {"index": index, "name": name, "html": html}
+
+    def save(self, subjects, directory=None):
+        """
+        Write the bundle.
+
+        Args:
+            subjects (list): SubjectRecord objects extracted from this markup
+            directory (str): Target directory, defaults to config.SNAPSHOT_DIR/<student>
+
+        Returns:
+            str: Path of the written bundle
+        """
+        directory = directory or os.path.join(os.path.expanduser(config.SNAPSHOT_DIR), self.student_id)
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.captured_at))
+        path = os.path.join(directory, f"{stamp}-{int(self.captured_at * 1000) % 1000:03d}{BUNDLE_SUFFIX}")
+        bundle = {
+            "format": BUNDLE_FORMAT,
+            "student_id": self.student_id,
+            "engine": self.engine,
+            "url": self.url,
+            "captured_at": self.captured_at,
+            "page": self.page,
+            "panels": [self.panels[index] for index in sorted(self.panels)],
+            "subjects": [subject.to_dict() for subject in subjects],
+        }
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=config.SNAPSHOT_COMPRESSLEVEL) as bundle_file:
+            json.dump(bundle, bundle_file)
+        return path
+
+
+def load_bundle(path):
+    """
+    Read one snapshot bundle.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as bundle_file:
+        return json.load(bundle_file)
+
+
+def parse_bundle(bundle):
+    """
+    Run the extraction parsing over the markup of one bundle.
+
+    The page is parsed as the HTTP engine parses it; subjects whose values are not on
+    the page are read from their captured panel, and the texts go through the same
+    attendance_parser checks as a live run.
+
+    Args:
+        bundle (dict): A bundle from load_bundle()
+
+    Returns:
+        tuple: (records, errors) - SubjectRecord objects with source "replay", and a dict
+               with subject and error for every subject whose texts did not parse
+    """
+    from attendance_parser import ParseError, parse_batch
+    from http_engine import parse_attendance_page, parse_panel
+
+    panels = {panel["index"]: panel for panel in bundle.get("panels", [])}
+    rows = parse_attendance_page(bundle["page"]).rows()
+    for row in rows:
+        index = row["index"]
+        if not (row["conducted"] and row["attended"]) and index in panels:
+            row.update(parse_panel(panels[index]["html"], row["name"] or panels[index]["name"], index - 1))
+
+    records, errors = [], []
+    for row, counts in zip(rows, parse_batch((row["conducted"], row["attended"]) for row in rows)):
+        name = row["name"] or f"Subject {row['index']}"
+        if isinstance(counts, ParseError):
+            errors.append({"subject": name, "error": str(counts)})
+            continue
+        records.append(SubjectRecord(name, counts.conducted, counts.attended, counts.breakdown._asdict(),
+                                     row["summary"], source="replay"))
+    return records, errors
+
+
+def compare(expected, replayed):
+    """
+    List the subjects whose replayed values differ from the captured ones.
+
+    Args:
+        expected (list): Subject dicts stored in the bundle
+        replayed (list): SubjectRecord objects from parse_bundle()
+
+    Returns:
+        list: Dicts with subject, expected and replayed (None when the subject is missing)
+    """
+    def values(subject):
+        return {"conducted": subject.conducted, "attended": subject.attended, "breakdown": subject.breakdown}
+
+    captured = {subject["name"]: values(SubjectRecord.from_dict(subject)) for subject in expected}
+    current = {record.name: values(record) for record in replayed}
+    return [{"subject": name, "expected": captured.get(name), "replayed": current.get(name)}
+            for name in list(captured) + [name for name in current if name not in captured]
+            if captured.get(name) != current.get(name)]
+
+
+def replay_file(path):
+    """
+    Replay one bundle; runs in a worker process.
+
+    Returns:
+        dict: path, student_id, captured_at, subjects, parse_errors, mismatches and error
+    """
+    result = {"path": path, "student_id": None, "captured_at": None, "subjects": [], "parse_errors": [],
+              "mismatches": [], "error": None}
+    try:
+        bundle = load_bundle(path)
+        records, parse_errors = parse_bundle(bundle)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    result.update(
+        student_id=bundle.get("student_id"),
+        captured_at=bundle.get("captured_at"),
+        subjects=[record.to_dict() for record in records],
+        parse_errors=parse_errors,
+        mismatches=compare(bundle.get("subjects", []), records),
+    )
+    return result
+
+
+def find_bundles(paths=None):
+    """
+    Expand files and directories into a sorted list of bundle paths.
+
+    Args:
+        paths (list): Bundle files or directories searched recursively,
+                      defaults to config.SNAPSHOT_DIR
+
+    Returns:
+        list: Bundle paths
+    """
+    bundles = []
+    for path in paths or [os.path.expanduser(config.SNAPSHOT_DIR)]:
+        if os.path.isdir(path):
+            bundles.extend(glob.glob(os.path.join(path, "**", "*" + BUNDLE_SUFFIX), recursive=True))
+        elif os.path.exists(path):
+            bundles.append(path)
+    return sorted(bundles)
+
+
+def replay(paths, workers=None):
+    """
+    Replay bundles across worker processes.
+
+    Args:
+        paths (list): Bundle paths
+        workers (int): Worker processes, defaults to config.REPLAY_WORKERS or the CPU count
+
+    Returns:
+        list: One result per bundle from replay_file(), in path order
+    """
+    workers = max(1, min(workers or config.REPLAY_WORKERS or os.cpu_count() or 1, len(paths) or 1))
+    if workers == 1:
+        return [replay_file(path) for path in paths]
+    # Bundles are small, so hand them out in chunks to keep the inter-process traffic low
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(replay_file, paths, chunksize=chunksize))
+
+
+def print_report(results, elapsed, workers):
+    """
+    Print the replay totals and every mismatch or error.
+    """
+    subjects = sum(len(result["subjects"]) for result in results)
+    mismatched = [result for result in results if result["mismatches"]]
+    failed = [result for result in results if result["error"]]
+    print(f"Replayed {len(results)} snapshots ({subjects} subjects) in {elapsed:.2f}s with {workers} workers")
+
+    for result in failed:
+        print(f"  ✗ {result['path']}: {result['error']}")
+    for result in mismatched:
+        print(f"  ⚠ {result['path']}:")
+        errors = {error["subject"]: error["error"] for error in result["parse_errors"]}
+        for mismatch in result["mismatches"]:
+            replayed = errors.get(mismatch["subject"]) or mismatch["replayed"]
+            print(f"      {mismatch['subject']}: captured {mismatch['expected']}, replayed {replayed}")
+
+    if not failed and not mismatched:
+        print("✓ Every snapshot parses to the values it was captured with")
+    else:
+        print(f"⚠ {len(mismatched)} snapshots changed, {len(failed)} failed to parse")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-parse archived page snapshots without a browser")
+    parser.add_argument("paths", nargs="*",
+                        help="bundle files or directories (default: the snapshot archive)")
+    parser.add_argument("--student", help="only replay the bundles of this student")
+    parser.add_argument("--workers", type=int, default=config.REPLAY_WORKERS or os.cpu_count() or 1,
+                        help="worker processes (default: %(default)s)")
+    parser.add_argument("--json", help="write the replayed subjects and mismatches to this JSON file")
+    args = parser.parse_args(argv)
+
+    paths = args.paths
+    if args.student and not paths:
+        paths = [os.path.join(os.path.expanduser(config.SNAPSHOT_DIR), args.student)]
+    bundles = find_bundles(paths)
+    if not bundles:
+        parser.error("no snapshot bundles found; capture some with attendance_checker.py --capture")
+
+    workers = max(1, min(args.workers, len(bundles)))
+    started = time.perf_counter()
+    results = replay(bundles, workers)
+    print_report(results, time.perf_counter() - started, workers)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+        print(f"✓ Replay results written to {args.json}")
+    if any(result["mismatches"] or result["error"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Multi-week Crawl
+================
+
+Rebuilds the day-by-day attendance of a date range from the weekly attendance page.
+Each week is fetched over HTTP with the saved session cookies by submitting the week
+selector, several weeks at a time up to config.CRAWL_CONCURRENCY, and merged into
+per-day, per-subject records in the history store.
+
+Weeks that are over are marked closed once stored and are never fetched again, so a
+semester backfill is a one-off and later runs only fetch the current week.
+
+Usage:
+    python week_crawl.py --student alice --from 2024-07-01
+    python week_crawl.py --student alice --from 2024-07-01 --to 2024-11-30 --concurrency 2
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import config
+from history_store import HistoryStore
+from http_engine import HttpAttendanceEngine, SessionExpiredError
+from session_store import SessionStore
+
+
+def week_start_of(day):
+    """
+    Return the Monday of the week containing a day.
+    """
+    return day - timedelta(days=day.weekday())
+
+
+def weeks_between(start, end):
+    """
+    Return the Mondays of every week from start to end, inclusive.
+
+    Args:
+        start (date): First day of the range
+        end (date): Last day of the range
+
+    Returns:
+        list: Monday dates, oldest first
+    """
+    weeks = []
+    week = week_start_of(start)
+    while week <= end:
+        weeks.append(week)
+        week += timedelta(days=7)
+    return weeks
+
+
+def is_closed(week_start, today=None):
+    """
+    Return True if the week has ended, so its attendance will not change any more.
+    """
+    return week_start + timedelta(days=7) <= (today or date.today())
+
+
+def merge_days(days):
+    """
+    Merge the marks of a week grid into one record per day and subject.
+
+    Args:
+        days (list): Dicts with day, subject and marks from AttendancePageParser.week_days()
+
+    Returns:
+        list: Dicts with day, subject, conducted, attended and marks
+    """
+    merged = {}
+    for entry in days:
+        record = merged.setdefault((entry["day"], entry["subject"]), {
+            "day": entry["day"], "subject": entry["subject"], "conducted": 0, "attended": 0, "marks": [],
+        })
+        for mark in entry["marks"]:
+            record["conducted"] += 1
+            record["attended"] += mark.upper() in config.ATTENDED_MARKS
+            record["marks"].append(mark)
+    return list(merged.values())
+
+
+class WeekCrawler:
+    """
+    Fetches weeks concurrently, one pooled HTTP engine per worker thread.
+    """
+
+    def __init__(self, cookies, url=None, concurrency=None):
+        self.cookies = cookies
+        self.url = url
+        self.concurrency = max(1, concurrency or config.CRAWL_CONCURRENCY)
+        self._local = threading.local()
+        self._engines = []
+        self._lock = threading.Lock()
+
+    def _engine(self):
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            engine = HttpAttendanceEngine(self.cookies, self.url, pool_size=1)
+            self._local.engine = engine
+            with self._lock:
+                self._engines.append(engine)
+        return engine
+
+    def fetch_week(self, week_start):
+        """
+        Fetch one week and merge it into per-day records.
+
+        Args:
+            week_start (date): Monday of the week
+
+        Returns:
+            list: Per-day, per-subject records of that week
+        """
+        page = self._engine().fetch_week(week_start)
+        week_end = (week_start + timedelta(days=6)).isoformat()
+        # Only keep the days of the requested week, whatever else the grid shows
+        return [record for record in merge_days(page.week_days())
+                if week_start.isoformat() <= record["day"] <= week_end]
+
+    def fetch_weeks(self, weeks):
+        """
+        Fetch several weeks, at most self.concurrency at a time.
+
+        Args:
+            weeks (list): Monday dates
+
+        Returns:
+            dict: Monday date to its per-day records
+
+        Raises:
+            SessionExpiredError: If the saved session is no longer valid
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return dict(zip(weeks, executor.map(self.fetch_week, weeks)))
+
+    def close(self):
+        """
+        Close the HTTP engines of all worker threads.
+        """
+        for engine in self._engines:
+            engine.close()
+        self._engines = []
+
+
+def crawl(student_id, start, end=None, cookies=None, url=None, concurrency=None, refresh=False,
+          history=None, today=None):
+    """
+    Fetch every week of a date range that is not stored as closed yet.
+
+    Args:
+        student_id (str): The student whose saved session and history are used
+        start (date): First day of the range
+        end (date): Last day of the range, defaults to today
+        cookies (dict): Session cookies, defaults to the student's saved session
+        url (str): Attendance page URL, defaults to config.ATTENDANCE_URL
+        concurrency (int): Weeks fetched at the same time
+        refresh (bool): Fetch closed weeks again as well
+        history (HistoryStore): Store to use, defaults to config.HISTORY_DB
+        today (date): Reference day for closing weeks, defaults to today
+
+    Returns:
+        dict: fetched and skipped Monday dates, and the stored records of the range
+
+    Raises:
+        SessionExpiredError: If the saved session is no longer valid
+    """
+    today = today or date.today()
+    end = end or today
+    own_history = history is None
+    history = history or HistoryStore()
+    crawler = WeekCrawler(cookies if cookies is not None else SessionStore(student_id).cookie_jar(),
+                          url, concurrency)
+    try:
+        closed = set() if refresh else history.closed_weeks(student_id)
+        weeks = weeks_between(start, end)
+        pending = [week for week in weeks if week.isoformat() not in closed]
+
+        for week, records in crawler.fetch_weeks(pending).items():
+            history.record_week(student_id, week.isoformat(), records, is_closed(week, today))
+
+        return {
+            "fetched": pending,
+            "skipped": [week for week in weeks if week not in pending],
+            "records": history.daily(student_id, start.isoformat(), end.isoformat()),
+        }
+    finally:
+        crawler.close()
+        if own_history:
+            history.close()
+
+
+def print_totals(records):
+    """
+    Print the attendance per subject over the crawled records.
+    """
+    totals = {}
+    for record in records:
+        conducted, attended = totals.get(record["subject"], (0, 0))
+        totals[record["subject"]] = (conducted + record["conducted"], attended + record["attended"])
+    for subject, (conducted, attended) in sorted(totals.items()):
+        percentage = attended / conducted * 100 if conducted else 0
+        print(f"  {subject}: {attended}/{conducted} ({percentage:.2f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl the weekly attendance page over a date range")
+    parser.add_argument("--student", default="default",
+                        help="name of the saved session to use (default: %(default)s)")
+    parser.add_argument("--from", dest="start", required=True, type=date.fromisoformat,
+                        help="first day of the range (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat,
+                        help="last day of the range (YYYY-MM-DD, default: today)")
+    parser.add_argument("--concurrency", type=int, default=config.CRAWL_CONCURRENCY,
+                        help="weeks fetched at the same time (default: %(default)s)")
+    parser.add_argument("--refresh", action="store_true", help="fetch closed weeks again")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        result = crawl(args.student, args.start, args.end, concurrency=args.concurrency,
+                       refresh=args.refresh)
+    except SessionExpiredError:
+        print("✗ The saved session has expired - run attendance_checker.py to log in again")
+        sys.exit(1)
+
+    print(f"✓ Fetched {len(result['fetched'])} week(s), skipped {len(result['skipped'])} closed "
+          f"week(s) in {time.perf_counter() - started:.1f}s")
+    print(f"{len(result['records'])} day/subject records from {args.start} to {args.end or date.today()}:")
+    print_totals(result["records"])
+
+
+if __name__ == "__main__":
+    main()